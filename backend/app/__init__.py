@@ -17,7 +17,33 @@ def create_app(config_name='default'):
     # Inicializar extensiones
     CORS(app)
     init_database(app)
-    socketio.init_app(app, cors_allowed_origins="*", async_mode="eventlet")
+    
+    # Serialización JSON (orjson si está disponible) para HTTP y Socket.IO
+    # (después de init_database: reemplaza el proveedor BSON de Flask-PyMongo)
+    from app.utils.serialization import init_serialization
+    socket_json = init_serialization(app)
+    from app.sockets.pubsub import socketio_queue_options
+    socketio.init_app(
+        app,
+        cors_allowed_origins="*",
+        async_mode="eventlet",
+        json=socket_json,
+        **socketio_queue_options(app.config)
+    )
+    from app.services.backpressure_service import BackpressureService
+    BackpressureService.install(socketio.server, app.config)
+
+    # Detrás de proxies de confianza: IP real del cliente para los límites
+    # por IP (envuelve también el handshake de Socket.IO)
+    proxy_hops = app.config.get('TRUSTED_PROXY_HOPS', 0)
+    if proxy_hops:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_hops, x_proto=proxy_hops)
+
+    # Compresión de respuestas JSON grandes (gzip/br/zstd según el cliente)
+    from app.services.compression_service import CompressionService
+    CompressionService.configure(app.config)
+    app.after_request(CompressionService.compress_response)
     
     # Configurar Cloudinary
     with app.app_context():
@@ -27,14 +53,44 @@ def create_app(config_name='default'):
     from app.models import init_models
     user_model, room_model, message_model = init_models(mongo, bcrypt)
     
+    # Lecturas idénticas simultáneas: una sola consulta (+ microcaché opcional)
+    from app.services.room_service import RoomService
+    read_ttl = app.config.get('READ_MICROCACHE_MS', 0) / 1000
+    RoomService.configure_reads(read_ttl)
+    message_model.configure_reads(read_ttl)
+    
+    # Salas antiguas sin secuencia: se numeran en un trabajo, no al enviar
+    message_model.configure_backfill(RoomService.start_sequence_backfill)
+    
+    # Límites de frecuencia de eventos WebSocket
+    from app.services.rate_limit_service import RateLimitService
+    RateLimitService.configure(app.config)
+    from app.services.admission_service import AdmissionService
+    AdmissionService.configure(app.config)
+    AdmissionService.ensure_lag_monitor(socketio, app.config.get('LOOP_LAG_INTERVAL_MS', 0) / 1000)
+    
+    # Formato compacto: reparto por sala si hay varios workers
+    from app.services.wire_service import WireService
+    WireService.configure(app.config)
+    
+    # Umbrales de avisos de presencia por sala
+    from app.services.presence_event_service import PresenceEventService
+    PresenceEventService.configure(app.config)
+    
+    # Directorio de salas en vivo
+    from app.services.room_directory_service import RoomDirectoryService
+    RoomDirectoryService.configure(app.config)
+    
     # Registrar blueprints
     from app.routes.auth import auth_bp
     from app.routes.rooms import rooms_bp
     from app.routes.upload import upload_bp
+    from app.routes.jobs import jobs_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(rooms_bp)
     app.register_blueprint(upload_bp)
+    app.register_blueprint(jobs_bp)
     
     # Registrar eventos de socket
     from app.sockets.auth_events import register_auth_events
@@ -45,6 +101,10 @@ def create_app(config_name='default'):
     register_room_events(socketio)
     register_message_events(socketio)
     
+    # Modo multiproceso: registrar este worker en el anillo de salas
+    from app.services.shard_service import ShardService
+    ShardService.start(app)
+    
     # Seed inicial
     with app.app_context():
         if mongo.db.users.count_documents({}) == 0:
@@ -54,6 +114,9 @@ def create_app(config_name='default'):
         if mongo.db.rooms.count_documents({}) == 0:
             room_model.create_room("General", "Sala de discusión general", "multimedia")
             print("[seed] creada sala 'General'")
+        
+        # Eliminaciones de salas interrumpidas por un reinicio
+        RoomService.resume_room_deletions(app.config.get('JOB_STALE_SECONDS', 300))
     
     @app.route('/')
     def index():
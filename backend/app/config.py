@@ -53,6 +53,114 @@ class Config:
     # WebSocket
     SOCKETIO_ASYNC_MODE = 'eventlet'
     
+    # Serializador JSON para HTTP y Socket.IO: 'orjson' (si está instalado) o 'json'
+    JSON_SERIALIZER = os.getenv('JSON_SERIALIZER', 'orjson')
+    
+    # Cola de mensajes para fan-out entre procesos/nodos (None = un proceso)
+    # Ej: redis://localhost:6379/0, amqp://guest@localhost//,
+    #     zmq+tcp://127.0.0.1:5555+5556, mongodb://localhost:27017/salas_distribuidas
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE') or None
+    SOCKETIO_CHANNEL = os.getenv('SOCKETIO_CHANNEL', 'salas-socketio')
+    
+    # Modo multiproceso: cada sala la atiende un worker (hashing consistente)
+    SHARDING_ENABLED = os.getenv('SHARDING_ENABLED', 'false').lower() == 'true'
+    WORKER_ID = os.getenv('WORKER_ID')
+    WORKER_URL = os.getenv('WORKER_URL', 'http://localhost:5000')
+    WORKER_HEARTBEAT_SECONDS = float(os.getenv('WORKER_HEARTBEAT_SECONDS', 5))
+    WORKER_TTL_SECONDS = float(os.getenv('WORKER_TTL_SECONDS', 15))
+    HASH_RING_REPLICAS = 100
+    
+    # Indicador "escribiendo...": un typing_state por sala cada intervalo
+    TYPING_FLUSH_INTERVAL_MS = int(os.getenv('TYPING_FLUSH_INTERVAL_MS', 250))
+    TYPING_TTL_SECONDS = float(os.getenv('TYPING_TTL_SECONDS', 5))
+    
+    # Agrupar broadcasts de mensajes (0 = un "message" por mensaje)
+    # Valores típicos: 10-50 ms
+    BROADCAST_BATCH_WINDOW_MS = int(os.getenv('BROADCAST_BATCH_WINDOW_MS', 0))
+    
+    # Historial reciente en memoria por sala y reanudación tras reconexión
+    HOT_HISTORY_SIZE = int(os.getenv('HOT_HISTORY_SIZE', 200))
+    RESYNC_MAX_MESSAGES = int(os.getenv('RESYNC_MAX_MESSAGES', 100))
+    
+    # Formato compacto (msgpack) para clientes que lo piden al conectar
+    WIRE_COMPACT_ENABLED = os.getenv('WIRE_COMPACT_ENABLED', 'True').lower() == 'true'
+    
+    # Backpressure: paquetes pendientes por conexión (0 = sin control)
+    OUTBOUND_HIGH_WATERMARK = int(os.getenv('OUTBOUND_HIGH_WATERMARK', 256))
+    OUTBOUND_LOW_WATERMARK = int(os.getenv('OUTBOUND_LOW_WATERMARK', 64))
+    OUTBOUND_MAX_QUEUE = int(os.getenv('OUTBOUND_MAX_QUEUE', 1024))
+    SLOW_CONSUMER_GRACE_SECONDS = float(os.getenv('SLOW_CONSUMER_GRACE_SECONDS', 10))
+    
+    # Límites de frecuencia por socket y por usuario ("evento=fichas_por_segundo/ráfaga")
+    # RATE_LIMIT_STORE: 'memory' (por proceso) o 'mongodb' (compartido entre nodos)
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+    RATE_LIMIT_STORE = os.getenv('RATE_LIMIT_STORE', 'memory')
+    SOCKET_RATE_LIMITS = os.getenv(
+        'SOCKET_RATE_LIMITS',
+        'send_message=5/10,typing=4/8,get_messages=2/5,search_messages=1/3,'
+        'resync=1/3,delete_message=2/5,members_sync=2/10'
+    )
+    
+    # Control de admisión HTTP: baldes por IP/usuario solo en las rutas caras
+    # (bcrypt, uploads); "default=rate/burst" los extiende a las rutas sin política.
+    # Peticiones simultáneas por ruta y rechazo por lag del event loop (0 = desactivado)
+    HTTP_RATE_LIMITS = os.getenv(
+        'HTTP_RATE_LIMITS',
+        'login=1/10,register=0.2/5,password=0.2/3,token=2/10,upload=0.5/5'
+    )
+    # Proxies de confianza delante de la app (0 = IP de la conexión). Con N > 0
+    # la IP del cliente sale del N-ésimo valor de X-Forwarded-For contando
+    # desde el final (ProxyFix); sin proxy no hay que confiar en esa cabecera
+    TRUSTED_PROXY_HOPS = int(os.getenv('TRUSTED_PROXY_HOPS', 0))
+    HTTP_CONCURRENCY_LIMITS = os.getenv('HTTP_CONCURRENCY_LIMITS', 'login=16,register=8,password=4,upload=4,users=4')
+    LOOP_LAG_INTERVAL_MS = int(os.getenv('LOOP_LAG_INTERVAL_MS', 100))
+    LOOP_LAG_SHED_MS = int(os.getenv('LOOP_LAG_SHED_MS', 250))
+    
+    # Avisos de presencia: individuales en salas pequeñas, "presence_delta"
+    # agrupado desde BATCH_MIN miembros y solo conteos desde SUPPRESS_MIN
+    PRESENCE_BATCH_MIN_MEMBERS = int(os.getenv('PRESENCE_BATCH_MIN_MEMBERS', 50))
+    PRESENCE_SUPPRESS_MIN_MEMBERS = int(os.getenv('PRESENCE_SUPPRESS_MIN_MEMBERS', 500))
+    PRESENCE_FLUSH_INTERVAL_MS = int(os.getenv('PRESENCE_FLUSH_INTERVAL_MS', 1000))
+    
+    # Lista de miembros: snapshot paginado al entrar + "members_delta" versionado
+    MEMBERS_SNAPSHOT_PAGE_SIZE = int(os.getenv('MEMBERS_SNAPSHOT_PAGE_SIZE', 200))
+    MEMBERS_FLUSH_INTERVAL_MS = int(os.getenv('MEMBERS_FLUSH_INTERVAL_MS', 250))
+    
+    # Lecturas por sala (detalles, resumen, últimos mensajes): las peticiones
+    # idénticas simultáneas comparten una consulta; además el resultado se
+    # reutiliza READ_MICROCACHE_MS (0 = solo coalescencia). La caché es local
+    # a cada proceso, pero su clave incluye la versión, la secuencia y los
+    # contadores de la sala: un cambio hecho por otro worker no sirve datos viejos
+    READ_MICROCACHE_MS = int(os.getenv('READ_MICROCACHE_MS', 250))
+    
+    # Lecturas HTTP de salas con ETag: Cache-Control public, max-age (segundos)
+    # para que una caché HTTP delante absorba las lecturas repetidas
+    HTTP_CACHE_MAX_AGE_SECONDS = int(os.getenv('HTTP_CACHE_MAX_AGE_SECONDS', 2))
+    
+    # Compresión de respuestas JSON desde MIN_BYTES; ENCODINGS en orden de
+    # preferencia (br y zstd solo si brotli/zstandard están instalados).
+    # Los cuerpos con ETag se guardan comprimidos CACHE_TTL segundos
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', 1024))
+    COMPRESSION_ENCODINGS = os.getenv('COMPRESSION_ENCODINGS', 'zstd,br,gzip')
+    COMPRESSION_CACHE_SIZE = int(os.getenv('COMPRESSION_CACHE_SIZE', 256))
+    COMPRESSION_CACHE_TTL_SECONDS = int(os.getenv('COMPRESSION_CACHE_TTL_SECONDS', 60))
+    
+    # Directorio de salas en vivo: listado en caché (reconstruido cada
+    # REFRESH segundos) y "room_counts" agrupado cada COUNTS_INTERVAL_MS
+    ROOM_DIRECTORY_REFRESH_SECONDS = int(os.getenv('ROOM_DIRECTORY_REFRESH_SECONDS', 60))
+    ROOM_DIRECTORY_COUNTS_INTERVAL_MS = int(os.getenv('ROOM_DIRECTORY_COUNTS_INTERVAL_MS', 2000))
+    
+    # Trabajos en segundo plano (borrados masivos por lotes)
+    JOB_BATCH_SIZE = int(os.getenv('JOB_BATCH_SIZE', 500))
+    JOB_BATCH_PAUSE_SECONDS = float(os.getenv('JOB_BATCH_PAUSE_SECONDS', 0.05))
+    JOBS_RUN_INLINE = False
+    # Al arrancar se reanudan las eliminaciones de salas sin avance en este tiempo
+    JOB_STALE_SECONDS = int(os.getenv('JOB_STALE_SECONDS', 300))
+    
+    # Estadísticas globales (GET /rooms/stats) servidas desde caché
+    STATS_CACHE_TTL_SECONDS = float(os.getenv('STATS_CACHE_TTL_SECONDS', 5))
+    
     # Logging
     LOG_LEVEL = 'INFO'
 
@@ -81,6 +189,27 @@ class TestingConfig(Config):
     # JWT más simple para testing
     JWT_SECRET = 'secret_testing_key'
     JWT_EXPIRE_HOURS = 1
+    
+    # Ejecutar trabajos de forma síncrona para poder verificarlos
+    JOBS_RUN_INLINE = True
+    JOB_BATCH_PAUSE_SECONDS = 0
+    
+    # Sin caché de estadísticas para ver siempre datos frescos
+    STATS_CACHE_TTL_SECONDS = 0
+    
+    # Un solo proceso: sin cola de mensajes aunque exista la variable de entorno
+    SOCKETIO_MESSAGE_QUEUE = None
+    SHARDING_ENABLED = False
+    
+    # typing_state inmediato (sin tarea periódica)
+    TYPING_FLUSH_INTERVAL_MS = 0
+    RATE_LIMIT_ENABLED = False
+    LOOP_LAG_INTERVAL_MS = 0
+    PRESENCE_FLUSH_INTERVAL_MS = 0
+    MEMBERS_FLUSH_INTERVAL_MS = 0
+    ROOM_DIRECTORY_REFRESH_SECONDS = 0
+    ROOM_DIRECTORY_COUNTS_INTERVAL_MS = 0
+    READ_MICROCACHE_MS = 0
 
 
 class ProductionConfig(Config):
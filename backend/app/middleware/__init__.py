@@ -23,11 +23,25 @@ from app.middleware.auth import (
     optional_auth_http         # Para rutas HTTP con autenticación opcional
 )
 
+# Importar decoradores de rate limiting
+from app.middleware.rate_limit import (
+    rate_limit_socket,         # Para eventos WebSocket con límite de frecuencia
+    admission_control          # Para rutas HTTP: límites por IP/usuario, concurrencia y lag
+)
+
+# Importar decoradores de caché HTTP
+from app.middleware.http_cache import (
+    conditional_get            # Para rutas HTTP GET: ETag débil, 304 y Cache-Control
+)
+
 # Exportar todo lo que queremos que sea accesible desde otros módulos
 __all__ = [
     'require_jwt_http',
     'require_token_socket',
     'require_admin',
     'require_admin_socket',
-    'optional_auth_http'
+    'optional_auth_http',
+    'rate_limit_socket',
+    'admission_control',
+    'conditional_get'
 ]
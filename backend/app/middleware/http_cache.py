@@ -0,0 +1,29 @@
+from functools import wraps
+from flask import request, make_response, current_app, g
+
+
+def conditional_get(etag_for):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            # El ETag sale de campos baratos: si el cliente ya lo tiene, 304
+            # sin ejecutar la consulta ni serializar el cuerpo
+            etag = etag_for(**kwargs)
+            # La vista usa el mismo valor como clave de sus lecturas cacheadas:
+            # el cuerpo nunca es anterior al estado que describe el ETag
+            g.etag = etag
+            if etag is not None and request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200 or etag is None:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.cache_control.public = True
+            response.cache_control.max_age = current_app.config.get('HTTP_CACHE_MAX_AGE_SECONDS', 2)
+            return response
+
+        return decorated_function
+
+    return decorator
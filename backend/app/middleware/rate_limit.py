@@ -0,0 +1,58 @@
+import math
+from functools import wraps
+from flask import request, jsonify
+from flask_socketio import emit
+
+
+def rate_limit_socket(event):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(data):
+            from app.services.presence_service import PresenceService
+            from app.services.rate_limit_service import RateLimitService
+
+            # El usuario sale del registro en memoria: sin JWT ni MongoDB
+            session = PresenceService.get_session(request.sid)
+            username = session["username"] if session else None
+
+            retry_after = RateLimitService.check(event, request.sid, username)
+            if retry_after:
+                emit("rate_limited", {
+                    "event": event,
+                    "retry_after": round(retry_after, 3),
+                    "msg": "Demasiadas solicitudes, intenta más tarde"
+                })
+                return
+
+            return func(data)
+
+        return wrapper
+
+    return decorator
+
+
+def admission_control(route, per_user=False):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            from app.services.admission_service import AdmissionService
+
+            # Con per_user=True va debajo de require_jwt_http: recibe username primero
+            username = args[0] if per_user and args else None
+
+            rejection = AdmissionService.admit(route, request.remote_addr, username)
+            if rejection:
+                status, retry_after, code, msg = rejection
+                response = jsonify({"code": code, "msg": msg})
+                response.status_code = status
+                response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+                return response
+
+            try:
+                return f(*args, **kwargs)
+            finally:
+                AdmissionService.release(route)
+
+        return decorated_function
+
+    return decorator
@@ -10,6 +10,7 @@ Cada modelo representa una entidad del dominio:
 - UserModel: Usuarios del sistema (autenticados y anónimos)
 - RoomModel: Salas de chat
 - MessageModel: Mensajes enviados en las salas
+- AttachmentModel: Metadatos de archivos adjuntos (galería de la sala)
 
 Los modelos NO se instancian directamente en la mayoría de casos.
 En su lugar, se inicializan una vez y se reutilizan en toda la app.
@@ -18,19 +19,30 @@ En su lugar, se inicializan una vez y se reutilizan en toda la app.
 from app.models.user import UserModel
 from app.models.room import RoomModel
 from app.models.message import MessageModel
+from app.models.attachment import AttachmentModel
 
 # Variable global para almacenar instancias de modelos
 _user_model = None
 _room_model = None
 _message_model = None
+_attachment_model = None
 
 
 def init_models(mongo, bcrypt):
-    global _user_model, _room_model, _message_model
+    global _user_model, _room_model, _message_model, _attachment_model
     
     _user_model = UserModel(mongo, bcrypt)
     _room_model = RoomModel(mongo)
-    _message_model = MessageModel(mongo)
+    _attachment_model = AttachmentModel(mongo)
+    _message_model = MessageModel(
+        mongo,
+        attachment_model=_attachment_model,
+        room_model=_room_model
+    )
+    
+    _user_model.ensure_indexes()
+    _message_model.ensure_indexes()
+    _attachment_model.ensure_indexes()
     
     return _user_model, _room_model, _message_model
 
@@ -50,4 +62,10 @@ def get_room_model():
 def get_message_model():
     if _message_model is None:
         raise RuntimeError()
-    return _message_model
\ No newline at end of file
+    return _message_model
+
+
+def get_attachment_model():
+    if _attachment_model is None:
+        raise RuntimeError()
+    return _attachment_model
@@ -0,0 +1,268 @@
+# app/models/attachment.py
+"""
+Modelo de Adjuntos (Attachments)
+Guarda los metadatos de cada archivo enviado en una colección propia
+e indexada, para que la galería de una sala no escanee todo el historial
+"""
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from pymongo import ASCENDING, DESCENDING
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_filter
+
+
+# Clasificación de extensiones por tipo de adjunto
+ATTACHMENT_TYPES = {
+    'image': {'jpg', 'jpeg', 'png', 'gif', 'webp', 'bmp', 'svg'},
+    'video': {'mp4', 'mov', 'avi', 'webm', 'mkv'},
+    'audio': {'mp3', 'wav', 'ogg', 'm4a'},
+    'document': {'pdf', 'doc', 'docx', 'txt', 'csv', 'xlsx', 'xls', 'ppt', 'pptx'}
+}
+
+
+class AttachmentModel:
+    """
+    Modelo para manejar los metadatos de archivos adjuntos
+    """
+
+    def __init__(self, mongo):
+        """
+        Inicializa el modelo con la conexión a MongoDB
+        """
+        self.attachments = mongo.db.attachments
+
+    def ensure_indexes(self):
+        """
+        Crea los índices usados por la galería y los filtros por tipo
+        (idempotente, se puede llamar en cada arranque)
+        """
+        self.attachments.create_index(
+            [("room", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]
+        )
+        self.attachments.create_index(
+            [("room", ASCENDING), ("type", ASCENDING),
+             ("created_at", DESCENDING), ("_id", DESCENDING)]
+        )
+        self.attachments.create_index(
+            [("uploader", ASCENDING), ("created_at", DESCENDING)]
+        )
+        self.attachments.create_index("message_id")
+
+    @staticmethod
+    def detect_type(filename):
+        """
+        Determina el tipo de adjunto a partir de la extensión
+
+        Args:
+            filename (str): Nombre o URL del archivo
+
+        Returns:
+            str: 'image', 'video', 'audio', 'document' u 'other'
+        """
+        if not filename or '.' not in filename:
+            return 'other'
+
+        extension = filename.rsplit('.', 1)[1].split('?')[0].lower()
+        for attachment_type, extensions in ATTACHMENT_TYPES.items():
+            if extension in extensions:
+                return attachment_type
+        return 'other'
+
+    def record_attachment(self, room, uploader, message_id, file_url,
+                          original_filename=None, size=None, created_at=None):
+        """
+        Registra los metadatos de un adjunto
+
+        Args:
+            room (str): Sala donde se envió
+            uploader (str): Username de quien lo envió
+            message_id (ObjectId): _id del mensaje que lo contiene
+            file_url (str): URL del archivo
+            original_filename (str): Nombre original (opcional)
+            size (int): Tamaño en bytes (opcional)
+            created_at (datetime): Fecha del mensaje (default ahora)
+
+        Returns:
+            dict: Documento del adjunto creado
+        """
+        attachment_doc = self.build_attachment(
+            room, uploader, message_id, file_url,
+            original_filename=original_filename, size=size, created_at=created_at
+        )
+        self.attachments.insert_one(attachment_doc)
+        return attachment_doc
+
+    def build_attachment(self, room, uploader, message_id, file_url,
+                         original_filename=None, size=None, created_at=None):
+        """
+        Arma el documento de un adjunto sin guardarlo (ver record_attachment)
+
+        Returns:
+            dict: Documento del adjunto
+        """
+        return {
+            "room": room,
+            "uploader": uploader,
+            "message_id": message_id,
+            "file_url": file_url,
+            "original_filename": original_filename,
+            "type": self.detect_type(original_filename or file_url),
+            "size": size,
+            "created_at": created_at or datetime.now(ZoneInfo('America/Guayaquil'))
+        }
+
+    def record_missing(self, attachment_docs):
+        """
+        Guarda los adjuntos cuyos mensajes aún no tienen registro
+        (idempotente: sirve para migrar mensajes anteriores a la colección)
+
+        Args:
+            attachment_docs (list): Documentos armados con build_attachment
+
+        Returns:
+            int: Cantidad de adjuntos creados
+        """
+        ids = [doc["message_id"] for doc in attachment_docs]
+        known = {
+            doc["message_id"] for doc in
+            self.attachments.find({"message_id": {"$in": ids}}, {"message_id": 1})
+        }
+        missing = [doc for doc in attachment_docs if doc["message_id"] not in known]
+        if missing:
+            self.attachments.insert_many(missing, ordered=False)
+        return len(missing)
+
+    def get_room_attachments(self, room, limit=50, cursor=None, file_type=None):
+        """
+        Obtiene una página de adjuntos de una sala (más recientes primero)
+
+        Args:
+            room (str): Nombre de la sala
+            limit (int): Tamaño de página
+            cursor (str): Cursor devuelto por la página anterior (opcional)
+            file_type (str): Filtrar por tipo ('image', 'video', ...) (opcional)
+
+        Returns:
+            tuple: (lista de adjuntos, next_cursor o None)
+
+        Raises:
+            ValueError: Si el cursor es inválido
+        """
+        query = {"room": room}
+        if file_type:
+            query["type"] = file_type
+
+        return self._paginate(query, limit, cursor)
+
+    def get_user_attachments(self, uploader, limit=50, cursor=None):
+        """
+        Obtiene una página de adjuntos enviados por un usuario
+
+        Args:
+            uploader (str): Username
+            limit (int): Tamaño de página
+            cursor (str): Cursor de la página anterior (opcional)
+
+        Returns:
+            tuple: (lista de adjuntos, next_cursor o None)
+        """
+        return self._paginate({"uploader": uploader}, limit, cursor)
+
+    def _paginate(self, query, limit, cursor):
+        """
+        Pagina por (created_at, _id) descendente usando el cursor opaco
+        """
+        if cursor:
+            last = decode_cursor(cursor)
+            query = {
+                "$and": [
+                    query,
+                    keyset_filter("created_at", last.get("created_at"), last.get("_id"))
+                ]
+            }
+
+        # Pedimos uno extra para saber si hay página siguiente
+        docs = list(
+            self.attachments
+            .find(query)
+            .sort([("created_at", DESCENDING), ("_id", DESCENDING)])
+            .limit(limit + 1)
+        )
+
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            last_doc = docs[-1]
+            next_cursor = encode_cursor({
+                "created_at": last_doc.get("created_at"),
+                "_id": last_doc.get("_id")
+            })
+
+        return docs, next_cursor
+
+    def delete_by_message(self, message_id):
+        """
+        Elimina los adjuntos asociados a un mensaje
+
+        Args:
+            message_id (ObjectId): _id del mensaje
+
+        Returns:
+            int: Cantidad de adjuntos eliminados
+        """
+        result = self.attachments.delete_many({"message_id": message_id})
+        return result.deleted_count
+
+    def delete_by_messages(self, message_ids):
+        """
+        Elimina los adjuntos de varios mensajes (borrados por lotes)
+
+        Args:
+            message_ids (list): Lista de _id de mensajes
+
+        Returns:
+            int: Cantidad de adjuntos eliminados
+        """
+        if not message_ids:
+            return 0
+        result = self.attachments.delete_many({"message_id": {"$in": list(message_ids)}})
+        return result.deleted_count
+
+    def delete_room_attachments(self, room):
+        """
+        Elimina todos los adjuntos de una sala
+
+        Args:
+            room (str): Nombre de la sala
+
+        Returns:
+            int: Cantidad de adjuntos eliminados
+        """
+        result = self.attachments.delete_many({"room": room})
+        return result.deleted_count
+
+    def format_attachments_for_api(self, attachments):
+        """
+        Formatea adjuntos para respuesta HTTP
+
+        Args:
+            attachments (list): Lista de documentos de adjuntos
+
+        Returns:
+            list: Lista de adjuntos formateados
+        """
+        formatted = []
+        for attachment in attachments:
+            created_at = attachment.get("created_at")
+            message_id = attachment.get("message_id")
+            formatted.append({
+                "message_id": str(message_id) if message_id else None,
+                "room": attachment.get("room"),
+                "uploader": attachment.get("uploader"),
+                "file_url": attachment.get("file_url"),
+                "original_filename": attachment.get("original_filename"),
+                "type": attachment.get("type"),
+                "size": attachment.get("size"),
+                "created_at": created_at.isoformat() if created_at else None
+            })
+        return formatted
@@ -4,8 +4,79 @@ Modelo de Mensaje
 Maneja todas las operaciones relacionadas con mensajes en MongoDB
 """
 
+import time
+from collections import Counter
 from datetime import datetime
 from zoneinfo import ZoneInfo
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app.utils.cache import TTLCache
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_filter
+
+
+class _FrozenDict(dict):
+    """dict de solo lectura (sigue siendo serializable a JSON)"""
+    
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("security_flags por defecto es de solo lectura")
+    
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+
+# Indicadores de seguridad de un mensaje sin hallazgos.
+# No se guardan en MongoDB: los formateadores inyectan esta instancia compartida
+DEFAULT_SECURITY_FLAGS = _FrozenDict({
+    'has_encryption': False,
+    'has_steganography_risk': False,
+    'has_malicious_patterns': False,
+    'has_suspicious_content': False,
+    'risk_level': 'low',
+    'issues': ()
+})
+
+
+def is_default_security_flags(flags):
+    """
+    Indica si unos security_flags no aportan información (nada detectado)
+    
+    Args:
+        flags (dict | None): Indicadores de seguridad
+    
+    Returns:
+        bool: True si equivalen a DEFAULT_SECURITY_FLAGS
+    """
+    if not flags:
+        return True
+    return (
+        set(flags) <= set(DEFAULT_SECURITY_FLAGS)
+        and not flags.get('has_encryption')
+        and not flags.get('has_steganography_risk')
+        and not flags.get('has_malicious_patterns')
+        and not flags.get('has_suspicious_content')
+        and flags.get('risk_level', 'low') == 'low'
+        and not flags.get('issues')
+    )
+
+
+# Filtro de documentos con security_flags por defecto guardados explícitamente
+_DEFAULT_FLAGS_QUERY = {
+    "security_flags.has_encryption": False,
+    "security_flags.has_steganography_risk": False,
+    "security_flags.has_malicious_patterns": False,
+    "security_flags.has_suspicious_content": False,
+    "security_flags.risk_level": "low",
+    "security_flags.issues": {"$size": 0}
+}
+
+
+# Ventana en memoria para reintentos con client_msg_id (además del índice único)
+DEDUP_WINDOW_SECONDS = 300
+DEDUP_MAX_ENTRIES = 10000
+
+# Lecturas de "últimos N mensajes": las consultas idénticas simultáneas se
+# comparten (single-flight) y, opcionalmente, se reutilizan unos ms
+READ_CACHE_MAX_ENTRIES = 1024
 
 
 class MessageModel:
@@ -13,15 +84,80 @@ class MessageModel:
     Modelo para manejar operaciones de mensajes
     """
     
-    def __init__(self, mongo):
+    def __init__(self, mongo, attachment_model=None, room_model=None):
         """
         Inicializa el modelo con la conexión a MongoDB
+        
+        Args:
+            mongo: Instancia de PyMongo
+            attachment_model (AttachmentModel): Registro de adjuntos (opcional)
+            room_model (RoomModel): Para mantener contadores de sala (opcional)
         """
         self.messages = mongo.db.messages
+        self.attachment_model = attachment_model
+        self.room_model = room_model
+        self._recent_client_ids = TTLCache(ttl=DEDUP_WINDOW_SECONDS, max_size=DEDUP_MAX_ENTRIES)
+        self._reads = TTLCache(ttl=0, max_size=READ_CACHE_MAX_ENTRIES)
+        self._read_generation = {}
+        self._start_backfill = None
+    
+    def configure_reads(self, microcache_seconds):
+        """
+        Ajusta cuánto se reutiliza una lectura ya resuelta
+        
+        Args:
+            microcache_seconds (float): Segundos de microcaché
+                (0 = solo se comparten las consultas simultáneas)
+        """
+        self._reads.ttl = microcache_seconds
+        self._reads.invalidate()
+    
+    def read_stats(self):
+        """Contadores de la caché de lecturas (ver TTLCache.stats)"""
+        return self._reads.stats()
+    
+    def _invalidate_reads(self, room):
+        # Las claves incluyen la generación: las lecturas viejas quedan inalcanzables
+        self._read_generation[room] = self._read_generation.get(room, 0) + 1
+    
+    def ensure_indexes(self):
+        """
+        Crea los índices de la colección de mensajes
+        (idempotente, se puede llamar en cada arranque)
+        """
+        # Con _id al final: los cursores ordenan por (timestamp, _id) y sin
+        # él el desempate obligaba a ordenar en memoria
+        self.messages.create_index(
+            [("room", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)]
+        )
+        self.messages.create_index(
+            [("username", ASCENDING), ("room", ASCENDING),
+             ("timestamp", DESCENDING), ("_id", DESCENDING)]
+        )
+        # Los índices anteriores sin _id quedan cubiertos por los nuevos
+        existing = self.messages.index_information()
+        for name in ("room_1_timestamp_-1", "username_1_room_1_timestamp_-1"):
+            if name in existing:
+                self.messages.drop_index(name)
+        # Secuencia por sala: única y base de lecturas por rango exactas
+        self.messages.create_index(
+            [("room", ASCENDING), ("seq", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"seq": {"$exists": True}}
+        )
+        # Historial por sala ordenado por secuencia (no parcial: también
+        # cubre las consultas sin filtro sobre seq y los mensajes sin número)
+        self.messages.create_index([("room", ASCENDING), ("seq", ASCENDING), ("_id", ASCENDING)])
+        # Reintentos idempotentes: un client_msg_id por usuario
+        self.messages.create_index(
+            [("username", ASCENDING), ("client_msg_id", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"client_msg_id": {"$exists": True}}
+        )
     
     def create_message(self, room, username, msg='', 
                       nickname=None, file_url=None, original_filename=None,
-                      security_flags=None):
+                      security_flags=None, file_size=None, client_msg_id=None):
         """
         Crea un nuevo mensaje en la base de datos
         
@@ -41,9 +177,15 @@ class MessageModel:
                     'risk_level': str,
                     'issues': list
                 }
+            file_size (int): Tamaño del adjunto en bytes (opcional)
+            client_msg_id (str): ID generado por el cliente para reintentos (opcional)
         
         Returns:
-            dict: Documento del mensaje creado
+            dict: Documento del mensaje creado (con "seq" si la sala existe)
+        
+        Raises:
+            DuplicateKeyError: Si el usuario ya envió ese client_msg_id
+                (usar create_message_once para reintentos)
         """
         message_doc = {
             "room": room,
@@ -52,41 +194,273 @@ class MessageModel:
             "msg": msg,
             "timestamp": datetime.now(ZoneInfo('America/Guayaquil')),
             "file_url": file_url,
-            "original_filename": original_filename,
-            "security_flags": security_flags or {
-                'has_encryption': False,
-                'has_steganography_risk': False,
-                'has_malicious_patterns': False,
-                'has_suspicious_content': False,
-                'risk_level': 'low',
-                'issues': []
-            }
+            "original_filename": original_filename
         }
+        # Solo se guardan si hay algo detectado (los formateadores ponen el default)
+        if not is_default_security_flags(security_flags):
+            message_doc["security_flags"] = security_flags
+        
+        if client_msg_id:
+            # Un reintento ya guardado no debe reservar secuencia (dejaría
+            # un hueco); la ventana en memoria resuelve casi todos sin MongoDB
+            if self.find_by_client_msg_id(username, client_msg_id):
+                raise DuplicateKeyError(
+                    f"client_msg_id duplicado: {username}/{client_msg_id}"
+                )
+            message_doc["client_msg_id"] = client_msg_id
+        
+        # La secuencia va en el mismo insert: ningún lector por rango ve el
+        # mensaje sin número
+        seq = self._allocate_seq(room)
+        if seq is not None:
+            message_doc["seq"] = seq
+        
+        try:
+            self.messages.insert_one(message_doc)
+        except DuplicateKeyError:
+            # Dos reintentos simultáneos pasaron la búsqueda: la secuencia
+            # queda sin usar (hueco poco frecuente), pero el contador debe cuadrar
+            if seq is not None:
+                self.room_model.increment_message_count(room, -1)
+            raise
+        
+        self._invalidate_reads(room)
+        if client_msg_id:
+            self._recent_client_ids.set((username, client_msg_id), message_doc)
+        
+        # Registrar metadatos del adjunto en su colección indexada
+        if file_url and self.attachment_model is not None:
+            self.attachment_model.record_attachment(
+                room=room,
+                uploader=username,
+                message_id=message_doc["_id"],
+                file_url=file_url,
+                original_filename=original_filename,
+                size=file_size,
+                created_at=message_doc["timestamp"]
+            )
         
-        self.messages.insert_one(message_doc)
         return message_doc
     
-    def get_room_messages(self, room, limit=100):
+    def create_message_once(self, room, username, client_msg_id, **fields):
+        """
+        Crea un mensaje solo si el cliente no lo envió antes (reintentos)
+        
+        Args:
+            room (str): Nombre de la sala
+            username (str): Username del remitente
+            client_msg_id (str): ID generado por el cliente
+            **fields: Resto de argumentos de create_message
+        
+        Returns:
+            tuple: (documento del mensaje, True si se creó ahora)
+        """
+        try:
+            # create_message busca el client_msg_id antes de reservar secuencia
+            return self.create_message(
+                room, username, client_msg_id=client_msg_id, **fields
+            ), True
+        except DuplicateKeyError:
+            # Reintento ya guardado (u otro simultáneo ganó la carrera)
+            return self.find_by_client_msg_id(username, client_msg_id), False
+    
+    def find_by_client_msg_id(self, username, client_msg_id):
+        """
+        Busca un mensaje por el ID que le dio el cliente
+        Primero en la ventana en memoria, luego en el índice único
+        
+        Returns:
+            dict | None: Documento del mensaje
+        """
+        key = (username, client_msg_id)
+        message = self._recent_client_ids.get(key)
+        if message is None:
+            message = self.messages.find_one(
+                {"username": username, "client_msg_id": client_msg_id}
+            )
+            if message:
+                self._recent_client_ids.set(key, message)
+        return message
+    
+    def _allocate_seq(self, room):
+        """
+        Asigna la siguiente secuencia de la sala (y suma al contador)
+        Las salas antiguas sin secuencia se numeran fuera del camino
+        caliente (ver configure_backfill y backfill_sequences)
+        
+        Returns:
+            int | None: Secuencia, o None si no hay modelo de sala, la sala
+                        no existe o aún se está numerando
+        """
+        if self.room_model is None:
+            return None
+        
+        seq = self.room_model.allocate_seq(room)
+        if (seq is None and self._start_backfill is not None
+                and self.room_model.needs_seq(room)):
+            self._start_backfill(room)
+            # Se reintenta siempre: aunque otro proceso haya ganado la
+            # numeración, la sala ya puede tener secuencia reservada
+            seq = self.room_model.allocate_seq(room)
+        return seq
+    
+    def configure_backfill(self, start_backfill):
+        """
+        Registra cómo lanzar la numeración de una sala antigua
+        
+        Args:
+            start_backfill (callable): start_backfill(room), no debe
+                bloquear (ej. RoomService.start_sequence_backfill)
+        """
+        self._start_backfill = start_backfill
+    
+    def backfill_sequences(self, room, batch_size=1000, pause=0,
+                           on_progress=None, sleep=time.sleep):
+        """
+        Numera los mensajes existentes de una sala antigua en orden
+        cronológico, por lotes con bulk_write
+        
+        Primero reserva la secuencia (init_seq con la cantidad de mensajes
+        sin número): desde ese momento los mensajes nuevos reciben números
+        posteriores mientras los antiguos se numeran 1..N. Los que llegaron
+        sin número durante la reserva se numeran al final con allocate_seq.
+        
+        Args:
+            room (str): Nombre de la sala
+            batch_size (int): Mensajes por lote
+            pause (float): Segundos de espera entre lotes (throttling)
+            on_progress (callable): Se llama con el total numerado tras cada lote
+            sleep (callable): Función de espera (socketio.sleep en background)
+        
+        Returns:
+            int | None: Mensajes numerados, o None si la sala no existe o
+                        ya tenía secuencia (otro proceso ganó la carrera)
+        """
+        if self.room_model is None:
+            return None
+        
+        pending = {"room": room, "seq": {"$exists": False}}
+        reserved = self.messages.count_documents(pending)
+        if not self.room_model.init_seq(room, reserved):
+            return None
+        
+        numbered = 0
+        while True:
+            batch = list(
+                self.messages.find(pending, {"_id": 1})
+                .sort([("timestamp", ASCENDING), ("_id", ASCENDING)])
+                .limit(batch_size)
+            )
+            if not batch:
+                break
+            
+            ops = []
+            for doc in batch:
+                numbered += 1
+                seq = numbered if numbered <= reserved else self.room_model.allocate_seq(room)
+                ops.append(UpdateOne(
+                    {"_id": doc["_id"], "seq": {"$exists": False}},
+                    {"$set": {"seq": seq}}
+                ))
+            self.messages.bulk_write(ops, ordered=False)
+            
+            if on_progress:
+                on_progress(numbered)
+            if pause:
+                sleep(pause)
+        
+        self._invalidate_reads(room)
+        return numbered
+    
+    def get_messages_by_seq(self, room, after_seq=0, limit=100):
+        """
+        Lectura por rango exacto de secuencia (gap detection, resync)
+        
+        Args:
+            room (str): Nombre de la sala
+            after_seq (int): Devuelve mensajes con seq > after_seq
+            limit (int): Máximo de mensajes
+        
+        Returns:
+            list: Mensajes en orden de secuencia
+        """
+        return list(
+            self.messages
+            .find({"room": room, "seq": {"$gt": after_seq}})
+            .sort("seq", ASCENDING)
+            .limit(limit)
+        )
+    
+    def get_room_messages(self, room, limit=100, version=None):
         """
         Obtiene los últimos mensajes de una sala
+        Las llamadas simultáneas con la misma sala y límite comparten una
+        sola consulta (los documentos devueltos son compartidos: no mutarlos)
         
         Args:
             room (str): Nombre de la sala
             limit (int): Cantidad máxima de mensajes (default 100)
+            version (str): ETag leído antes de la consulta; forma parte de
+                la clave, así un cuerpo cacheado nunca es anterior a él.
+                Si no se da, se usan la secuencia y el contador de la sala:
+                un mensaje enviado desde cualquier worker cambia la clave
         
         Returns:
             list: Lista de mensajes ordenados del más antiguo al más reciente
         """
+        if version is None and self.room_model is not None:
+            validators = self.room_model.get_validators(room) or {}
+            version = (validators.get("last_seq"), validators.get("message_count"))
+        key = (room, limit, self._read_generation.get(room, 0), version)
+        return list(self._reads.get_or_compute(
+            key, lambda: self._fetch_room_messages(room, limit)
+        ))
+    
+    def _fetch_room_messages(self, room, limit):
         # Obtener los últimos N mensajes ordenados de más reciente a más antiguo
+        # (índice room, seq, _id; los mensajes antiguos sin número van por _id)
         docs = list(
             self.messages
             .find({"room": room})
-            .sort("timestamp", -1)
+            .sort([("seq", DESCENDING), ("_id", DESCENDING)])
             .limit(limit)
         )
         # Revertir para que queden del más antiguo al más reciente
         return list(reversed(docs))
     
+    def get_messages_after(self, room, message_id, limit=100):
+        """
+        Obtiene los mensajes de una sala posteriores a uno dado
+        (para reanudar una conexión sin volver a pedir todo el historial)
+        
+        Args:
+            room (str): Nombre de la sala
+            message_id (ObjectId): Último mensaje que el cliente ya tiene
+            limit (int): Máximo de mensajes a devolver
+        
+        Returns:
+            list | None: Mensajes en orden cronológico, o None si
+                         message_id no existe en la sala
+        """
+        anchor = self.messages.find_one(
+            {"_id": message_id, "room": room}, {"timestamp": 1}
+        )
+        if not anchor:
+            return None
+        
+        return list(
+            self.messages
+            .find({
+                "room": room,
+                "$or": [
+                    {"timestamp": {"$gt": anchor["timestamp"]}},
+                    {"timestamp": anchor["timestamp"], "_id": {"$gt": message_id}}
+                ]
+            })
+            .sort([("timestamp", ASCENDING), ("_id", ASCENDING)])
+            .limit(limit)
+        )
+    
     def count_room_messages(self, room):
         """
         Cuenta los mensajes en una sala
@@ -111,6 +485,11 @@ class MessageModel:
             int: Cantidad de mensajes eliminados
         """
         result = self.messages.delete_many({"room": room})
+        self._invalidate_reads(room)
+        if self.attachment_model is not None:
+            self.attachment_model.delete_room_attachments(room)
+        if self.room_model is not None:
+            self.room_model.set_message_count(room, 0)
         return result.deleted_count
     
     def delete_user_messages(self, username):
@@ -123,27 +502,243 @@ class MessageModel:
         Returns:
             int: Cantidad de mensajes eliminados
         """
-        result = self.messages.delete_many({"username": username})
-        return result.deleted_count
+        return self.delete_user_messages_batched(username, pause=0)
     
-    def get_messages_with_files(self, room):
+    def delete_user_messages_batched(self, username, batch_size=500, pause=0.05,
+                                     on_progress=None, sleep=time.sleep):
         """
-        Obtiene solo los mensajes que tienen archivos adjuntos
+        Elimina los mensajes de un usuario en lotes acotados
+        
+        Args:
+            username (str): Username del usuario
+            batch_size (int): Mensajes por lote
+            pause (float): Segundos de espera entre lotes (throttling)
+            on_progress (callable): Se llama con el total eliminado tras cada lote
+            sleep (callable): Función de espera (socketio.sleep en background)
+        
+        Returns:
+            int: Cantidad de mensajes eliminados
+        """
+        return self._delete_batched(
+            {"username": username}, batch_size, pause, on_progress, sleep
+        )
+    
+    def delete_room_messages_batched(self, room, batch_size=500, pause=0.05,
+                                     on_progress=None, sleep=time.sleep):
+        """
+        Elimina los mensajes de una sala en lotes acotados
         
         Args:
             room (str): Nombre de la sala
+            batch_size (int): Mensajes por lote
+            pause (float): Segundos de espera entre lotes (throttling)
+            on_progress (callable): Se llama con el total eliminado tras cada lote
+            sleep (callable): Función de espera (socketio.sleep en background)
         
         Returns:
-            list: Lista de mensajes con archivos
+            int: Cantidad de mensajes eliminados
         """
-        return list(
-            self.messages
-            .find({
-                "room": room,
-                "file_url": {"$ne": None}
-            })
-            .sort("timestamp", -1)
+        deleted = self._delete_batched(
+            {"room": room}, batch_size, pause, on_progress, sleep
         )
+        self._invalidate_reads(room)
+        if self.attachment_model is not None:
+            self.attachment_model.delete_room_attachments(room)
+        return deleted
+    
+    def _delete_batched(self, query, batch_size, pause, on_progress, sleep):
+        """
+        Borra los documentos que cumplen 'query' lote a lote
+        Cada lote es un delete_many por _id, así ninguna operación mantiene
+        bloqueos de escritura largos ni genera picos de replicación
+        """
+        deleted = 0
+        while True:
+            batch = list(self.messages.find(query, {"_id": 1, "room": 1}).limit(batch_size))
+            if not batch:
+                break
+            ids = [doc["_id"] for doc in batch]
+            
+            result = self.messages.delete_many({"_id": {"$in": ids}})
+            if self.attachment_model is not None:
+                self.attachment_model.delete_by_messages(ids)
+            if self.room_model is not None:
+                for room, count in Counter(doc.get("room") for doc in batch).items():
+                    self.room_model.increment_message_count(room, -count)
+            deleted += result.deleted_count
+            
+            if on_progress:
+                on_progress(deleted)
+            if len(ids) < batch_size:
+                break
+            if pause:
+                sleep(pause)
+        
+        return deleted
+    
+    def compact_security_flags(self, batch_size=1000, on_progress=None):
+        """
+        Migración: quita los security_flags por defecto guardados en
+        mensajes antiguos (por lotes, para no bloquear la colección)
+        
+        Args:
+            batch_size (int): Documentos por lote
+            on_progress (callable): Se llama con el total compactado tras cada lote
+        
+        Returns:
+            int: Cantidad de mensajes compactados
+        """
+        compacted = 0
+        last_id = None
+        while True:
+            # Se avanza por _id: cada lote retoma donde terminó el anterior
+            # en vez de volver a recorrer el inicio de la colección
+            query = dict(_DEFAULT_FLAGS_QUERY)
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            ids = [
+                doc["_id"] for doc in
+                self.messages.find(query, {"_id": 1}).sort("_id", ASCENDING).limit(batch_size)
+            ]
+            if not ids:
+                break
+            last_id = ids[-1]
+            
+            result = self.messages.update_many(
+                {"_id": {"$in": ids}, **_DEFAULT_FLAGS_QUERY},
+                {"$unset": {"security_flags": ""}}
+            )
+            compacted += result.modified_count
+            if on_progress:
+                on_progress(compacted)
+            if len(ids) < batch_size:
+                break
+        
+        return compacted
+    
+    def backfill_attachments(self, batch_size=1000, on_progress=None):
+        """
+        Migración: registra en la colección de adjuntos los archivos de
+        mensajes anteriores a ella (por lotes según _id, idempotente)
+        
+        Args:
+            batch_size (int): Mensajes por lote
+            on_progress (callable): Se llama con el total registrado tras cada lote
+        
+        Returns:
+            int: Cantidad de adjuntos registrados
+        """
+        if self.attachment_model is None:
+            return 0
+        
+        recorded = 0
+        last_id = None
+        while True:
+            query = {"file_url": {"$ne": None}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            batch = list(
+                self.messages
+                .find(query, {"room": 1, "username": 1, "file_url": 1,
+                              "original_filename": 1, "timestamp": 1})
+                .sort("_id", ASCENDING)
+                .limit(batch_size)
+            )
+            if not batch:
+                break
+            last_id = batch[-1]["_id"]
+            
+            recorded += self.attachment_model.record_missing([
+                self.attachment_model.build_attachment(
+                    room=doc.get("room"),
+                    uploader=doc.get("username"),
+                    message_id=doc["_id"],
+                    file_url=doc["file_url"],
+                    original_filename=doc.get("original_filename"),
+                    created_at=doc.get("timestamp")
+                )
+                for doc in batch
+            ])
+            if on_progress:
+                on_progress(recorded)
+            if len(batch) < batch_size:
+                break
+        
+        return recorded
+    
+    def delete_message(self, message_id):
+        """
+        Elimina un mensaje y sus adjuntos
+        
+        Args:
+            message_id (ObjectId): _id del mensaje
+        
+        Returns:
+            bool: True si se eliminó
+        """
+        message = self.messages.find_one_and_delete({"_id": message_id}, {"room": 1})
+        if not message:
+            return False
+        self._invalidate_reads(message.get("room"))
+        if self.attachment_model is not None:
+            self.attachment_model.delete_by_message(message_id)
+        if self.room_model is not None:
+            self.room_model.increment_message_count(message.get("room"), -1)
+        return True
+    
+    def get_messages_with_files(self, room, limit=50, cursor=None, file_type=None):
+        """
+        Obtiene una página de los mensajes que tienen archivos adjuntos
+        Usa la colección indexada de adjuntos en vez de escanear el historial
+        
+        Args:
+            room (str): Nombre de la sala
+            limit (int): Tamaño de página (default 50)
+            cursor (str): Cursor devuelto por la página anterior (opcional)
+            file_type (str): Filtrar por tipo de adjunto (opcional)
+        
+        Returns:
+            tuple: (lista de mensajes con archivos más recientes primero,
+                    next_cursor o None)
+        
+        Raises:
+            ValueError: Si el cursor es inválido
+        """
+        if self.attachment_model is None:
+            query = {"room": room, "file_url": {"$ne": None}}
+            if cursor:
+                last = decode_cursor(cursor)
+                query = {
+                    "$and": [
+                        query,
+                        keyset_filter("timestamp", last.get("timestamp"), last.get("_id"))
+                    ]
+                }
+            docs = list(
+                self.messages
+                .find(query)
+                .sort([("timestamp", DESCENDING), ("_id", DESCENDING)])
+                .limit(limit + 1)
+            )
+            next_cursor = None
+            if len(docs) > limit:
+                docs = docs[:limit]
+                next_cursor = encode_cursor({
+                    "timestamp": docs[-1].get("timestamp"),
+                    "_id": docs[-1].get("_id")
+                })
+            return docs, next_cursor
+        
+        attachments, next_cursor = self.attachment_model.get_room_attachments(
+            room, limit=limit, cursor=cursor, file_type=file_type
+        )
+        ids = [a["message_id"] for a in attachments]
+        by_id = {
+            doc["_id"]: doc
+            for doc in self.messages.find({"_id": {"$in": ids}})
+        }
+        # Conservar el orden de la galería; ignorar adjuntos huérfanos
+        return [by_id[i] for i in ids if i in by_id], next_cursor
     
     def search_messages(self, room, search_term):
         """
@@ -165,25 +760,67 @@ class MessageModel:
             .sort("timestamp", -1)
         )
     
-    def get_messages_by_user(self, room, username):
+    def get_messages_by_user(self, room, username, limit=100):
         """
-        Obtiene todos los mensajes de un usuario en una sala
+        Obtiene los mensajes más recientes de un usuario en una sala
         
         Args:
             room (str): Nombre de la sala
             username (str): Username del usuario
+            limit (int): Cantidad máxima de mensajes (default 100)
         
         Returns:
-            list: Lista de mensajes del usuario
+            list: Lista de mensajes del usuario (más recientes primero)
         """
-        return list(
+        messages, _ = self.get_user_history(username, room=room, limit=limit)
+        return messages
+    
+    def get_user_history(self, username, room=None, limit=50, cursor=None):
+        """
+        Obtiene una página del historial de un usuario
+        Usa el índice (username, room, timestamp) cuando se indica la sala
+        
+        Args:
+            username (str): Username del usuario
+            room (str): Nombre de la sala (opcional, recomendado)
+            limit (int): Tamaño de página
+            cursor (str): Cursor devuelto por la página anterior (opcional)
+        
+        Returns:
+            tuple: (lista de mensajes más recientes primero, next_cursor o None)
+        
+        Raises:
+            ValueError: Si el cursor es inválido
+        """
+        query = {"username": username}
+        if room:
+            query["room"] = room
+        
+        if cursor:
+            last = decode_cursor(cursor)
+            query = {
+                "$and": [
+                    query,
+                    keyset_filter("timestamp", last.get("timestamp"), last.get("_id"))
+                ]
+            }
+        
+        docs = list(
             self.messages
-            .find({
-                "room": room,
-                "username": username
-            })
-            .sort("timestamp", -1)
+            .find(query)
+            .sort([("timestamp", DESCENDING), ("_id", DESCENDING)])
+            .limit(limit + 1)
         )
+        
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor({
+                "timestamp": docs[-1].get("timestamp"),
+                "_id": docs[-1].get("_id")
+            })
+        
+        return docs, next_cursor
     
     def format_message_for_emit(self, message_doc):
         """
@@ -194,26 +831,21 @@ class MessageModel:
         
         Returns:
             dict: Mensaje formateado para enviar al cliente
+                  (timestamp queda como datetime; lo serializa la capa JSON)
         """
-        timestamp = message_doc.get("timestamp")
-        timestamp_iso = timestamp.isoformat() if timestamp else None
+        message_id = message_doc.get("_id")
         
         return {
+            "id": str(message_id) if message_id else None,
+            "seq": message_doc.get("seq"),
             "room": message_doc.get("room"),
             "username": message_doc.get("username"),
             "nickname": message_doc.get("nickname"),
             "msg": message_doc.get("msg"),
-            "timestamp": timestamp_iso,
+            "timestamp": message_doc.get("timestamp"),
             "file_url": message_doc.get("file_url"),
             "original_filename": message_doc.get("original_filename"),
-            "security_flags": message_doc.get("security_flags", {
-                'has_encryption': False,
-                'has_steganography_risk': False,
-                'has_malicious_patterns': False,
-                'has_suspicious_content': False,
-                'risk_level': 'low',
-                'issues': []
-            })
+            "security_flags": message_doc.get("security_flags") or DEFAULT_SECURITY_FLAGS
         }
     
     def format_messages_for_api(self, messages):
@@ -225,29 +857,20 @@ class MessageModel:
         
         Returns:
             list: Lista de mensajes formateados
+                  (timestamp queda como datetime; lo serializa la capa JSON)
         """
         formatted = []
         for msg in messages:
-            ts = msg.get("timestamp")
-            ts_iso = None
-            if ts:
-                ts_iso = ts.isoformat() + "Z"
-            
             formatted.append({
+                "id": str(msg["_id"]) if msg.get("_id") else None,
+                "seq": msg.get("seq"),
                 "username": msg.get("username"),
                 "nickname": msg.get("nickname"),
                 "msg": msg.get("msg"),
-                "timestamp": ts_iso,
+                "timestamp": msg.get("timestamp"),
                 "file_url": msg.get("file_url"),
                 "original_filename": msg.get("original_filename"),
-                "security_flags": msg.get("security_flags", {
-                    'has_encryption': False,
-                    'has_steganography_risk': False,
-                    'has_malicious_patterns': False,
-                    'has_suspicious_content': False,
-                    'risk_level': 'low',
-                    'issues': []
-                })
+                "security_flags": msg.get("security_flags") or DEFAULT_SECURITY_FLAGS
             })
         
         return formatted
\ No newline at end of file
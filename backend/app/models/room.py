@@ -10,6 +10,10 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 
 
+# Filtro de salas visibles (excluye salas marcadas para eliminación)
+ACTIVE_ROOM = {"deleting": {"$ne": True}}
+
+
 class RoomModel:
     """
     Modelo para manejar operaciones de salas de chat
@@ -43,7 +47,10 @@ class RoomModel:
         if room_type not in ('text', 'multimedia'):
             raise ValueError("type inválido (usar 'text' o 'multimedia')")
         
-        if self.exists(name):
+        existing = self.rooms.find_one({"name": name})
+        if existing:
+            if existing.get("deleting"):
+                raise ValueError("room en proceso de eliminación, intenta más tarde")
             raise ValueError("room ya existe")
         
         # Generar o validar PIN
@@ -64,6 +71,8 @@ class RoomModel:
             'pin': pin,
             'type': room_type,
             'max_file_mb': max_file_mb,
+            'message_count': 0,
+            'last_seq': 0,
             'created_at': datetime.now(ZoneInfo('America/Guayaquil'))
         }
         
@@ -80,7 +89,7 @@ class RoomModel:
         Returns:
             dict | None: Documento de la sala o None
         """
-        return self.rooms.find_one({"name": name})
+        return self.rooms.find_one({"name": name, **ACTIVE_ROOM})
     
     def find_by_id(self, room_id):
         """
@@ -92,7 +101,7 @@ class RoomModel:
         Returns:
             dict | None: Documento de la sala o None
         """
-        return self.rooms.find_one({"id": room_id})
+        return self.rooms.find_one({"id": room_id, **ACTIVE_ROOM})
     
     def list_all(self):
         """
@@ -101,7 +110,7 @@ class RoomModel:
         Returns:
             list: Lista de documentos de salas
         """
-        return list(self.rooms.find({}).sort('created_at', 1))
+        return list(self.rooms.find(ACTIVE_ROOM).sort('created_at', 1))
     
     def exists(self, name):
         """
@@ -113,7 +122,7 @@ class RoomModel:
         Returns:
             bool: True si existe
         """
-        return self.rooms.find_one({"name": name}) is not None
+        return self.rooms.find_one({"name": name, **ACTIVE_ROOM}) is not None
     
     def verify_pin(self, room_name, provided_pin):
         """
@@ -204,11 +213,28 @@ class RoomModel:
         """
         from pymongo import ReturnDocument
         return self.rooms.find_one_and_update(
-            {"name": room_name},
-            {"$set": {"description": new_description}},
+            {"name": room_name, **ACTIVE_ROOM},
+            {"$set": {"description": new_description}, "$inc": {"version": 1}},
             return_document=ReturnDocument.AFTER
         )
     
+    def get_validators(self, room_name):
+        """
+        Campos que cambian cuando cambia el contenido de la sala
+        (para ETags: se leen solo estos campos pequeños)
+        
+        Args:
+            room_name (str): Nombre de la sala
+        
+        Returns:
+            dict | None: {id, version, last_seq, message_count} (los que
+                         existan), o None si la sala no existe
+        """
+        return self.rooms.find_one(
+            {"name": room_name, **ACTIVE_ROOM},
+            {"_id": 0, "id": 1, "version": 1, "last_seq": 1, "message_count": 1}
+        )
+    
     def count_all(self):
         """
         Cuenta todas las salas
@@ -216,4 +242,186 @@ class RoomModel:
         Returns:
             int: Cantidad de salas
         """
-        return self.rooms.count_documents({})
\ No newline at end of file
+        return self.rooms.count_documents(ACTIVE_ROOM)
+    
+    def mark_deleting(self, room_name):
+        """
+        Marca una sala para eliminación (tombstone)
+        La sala deja de ser visible de inmediato; sus datos se borran
+        después en segundo plano
+        
+        Args:
+            room_name (str): Nombre de la sala
+        
+        Returns:
+            dict | None: Sala marcada o None si no existe o ya se está eliminando
+        """
+        from pymongo import ReturnDocument
+        return self.rooms.find_one_and_update(
+            {"name": room_name, **ACTIVE_ROOM},
+            {"$set": {
+                "deleting": True,
+                "deleted_at": datetime.now(ZoneInfo('America/Guayaquil'))
+            }},
+            return_document=ReturnDocument.AFTER
+        )
+    
+    def list_deleting(self, before):
+        """
+        Salas marcadas para eliminación antes de una fecha
+        (su trabajo de borrado pudo quedar interrumpido)
+        
+        Args:
+            before (datetime): Marcadas antes de esta fecha
+        
+        Returns:
+            list: Nombres de las salas
+        """
+        return [
+            room["name"] for room in
+            self.rooms.find({"deleting": True, "deleted_at": {"$lt": before}}, {"name": 1})
+        ]
+    
+    def claim_deletion(self, room_name, before):
+        """
+        Reclama una eliminación interrumpida para reanudarla (atómico:
+        entre varios procesos solo uno la obtiene)
+        
+        Args:
+            room_name (str): Nombre de la sala
+            before (datetime): La marca debe ser anterior a esta fecha
+        
+        Returns:
+            bool: True si este proceso debe reanudarla
+        """
+        result = self.rooms.update_one(
+            {"name": room_name, "deleting": True, "deleted_at": {"$lt": before}},
+            {"$set": {"deleted_at": datetime.now(ZoneInfo('America/Guayaquil'))}}
+        )
+        return result.modified_count > 0
+    
+    def increment_message_count(self, room_name, delta=1):
+        """
+        Actualiza el contador de mensajes mantenido en la sala
+        Evita count_documents sobre todo el historial en resúmenes y listados
+        
+        Args:
+            room_name (str): Nombre de la sala
+            delta (int): Cantidad a sumar (negativa al borrar)
+        """
+        self.rooms.update_one(
+            {"name": room_name, "message_count": {"$exists": True}},
+            {"$inc": {"message_count": delta}}
+        )
+    
+    def allocate_seq(self, room_name):
+        """
+        Reserva el siguiente número de secuencia de la sala (atómico)
+        En la misma operación suma 1 al contador de mensajes
+        
+        Args:
+            room_name (str): Nombre de la sala
+        
+        Returns:
+            int | None: Secuencia asignada, o None si la sala no existe o
+                        es antigua y aún no tiene secuencia (ver init_seq)
+        """
+        from pymongo import ReturnDocument
+        room = self.rooms.find_one_and_update(
+            {"name": room_name, "last_seq": {"$exists": True}},
+            {"$inc": {"last_seq": 1, "message_count": 1}},
+            projection={"last_seq": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        return room["last_seq"] if room else None
+    
+    def init_seq(self, room_name, last_seq):
+        """
+        Inicializa la secuencia de una sala antigua (solo si no tenía)
+        
+        Args:
+            room_name (str): Nombre de la sala
+            last_seq (int): Última secuencia ya usada por sus mensajes
+        
+        Returns:
+            bool: True si la sala existía sin secuencia
+        """
+        result = self.rooms.update_one(
+            {"name": room_name, "last_seq": {"$exists": False}},
+            {"$set": {"last_seq": last_seq, "message_count": last_seq}}
+        )
+        return result.matched_count > 0
+    
+    def needs_seq(self, room_name):
+        """
+        Indica si la sala existe pero aún no tiene secuencia (sala antigua)
+        
+        Returns:
+            bool: True si hay que numerar sus mensajes
+        """
+        return self.rooms.count_documents(
+            {"name": room_name, "last_seq": {"$exists": False}}, limit=1
+        ) > 0
+    
+    def get_last_seq(self, room_name):
+        """
+        Obtiene la última secuencia asignada en una sala
+        
+        Returns:
+            int | None: Última secuencia, o None si la sala no la tiene
+        """
+        room = self.rooms.find_one({"name": room_name}, {"last_seq": 1})
+        return room.get("last_seq") if room else None
+    
+    def set_message_count(self, room_name, count):
+        """
+        Fija el contador de mensajes (backfill de salas antiguas sin contador)
+        
+        Args:
+            room_name (str): Nombre de la sala
+            count (int): Cantidad real de mensajes
+        """
+        self.rooms.update_one(
+            {"name": room_name},
+            {"$set": {"message_count": count}}
+        )
+    
+    def aggregate_summary(self, room_name, recent_limit=10):
+        """
+        Obtiene sala, cantidad de miembros y últimos mensajes en una sola
+        consulta de agregación (un solo round trip a MongoDB)
+        
+        Args:
+            room_name (str): Nombre de la sala
+            recent_limit (int): Cantidad de mensajes recientes
+        
+        Returns:
+            dict | None: Documento de la sala con 'recent_messages' (más
+            recientes primero) y 'members' ([{'count': n}] o []), o None
+        """
+        pipeline = [
+            {"$match": {"name": room_name, **ACTIVE_ROOM}},
+            {"$limit": 1},
+            {"$lookup": {
+                "from": "messages",
+                "let": {"room": "$name"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$room", "$$room"]}}},
+                    {"$sort": {"timestamp": -1}},
+                    {"$limit": recent_limit}
+                ],
+                "as": "recent_messages"
+            }},
+            {"$lookup": {
+                "from": "users",
+                "let": {"room": "$name"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$current_room", "$$room"]}}},
+                    {"$count": "count"}
+                ],
+                "as": "members"
+            }}
+        ]
+        
+        docs = list(self.rooms.aggregate(pipeline))
+        return docs[0] if docs else None
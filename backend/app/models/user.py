@@ -4,9 +4,22 @@ Modelo de Usuario
 Maneja todas las operaciones relacionadas con usuarios en MongoDB
 """
 
+import re
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from pymongo import ReturnDocument
+from pymongo import ReturnDocument, ASCENDING
+
+
+# Campos públicos de un usuario (nunca password ni socket_id)
+PUBLIC_USER_FIELDS = {
+    "_id": 0,
+    "username": 1,
+    "nickname": 1,
+    "is_admin": 1,
+    "is_anonymous": 1,
+    "current_room": 1,
+    "created_at": 1
+}
 
 
 class UserModel:
@@ -22,6 +35,15 @@ class UserModel:
         self.users = mongo.db.users
         self.bcrypt = bcrypt
     
+    def ensure_indexes(self):
+        """
+        Crea los índices de la colección de usuarios
+        (idempotente, se puede llamar en cada arranque)
+        """
+        self.users.create_index("username")
+        self.users.create_index("socket_id")
+        self.users.create_index("current_room")
+    
     def create_user(self, username, password, is_admin=False):
         """
         Crea un nuevo usuario en la base de datos
@@ -178,6 +200,15 @@ class UserModel:
         """
         return self.users.count_documents({"current_room": room_name})
     
+    def count_online(self):
+        """
+        Cuenta usuarios que están en alguna sala (todos los procesos)
+        
+        Returns:
+            int: Cantidad de usuarios online
+        """
+        return self.users.count_documents({"current_room": {"$ne": None}})
+    
     def create_anonymous_user(self, nickname, room_name, socket_id):
         """
         Crea un usuario anónimo temporal
@@ -259,4 +290,79 @@ class UserModel:
         return self.users.find_one({
             "socket_id": socket_id, 
             "current_room": {"$ne": None}
-        })
\ No newline at end of file
+        })
+    
+    def _listing_query(self, prefix=None, only_online=False):
+        """
+        Construye el filtro del listado de usuarios
+        El prefijo usa una regex anclada (^...) que aprovecha el índice de username
+        """
+        query = {}
+        if prefix:
+            query["username"] = {"$regex": f"^{re.escape(prefix)}"}
+        if only_online:
+            query["current_room"] = {"$ne": None}
+        return query
+    
+    def list_users_page(self, limit=100, after=None, prefix=None, only_online=False):
+        """
+        Obtiene una página de usuarios ordenados por username
+        
+        Args:
+            limit (int): Tamaño de página
+            after (str): Último username de la página anterior (opcional)
+            prefix (str): Filtrar por prefijo de username (opcional)
+            only_online (bool): Solo usuarios en alguna sala
+        
+        Returns:
+            tuple: (lista de usuarios con campos públicos, hay_más)
+        """
+        query = self._listing_query(prefix, only_online)
+        if after is not None:
+            query = {"$and": [query, {"username": {"$gt": after}}]}
+        
+        docs = list(
+            self.users
+            .find(query, PUBLIC_USER_FIELDS)
+            .sort("username", ASCENDING)
+            .limit(limit + 1)
+        )
+        return docs[:limit], len(docs) > limit
+    
+    def iter_users(self, prefix=None, only_online=False, batch_size=500):
+        """
+        Recorre todos los usuarios sin cargarlos en memoria (para exportar)
+        
+        Args:
+            prefix (str): Filtrar por prefijo de username (opcional)
+            only_online (bool): Solo usuarios en alguna sala
+            batch_size (int): Documentos por lote del cursor de MongoDB
+        
+        Yields:
+            dict: Usuario con campos públicos
+        """
+        cursor = (
+            self.users
+            .find(self._listing_query(prefix, only_online), PUBLIC_USER_FIELDS)
+            .sort("username", ASCENDING)
+            .batch_size(batch_size)
+        )
+        for doc in cursor:
+            yield doc
+    
+    @staticmethod
+    def format_user_for_api(user):
+        """
+        Formatea un usuario para respuesta HTTP (sin mutar el documento)
+        
+        Args:
+            user (dict): Documento con campos públicos
+        
+        Returns:
+            dict: Usuario con created_at en ISO 8601
+        """
+        created_at = user.get("created_at")
+        return {
+            **user,
+            "created_at": created_at.isoformat() if created_at else None
+        }
@@ -7,6 +7,7 @@ Las rutas están organizadas en Blueprints por funcionalidad:
 - auth: Autenticación (registro, login, etc.)
 - rooms: Operaciones CRUD de salas
 - upload: Subida y gestión de archivos
+- jobs: Estado de trabajos en segundo plano
 
 Los Blueprints son módulos que agrupan rutas relacionadas.
 Esto hace que el código sea más organizado y escalable.
@@ -15,17 +16,20 @@ Estructura de URL:
 - /auth/*       -> auth_bp (autenticación)
 - /rooms/*      -> rooms_bp (gestión de salas)
 - /upload/*     -> upload_bp (subida de archivos)
+- /jobs/*       -> jobs_bp (trabajos en segundo plano)
 """
 
 from app.routes.auth import auth_bp
 from app.routes.rooms import rooms_bp
 from app.routes.upload import upload_bp
+from app.routes.jobs import jobs_bp
 
 # Exportar todos los blueprints
 __all__ = [
     'auth_bp',
     'rooms_bp',
-    'upload_bp'
+    'upload_bp',
+    'jobs_bp'
 ]
 
 
@@ -36,6 +40,7 @@ def register_blueprints(app):
     app.register_blueprint(auth_bp)
     app.register_blueprint(rooms_bp)
     app.register_blueprint(upload_bp)
+    app.register_blueprint(jobs_bp)
     
     print("[routes] Blueprints registrados correctamente")
 
@@ -4,16 +4,18 @@ Rutas HTTP para Autenticación
 Endpoints REST para registro, login, refresh token, etc.
 """
 
-from flask import Blueprint, request, jsonify
-from app.middleware import require_jwt_http
-from app.models import get_user_model
-from app.services import JWTService
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from app.middleware import require_jwt_http, admission_control
+from app.models import get_user_model, get_message_model
+from app.services import JWTService, JobService
+from app.utils.pagination import encode_cursor, decode_cursor
 
 # Crear Blueprint
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 
 
 @auth_bp.route('/register', methods=['POST'])
+@admission_control('register')
 def register():
     """
     POST /auth/register
@@ -84,6 +86,7 @@ def register():
 
 
 @auth_bp.route('/login', methods=['POST'])
+@admission_control('login')
 def login():
     """
     POST /auth/login
@@ -174,6 +177,7 @@ def get_current_user(username):
 
 
 @auth_bp.route('/verify', methods=['POST'])
+@admission_control('token')
 def verify_token():
     """
     POST /auth/verify
@@ -225,6 +229,7 @@ def verify_token():
 
 
 @auth_bp.route('/refresh', methods=['POST'])
+@admission_control('token')
 def refresh_token():
     """
     POST /auth/refresh
@@ -299,6 +304,7 @@ def logout(username):
 
 @auth_bp.route('/change-password', methods=['POST'])
 @require_jwt_http
+@admission_control('password', per_user=True)
 def change_password(username):
     """
     POST /auth/change-password
@@ -352,16 +358,21 @@ def change_password(username):
 
 @auth_bp.route('/users', methods=['GET'])
 @require_jwt_http
+@admission_control('users', per_user=True)
 def list_users(username):
     """
     GET /auth/users
-    Lista todos los usuarios (solo muestra info básica)
+    Lista usuarios paginados por username (solo muestra info básica)
     
     Headers:
         Authorization: Bearer <token>
     
     Query Params:
-        ?online=true  # Solo usuarios online
+        ?online=true     # Solo usuarios online
+        ?prefix=adm      # Solo usernames que empiezan por el prefijo
+        ?limit=100       # Tamaño de página (default 100, máximo 500)
+        ?cursor=...      # Cursor devuelto por la página anterior
+        ?export=true     # Exportación completa en streaming (ignora limit/cursor)
     
     Response:
         {
@@ -373,39 +384,65 @@ def list_users(username):
                     "created_at": "2025-01-15T10:30:00"
                 }
             ],
-            "total": 10
+            "total": 1,              # Usuarios en esta página
+            "next_cursor": "eyJ..."  # null si no hay más páginas
         }
     """
     only_online = request.args.get('online', 'false').lower() == 'true'
+    prefix = (request.args.get('prefix') or '').strip() or None
+    limit = request.args.get('limit', 100, type=int)
+    cursor = request.args.get('cursor')
     
-    from app.utils.database import mongo
+    user_model = get_user_model()
     
-    query = {}
-    if only_online:
-        query['current_room'] = {"$ne": None}
+    if request.args.get('export', 'false').lower() == 'true':
+        return _stream_users_export(user_model, prefix, only_online)
     
-    users = list(mongo.db.users.find(
-        query,
-        {
-            "_id": 0, 
-            "password": 0,  # No incluir contraseña
-            "socket_id": 0  # No incluir socket_id
-        }
-    ))
+    if limit < 1 or limit > 500:
+        return jsonify({'error': 'limit debe estar entre 1 y 500'}), 400
+    
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor).get('username')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     
-    # Formatear fechas
-    for user in users:
-        if user.get('created_at'):
-            user['created_at'] = user['created_at'].isoformat()
+    users, has_more = user_model.list_users_page(
+        limit=limit, after=after, prefix=prefix, only_online=only_online
+    )
+    
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor({'username': users[-1]['username']})
     
     return jsonify({
-        'users': users,
-        'total': len(users)
+        'users': [user_model.format_user_for_api(u) for u in users],
+        'total': len(users),
+        'next_cursor': next_cursor
     }), 200
 
 
+def _stream_users_export(user_model, prefix, only_online):
+    """
+    Genera la respuesta JSON usuario por usuario
+    La memoria usada es constante sin importar cuántos usuarios haya
+    """
+    def generate():
+        yield '{"users": ['
+        first = True
+        for user in user_model.iter_users(prefix=prefix, only_online=only_online):
+            chunk = current_app.json.dumps(user_model.format_user_for_api(user))
+            yield chunk if first else ',' + chunk
+            first = False
+        yield ']}'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json'), 200
+
+
 @auth_bp.route('/users/<target_username>', methods=['DELETE'])
 @require_jwt_http
+@admission_control('users', per_user=True)
 def delete_user(username, target_username):
     """
     DELETE /auth/users/<username>
@@ -414,9 +451,13 @@ def delete_user(username, target_username):
     Headers:
         Authorization: Bearer <token>
     
+    Query Params:
+        ?purge_messages=true  # Eliminar también sus mensajes (en segundo plano)
+    
     Response:
         {
-            "msg": "Usuario eliminado exitosamente"
+            "msg": "Usuario eliminado exitosamente",
+            "purge_job": "uuid"   # Solo si purge_messages=true (ver GET /jobs/<id>)
         }
     """
     user_model = get_user_model()
@@ -439,13 +480,66 @@ def delete_user(username, target_username):
     from app.utils.database import mongo
     mongo.db.users.delete_one({"username": target_username})
     
-    # Opcional: Eliminar mensajes del usuario
-    # message_model = get_message_model()
-    # message_model.delete_user_messages(target_username)
-    
     print(f"[delete-user] Usuario '{target_username}' eliminado por '{username}'")
     
-    return jsonify({'msg': 'Usuario eliminado exitosamente'}), 200
+    response = {'msg': 'Usuario eliminado exitosamente'}
+    
+    # Opcional: Eliminar mensajes del usuario por lotes en segundo plano
+    if request.args.get('purge_messages', 'false').lower() == 'true':
+        job = JobService.start(
+            'purge_user_messages',
+            target_username,
+            JobService.purge_user_messages,
+            requested_by=username,
+            username=target_username
+        )
+        response['purge_job'] = job['id']
+    
+    return jsonify(response), 200
+
+
+@auth_bp.route('/users/<target_username>/messages', methods=['GET'])
+@require_jwt_http
+@admission_control('users', per_user=True)
+def get_user_messages(username, target_username):
+    """
+    GET /auth/users/<username>/messages
+    Historial paginado de mensajes de un usuario
+    
+    Headers:
+        Authorization: Bearer <token>
+    
+    Query Params:
+        ?room=General    # Sala (recomendado, usa el índice username+room+timestamp)
+        ?limit=50        # Tamaño de página (default 50, máximo 200)
+        ?cursor=...      # Cursor devuelto por la página anterior
+    
+    Response:
+        {
+            "messages": [...],
+            "next_cursor": "eyJ..."   # null si no hay más páginas
+        }
+    """
+    room = request.args.get('room')
+    limit = request.args.get('limit', 50, type=int)
+    cursor = request.args.get('cursor')
+    
+    if limit < 1 or limit > 200:
+        return jsonify({'error': 'limit debe estar entre 1 y 200'}), 400
+    
+    message_model = get_message_model()
+    
+    try:
+        messages, next_cursor = message_model.get_user_history(
+            target_username, room=room, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'messages': message_model.format_messages_for_api(messages),
+        'next_cursor': next_cursor
+    }), 200
 
 
 # Manejo de errores
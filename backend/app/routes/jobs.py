@@ -0,0 +1,47 @@
+# app/routes/jobs.py
+"""
+Rutas HTTP para consultar trabajos en segundo plano
+Permite seguir el progreso de borrados masivos (mensajes de usuario, salas)
+"""
+
+from flask import Blueprint, jsonify
+from app.middleware import require_jwt_http
+from app.models import get_user_model
+from app.services import JobService
+
+# Crear Blueprint
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/jobs')
+
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+@require_jwt_http
+def get_job(username, job_id):
+    """
+    GET /jobs/<job_id>
+    Obtiene el estado y progreso de un trabajo (admin o quien lo solicitó)
+
+    Headers:
+        Authorization: Bearer <token>
+
+    Response:
+        {
+            "id": "uuid",
+            "kind": "purge_user_messages",
+            "target": "user1",
+            "status": "running",
+            "progress": {"messages_deleted": 1500},
+            "result": null,
+            "error": null,
+            "created_at": "2025-01-15T10:30:00",
+            "updated_at": "2025-01-15T10:30:05"
+        }
+    """
+    job = JobService.get(job_id)
+
+    if not job:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+
+    if job.get('requested_by') != username and not get_user_model().is_admin(username):
+        return jsonify({'error': 'No tienes permiso para ver este trabajo'}), 403
+
+    return jsonify(JobService.format_job(job)), 200
@@ -4,20 +4,26 @@ Rutas HTTP para manejo de Salas (Rooms)
 Endpoints REST para crear, listar, eliminar salas
 """
 
-from flask import Blueprint, request, jsonify
-from app.middleware import require_jwt_http, require_admin
-from app.models import get_room_model, get_user_model, get_message_model
-from app.services import RoomService
+from flask import Blueprint, request, jsonify, g
+from app.middleware import require_jwt_http, require_admin, admission_control, conditional_get
+from app.models import get_room_model, get_user_model, get_message_model, get_attachment_model
+from app.services import RoomService, StatsService, BackpressureService, AdmissionService, RoomDirectoryService, CompressionService
 
 # Crear Blueprint (agrupa rutas relacionadas)
 rooms_bp = Blueprint('rooms', __name__, url_prefix='/rooms')
 
 
 @rooms_bp.route('', methods=['GET'])
+@admission_control('rooms')
+@conditional_get(lambda: RoomDirectoryService.etag())
 def list_rooms():
     """
     GET /rooms
     Lista todas las salas con estadísticas
+    (desde la caché del directorio; para seguir los cambios en vivo usar
+    el evento WebSocket "subscribe_rooms_directory")
+    
+    Soporta If-None-Match: responde 304 si el listado no cambió
     
     Response:
         {
@@ -35,7 +41,7 @@ def list_rooms():
         }
     """
     try:
-        rooms = RoomService.list_rooms_with_stats()
+        rooms = RoomDirectoryService.list_rooms()
         return jsonify({'rooms': rooms}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -43,6 +49,7 @@ def list_rooms():
 
 @rooms_bp.route('', methods=['POST'])
 @require_jwt_http
+@admission_control('rooms_admin', per_user=True)
 @require_admin
 def create_room(username):
     """
@@ -97,6 +104,7 @@ def create_room(username):
             provided_pin=provided_pin,
             max_file_mb=max_file_mb
         )
+        RoomDirectoryService.room_created(room)
         
         return jsonify({
             'msg': 'room creado',
@@ -119,10 +127,13 @@ def create_room(username):
 
 
 @rooms_bp.route('/<room_name>', methods=['GET'])
+@admission_control('rooms')
+@conditional_get(lambda room_name: RoomService.room_etag(room_name, 'details'))
 def get_room_details(room_name):
     """
     GET /rooms/<room_name>
     Obtiene detalles de una sala específica
+    Soporta If-None-Match (ETag según la versión de la sala y sus miembros)
     
     Response:
         {
@@ -136,7 +147,7 @@ def get_room_details(room_name):
             "max_file_mb": 10
         }
     """
-    details = RoomService.get_room_details_with_members(room_name)
+    details = RoomService.get_room_details_with_members(room_name, version=g.etag)
     
     if not details:
         return jsonify({'error': 'Sala no encontrada'}), 404
@@ -145,10 +156,13 @@ def get_room_details(room_name):
 
 
 @rooms_bp.route('/<room_name>/summary', methods=['GET'])
+@admission_control('rooms')
+@conditional_get(lambda room_name: RoomService.room_etag(room_name, 'summary'))
 def get_room_summary(room_name):
     """
     GET /rooms/<room_name>/summary
     Obtiene resumen completo de una sala (detalles + estadísticas + mensajes recientes)
+    Soporta If-None-Match (ETag según versión, miembros y última secuencia)
     
     Response:
         {
@@ -160,7 +174,7 @@ def get_room_summary(room_name):
             "recent_messages": [...]
         }
     """
-    summary = RoomService.get_room_summary(room_name)
+    summary = RoomService.get_room_summary(room_name, version=g.etag)
     
     if not summary:
         return jsonify({'error': 'Sala no encontrada'}), 404
@@ -169,10 +183,16 @@ def get_room_summary(room_name):
 
 
 @rooms_bp.route('/<room_name>/messages', methods=['GET'])
+@admission_control('rooms')
+@conditional_get(lambda room_name: RoomService.room_etag(
+    room_name, 'messages', request.args.get('limit', 100, type=int)
+))
 def get_room_messages(room_name):
     """
     GET /rooms/<room_name>/messages
     Obtiene los mensajes de una sala
+    Soporta If-None-Match (ETag según la última secuencia, el contador,
+    así un borrado también lo cambia, y el limit pedido)
     
     Query Params:
         ?limit=100  # Cantidad de mensajes (default 100)
@@ -198,50 +218,108 @@ def get_room_messages(room_name):
         return jsonify({'error': 'Límite máximo: 500 mensajes'}), 400
     
     message_model = get_message_model()
-    messages = message_model.get_room_messages(room_name, limit=limit)
+    messages = message_model.get_room_messages(room_name, limit=limit, version=g.etag)
     formatted = message_model.format_messages_for_api(messages)
     
     return jsonify({'messages': formatted}), 200
 
 
+@rooms_bp.route('/<room_name>/attachments', methods=['GET'])
+@admission_control('rooms')
+def get_room_attachments(room_name):
+    """
+    GET /rooms/<room_name>/attachments
+    Galería paginada de archivos adjuntos de una sala
+
+    Query Params:
+        ?limit=50        # Tamaño de página (default 50, máximo 200)
+        ?cursor=...      # Cursor devuelto por la página anterior
+        ?type=image      # Filtrar por tipo: image, video, audio, document, other
+
+    Response:
+        {
+            "attachments": [
+                {
+                    "message_id": "65a...",
+                    "uploader": "admin",
+                    "file_url": "https://...",
+                    "original_filename": "foto.png",
+                    "type": "image",
+                    "size": 204800,
+                    "created_at": "2025-01-15T10:30:00"
+                }
+            ],
+            "next_cursor": "eyJ..."   # null si no hay más páginas
+        }
+    """
+    limit = request.args.get('limit', 50, type=int)
+    cursor = request.args.get('cursor')
+    file_type = request.args.get('type')
+
+    if limit < 1 or limit > 200:
+        return jsonify({'error': 'limit debe estar entre 1 y 200'}), 400
+
+    # Salas inexistentes o en proceso de eliminación
+    if not get_room_model().exists(room_name):
+        return jsonify({'error': 'Sala no encontrada'}), 404
+
+    attachment_model = get_attachment_model()
+
+    try:
+        attachments, next_cursor = attachment_model.get_room_attachments(
+            room_name, limit=limit, cursor=cursor, file_type=file_type
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'attachments': attachment_model.format_attachments_for_api(attachments),
+        'next_cursor': next_cursor
+    }), 200
+
+
 @rooms_bp.route('/<room_name>', methods=['DELETE'])
 @require_jwt_http
+@admission_control('rooms_admin', per_user=True)
 @require_admin
 def delete_room(username, room_name):
     """
     DELETE /rooms/<room_name>
     Elimina una sala y todos sus datos relacionados (solo admin)
     
+    La sala se oculta de inmediato y sus mensajes se borran por lotes
+    en segundo plano. El progreso se consulta en GET /jobs/<job_id>.
+    
     Headers:
         Authorization: Bearer <token>
     
-    Response:
+    Response (202):
         {
-            "msg": "Sala eliminada exitosamente",
-            "stats": {
-                "room_deleted": true,
-                "messages_deleted": 120,
-                "users_cleared": 5
-            }
+            "msg": "Eliminación de sala en curso",
+            "job_id": "uuid",
+            "status": "running",
+            "stats": null    # Resultado final cuando status == "done":
+                             # {"room_deleted": true, "messages_deleted": 120,
+                             #  "users_cleared": 5}
         }
     """
-    room_model = get_room_model()
+    # Marcar la sala y lanzar el borrado en segundo plano
+    job = RoomService.start_room_deletion(room_name, requested_by=username)
     
-    # Verificar que existe
-    if not room_model.exists(room_name):
+    if not job:
         return jsonify({'error': 'Sala no encontrada'}), 404
     
-    # Eliminar en cascada
-    stats = RoomService.delete_room_cascade(room_name)
-    
     return jsonify({
-        'msg': 'Sala eliminada exitosamente',
-        'stats': stats
-    }), 200
+        'msg': 'Eliminación de sala en curso',
+        'job_id': job['id'],
+        'status': job['status'],
+        'stats': job.get('result')
+    }), 202
 
 
 @rooms_bp.route('/<room_name>', methods=['PATCH'])
 @require_jwt_http
+@admission_control('rooms_admin', per_user=True)
 @require_admin
 def update_room(username, room_name):
     """
@@ -274,6 +352,9 @@ def update_room(username, room_name):
     if not updated_room:
         return jsonify({'error': 'Sala no encontrada'}), 404
     
+    RoomService.invalidate_reads(room_name)
+    RoomDirectoryService.room_updated(updated_room)
+    
     return jsonify({
         'msg': 'Sala actualizada',
         'room': {
@@ -284,6 +365,7 @@ def update_room(username, room_name):
 
 
 @rooms_bp.route('/<room_name>/members', methods=['GET'])
+@admission_control('rooms')
 def get_room_members(room_name):
     """
     GET /rooms/<room_name>/members
@@ -329,10 +411,12 @@ def get_room_members(room_name):
 
 @rooms_bp.route('/stats', methods=['GET'])
 @require_jwt_http
+@admission_control('rooms', per_user=True)
 def get_global_stats(username):
     """
     GET /rooms/stats
     Obtiene estadísticas globales del sistema
+    (servidas desde una caché de TTL corto, ver STATS_CACHE_TTL_SECONDS)
     
     Headers:
         Authorization: Bearer <token>
@@ -341,23 +425,45 @@ def get_global_stats(username):
         {
             "total_rooms": 5,
             "total_messages": 1250,
-            "total_users_online": 12
+            "total_users_online": 12,
+            "outbound": {                       # backpressure de este proceso
+                "queued_packets": 3,
+                "deepest_queue": 2,
+                "saturated_connections": 0,
+                "max_queue_depth": 40,
+                "dropped_events": 17,
+                "dropped_by_event": {"typing_state": 17},
+                "slow_consumers_disconnected": 1
+            },
+            "admission": {                      # control de admisión HTTP
+                "loop_lag_ms": 1.3,
+                "in_flight": {"upload": 2},
+                "rejected": {"busy": 4}
+            },
+            "reads": {                          # single-flight de lecturas
+                "rooms": {"hits": 80, "computed": 12, "coalesced": 230, "size": 4},
+                "messages": {"hits": 0, "computed": 40, "coalesced": 95, "size": 6}
+            },
+            "compression": {                    # respuestas HTTP comprimidas
+                "encodings": ["gzip"],
+                "by_encoding": {
+                    "gzip": {"responses": 20, "cache_hits": 12, "skipped": 0,
+                             "bytes_in": 2400000, "bytes_out": 310000,
+                             "bytes_saved": 2090000, "ratio": 0.129,
+                             "cpu_ms": 41.5, "cpu_us_per_kb_saved": 20.33}
+                }
+            }
         }
     """
-    room_model = get_room_model()
-    message_model = get_message_model()
-    
-    from app.utils.database import mongo
-    
-    total_rooms = room_model.count_all()
-    total_messages = mongo.db.messages.count_documents({})
-    users_online = mongo.db.users.count_documents({"current_room": {"$ne": None}})
-    
-    return jsonify({
-        'total_rooms': total_rooms,
-        'total_messages': total_messages,
-        'total_users_online': users_online
-    }), 200
+    stats = dict(StatsService.get_global_stats())
+    stats['outbound'] = BackpressureService.stats()
+    stats['admission'] = AdmissionService.stats()
+    stats['reads'] = {
+        'rooms': RoomService.read_stats(),
+        'messages': get_message_model().read_stats()
+    }
+    stats['compression'] = CompressionService.stats()
+    return jsonify(stats), 200
 
 
 # Manejo de errores específico del blueprint
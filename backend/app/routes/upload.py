@@ -6,7 +6,7 @@ Maneja uploads a Cloudinary
 
 from flask import Blueprint, request, jsonify
 from flask_cors import cross_origin
-from app.middleware import require_jwt_http
+from app.middleware import require_jwt_http, admission_control
 from app.services import CloudinaryService, SecurityService
 
 # Crear Blueprint
@@ -16,6 +16,7 @@ upload_bp = Blueprint('upload', __name__, url_prefix='/upload')
 @upload_bp.route('', methods=['POST', 'OPTIONS'])
 @cross_origin(origins="*")
 @require_jwt_http
+@admission_control('upload', per_user=True)
 def upload_file(username):
     """
     POST /upload
@@ -123,6 +124,7 @@ def upload_file(username):
 
 @upload_bp.route('/validate', methods=['POST'])
 @require_jwt_http
+@admission_control('upload', per_user=True)
 def validate_file(username):
     """
     POST /upload/validate
@@ -189,6 +191,7 @@ def validate_file(username):
 
 @upload_bp.route('/delete', methods=['POST'])
 @require_jwt_http
+@admission_control('files', per_user=True)
 def delete_file(username):
     """
     POST /upload/delete
@@ -231,6 +234,7 @@ def delete_file(username):
 
 @upload_bp.route('/thumbnail', methods=['POST'])
 @require_jwt_http
+@admission_control('upload', per_user=True)
 def generate_thumbnail(username):
     """
     POST /upload/thumbnail
@@ -273,6 +277,7 @@ def generate_thumbnail(username):
 
 @upload_bp.route('/list', methods=['GET'])
 @require_jwt_http
+@admission_control('files', per_user=True)
 def list_user_files(username):
     """
     GET /upload/list
@@ -19,13 +19,43 @@ from app.services.jwt_service import JWTService
 from app.services.cloudinary_service import CloudinaryService
 from app.services.room_service import RoomService
 from app.services.security_service import SecurityService
+from app.services.job_service import JobService
+from app.services.presence_service import PresenceService
+from app.services.stats_service import StatsService
+from app.services.shard_service import ShardService
+from app.services.typing_service import TypingService
+from app.services.broadcast_service import BroadcastService
+from app.services.history_service import HistoryService
+from app.services.wire_service import WireService
+from app.services.backpressure_service import BackpressureService
+from app.services.rate_limit_service import RateLimitService
+from app.services.admission_service import AdmissionService
+from app.services.presence_event_service import PresenceEventService
+from app.services.members_service import MembersService
+from app.services.room_directory_service import RoomDirectoryService
+from app.services.compression_service import CompressionService
 
 # Exportar todos los servicios
 __all__ = [
     'JWTService',
     'CloudinaryService',
     'RoomService',
-    'SecurityService'
+    'SecurityService',
+    'JobService',
+    'PresenceService',
+    'StatsService',
+    'ShardService',
+    'TypingService',
+    'BroadcastService',
+    'HistoryService',
+    'WireService',
+    'BackpressureService',
+    'RateLimitService',
+    'AdmissionService',
+    'PresenceEventService',
+    'MembersService',
+    'RoomDirectoryService',
+    'CompressionService'
 ]
 
 
@@ -104,6 +134,209 @@ Ejemplo:
     )
 
 
+⏳ JobService
+-------------
+Cuando necesites:
+- Ejecutar borrados masivos sin bloquear el request HTTP
+- Consultar el progreso de un trabajo en segundo plano
+
+Ejemplo:
+    from app.services import JobService
+    
+    job = JobService.start(
+        'purge_user_messages', 'user1',
+        JobService.purge_user_messages, username='user1'
+    )
+    JobService.get(job['id'])['progress']
+
+
+👥 PresenceService
+------------------
+Cuando necesites:
+- Saber quién está en una sala sin consultar MongoDB
+- Contar usuarios online
+
+Ejemplo:
+    from app.services import PresenceService
+    
+    PresenceService.join(request.sid, 'admin', 'General')
+    PresenceService.count_in_room('General')
+
+
+📊 StatsService
+---------------
+Cuando necesites:
+- Estadísticas globales baratas y cacheadas (dashboards)
+
+Ejemplo:
+    from app.services import StatsService
+    
+    stats = StatsService.get_global_stats()
+
+
+🧭 ShardService
+---------------
+Cuando necesites:
+- Saber qué worker atiende una sala (modo multiproceso)
+- Redirigir un join a otro worker
+
+Ejemplo:
+    from app.services import ShardService
+    
+    redirect = ShardService.route('General')
+    if redirect:
+        emit("join_redirect", redirect)
+
+
+⌨️ TypingService
+----------------
+Cuando necesites:
+- Indicadores de "escribiendo..." sin una emisión por tecla
+
+Ejemplo:
+    from app.services import TypingService
+    
+    TypingService.update('General', 'admin', is_typing=True)
+    TypingService.flush()   # {'General': [{'username': 'admin', ...}]}
+
+
+📦 BroadcastService
+-------------------
+Cuando necesites:
+- Agrupar mensajes de salas con ráfagas en un solo "messages_batch"
+
+Ejemplo:
+    from app.services import BroadcastService
+    
+    BroadcastService.publish(socketio, 'General', formatted_message, window=0.025)
+
+
+🕘 HistoryService
+-----------------
+Cuando necesites:
+- Los mensajes recientes de una sala sin consultar MongoDB
+- Reenviar solo lo que un cliente se perdió tras reconectarse
+
+Ejemplo:
+    from app.services import HistoryService
+    
+    missed = HistoryService.missed_since('General', last_seq=41)
+    if missed is None:
+        pass  # hueco demasiado grande: pedir historial completo
+
+
+📡 WireService
+--------------
+Cuando necesites:
+- Enviar "message"/"messages_batch" respetando el formato de cada socket
+  (JSON o msgpack compacto negociado al conectar)
+
+Ejemplo:
+    from app.services import WireService
+    
+    WireService.broadcast(emit, "message", 'General', formatted_message)
+
+
+🚦 BackpressureService
+----------------------
+Cuando necesites:
+- Proteger el proceso de clientes que dejaron de leer
+- Métricas de colas de salida, eventos descartados y desconexiones
+
+Ejemplo:
+    from app.services import BackpressureService
+    
+    BackpressureService.install(socketio.server, app.config)
+    BackpressureService.stats()['dropped_events']
+
+
+⏱️ RateLimitService
+-------------------
+Cuando necesites:
+- Limitar la frecuencia de un evento por socket y por usuario
+  (normalmente vía el decorador @rate_limit_socket("evento"))
+
+Ejemplo:
+    from app.services import RateLimitService
+    
+    retry_after = RateLimitService.check('send_message', sid, username)
+    if retry_after:
+        emit("rate_limited", {"event": 'send_message', "retry_after": retry_after})
+
+
+🛂 AdmissionService
+-------------------
+Cuando necesites:
+- Proteger una ruta HTTP cara (bcrypt, uploads) con límites por IP/usuario,
+  concurrencia máxima y rechazo cuando el event loop va con retraso
+  (normalmente vía el decorador @admission_control("ruta"))
+
+Ejemplo:
+    from app.services import AdmissionService
+    
+    rejection = AdmissionService.admit('upload', request.remote_addr, username)
+    if rejection is None:
+        try:
+            ...
+        finally:
+            AdmissionService.release('upload')
+
+
+👋 PresenceEventService
+-----------------------
+Cuando necesites:
+- Avisar a una sala que alguien entró, salió o se desconectó
+  (individual en salas pequeñas, "presence_delta" agrupado en grandes)
+
+Ejemplo:
+    from app.services import PresenceEventService
+    
+    if PresenceEventService.announce(socketio, emit, 'General', 'joined', payload):
+        emit("status", {"msg": "alice se unió a General"}, room='General')
+
+
+📋 MembersService
+-----------------
+Cuando necesites:
+- La lista de miembros de una sala desde memoria, paginada y versionada
+- Enviar altas/bajas como "members_delta" en lugar de la lista completa
+
+Ejemplo:
+    from app.services import MembersService
+    
+    snapshot = MembersService.snapshot('General', limit=200)
+    delta = MembersService.delta_since('General', snapshot['version'])
+
+
+🗂️ RoomDirectoryService
+-----------------------
+Cuando necesites:
+- El listado de salas sin recalcular estadísticas en cada consulta
+- Avisar a los suscriptores del directorio que una sala se creó,
+  cambió o se eliminó, o que cambiaron sus conteos
+
+Ejemplo:
+    from app.services import RoomDirectoryService
+    
+    rooms = RoomDirectoryService.list_rooms()
+    RoomDirectoryService.room_created(room)
+    RoomDirectoryService.touch('General')    # conteos en el próximo room_counts
+
+
+🗜️ CompressionService
+---------------------
+Cuando necesites:
+- Comprimir respuestas JSON grandes según Accept-Encoding (ya instalado
+  como after_request en create_app)
+- Ver cuántos bytes se ahorran y cuánta CPU cuesta por codificación
+
+Ejemplo:
+    from app.services import CompressionService
+    
+    stats = CompressionService.stats()
+    stats['by_encoding']['gzip']['cpu_us_per_kb_saved']
+
+
 =============================================================================
 PATRÓN DE USO TÍPICO
 =============================================================================
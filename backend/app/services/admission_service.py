@@ -0,0 +1,148 @@
+# app/services/admission_service.py
+"""
+Control de admisión para rutas HTTP
+Protege el tráfico en tiempo real de ráfagas de peticiones caras
+(login con bcrypt, uploads con lectura y escaneo del archivo completo):
+
+1. Lag del event loop: un monitor duerme LOOP_LAG_INTERVAL_MS y mide
+   cuánto tarde despierta. Si el retraso supera LOOP_LAG_SHED_MS, las
+   rutas controladas responden 503 hasta que el proceso se recupera.
+2. Token buckets por IP y por usuario (RateLimitService): 429.
+3. Concurrencia máxima por ruta (HTTP_CONCURRENCY_LIMITS): 503.
+
+Todas las respuestas de rechazo llevan Retry-After.
+"""
+
+import time
+import threading
+from app.utils.rate_limit import parse_policies
+
+
+class AdmissionService:
+    """
+    Lag del event loop y peticiones en curso por ruta
+    Todos los métodos son estáticos, no necesitas instanciar la clase
+    """
+
+    _lock = threading.Lock()
+    _limits = {}        # ruta -> máximo de peticiones simultáneas
+    _in_flight = {}     # ruta -> peticiones en curso
+    _shed_lag = 0.0     # segundos de lag a partir de los cuales se rechaza (0 = nunca)
+    _lag = 0.0          # último lag medido (segundos)
+    _monitor_started = False
+    _rejected = {}      # motivo -> cantidad
+
+    @staticmethod
+    def configure(config):
+        """
+        Lee límites de concurrencia y umbral de lag
+
+        Args:
+            config (dict): Configuración de la app
+        """
+        limits = parse_policies(config.get('HTTP_CONCURRENCY_LIMITS', ''))
+        with AdmissionService._lock:
+            AdmissionService._limits = {route: int(rate) for route, (rate, _) in limits.items()}
+            AdmissionService._shed_lag = config.get('LOOP_LAG_SHED_MS', 0) / 1000
+
+    @staticmethod
+    def admit(route, ip, username=None):
+        """
+        Decide si una petición entra; si entra, ocupa un lugar de la ruta
+
+        Args:
+            route (str): Nombre de la ruta ('login', 'upload', ...)
+            ip (str): IP del cliente
+            username (str): Usuario autenticado (None en rutas públicas)
+
+        Returns:
+            tuple | None: None si se admite (llamar a release al terminar),
+                          o (status, retry_after, código, mensaje) si se rechaza
+        """
+        from app.services.rate_limit_service import RateLimitService
+
+        shed_lag = AdmissionService._shed_lag
+        if shed_lag and AdmissionService._lag >= shed_lag:
+            AdmissionService._count('overloaded')
+            return 503, 1, "overloaded", "Servidor sobrecargado, intenta más tarde"
+
+        retry_after = RateLimitService.check_http(route, ip, username)
+        if retry_after:
+            AdmissionService._count('rate_limited')
+            return 429, retry_after, "rate_limited", "Demasiadas solicitudes, intenta más tarde"
+
+        with AdmissionService._lock:
+            limit = AdmissionService._limits.get(route)
+            current = AdmissionService._in_flight.get(route, 0)
+            if limit is not None and current >= limit:
+                AdmissionService._rejected['busy'] = AdmissionService._rejected.get('busy', 0) + 1
+                return 503, 1, "busy", "Demasiadas solicitudes en curso, intenta más tarde"
+            AdmissionService._in_flight[route] = current + 1
+        return None
+
+    @staticmethod
+    def release(route):
+        """Libera el lugar ocupado por una petición admitida"""
+        with AdmissionService._lock:
+            current = AdmissionService._in_flight.get(route, 0)
+            if current <= 1:
+                AdmissionService._in_flight.pop(route, None)
+            else:
+                AdmissionService._in_flight[route] = current - 1
+
+    @staticmethod
+    def ensure_lag_monitor(socketio, interval):
+        """
+        Inicia (una sola vez) el monitor de lag del event loop
+
+        Args:
+            socketio: Instancia de SocketIO (start_background_task, sleep)
+            interval (float): Segundos entre mediciones (0 = desactivado)
+        """
+        if interval <= 0:
+            return
+        with AdmissionService._lock:
+            if AdmissionService._monitor_started:
+                return
+            AdmissionService._monitor_started = True
+        socketio.start_background_task(AdmissionService._lag_loop, socketio, interval)
+
+    @staticmethod
+    def _lag_loop(socketio, interval):
+        while True:
+            start = time.monotonic()
+            socketio.sleep(interval)
+            AdmissionService.record_lag(time.monotonic() - start - interval)
+
+    @staticmethod
+    def record_lag(lag):
+        """Registra una medición de lag (segundos)"""
+        AdmissionService._lag = max(0.0, lag)
+
+    @staticmethod
+    def _count(reason):
+        with AdmissionService._lock:
+            AdmissionService._rejected[reason] = AdmissionService._rejected.get(reason, 0) + 1
+
+    @staticmethod
+    def stats():
+        """
+        Estado de admisión de este proceso
+
+        Returns:
+            dict: {'loop_lag_ms', 'in_flight', 'rejected'}
+        """
+        with AdmissionService._lock:
+            return {
+                'loop_lag_ms': round(AdmissionService._lag * 1000, 1),
+                'in_flight': dict(AdmissionService._in_flight),
+                'rejected': dict(AdmissionService._rejected)
+            }
+
+    @staticmethod
+    def reset():
+        """Limpia contadores y lag medido (útil en tests)"""
+        with AdmissionService._lock:
+            AdmissionService._in_flight.clear()
+            AdmissionService._rejected.clear()
+            AdmissionService._lag = 0.0
@@ -0,0 +1,180 @@
+# app/services/backpressure_service.py
+"""
+Control de salida hacia clientes lentos (backpressure)
+Cada socket de Engine.IO tiene una cola de paquetes pendientes de
+escribir. Si el cliente deja de leer (móvil en segundo plano, red
+saturada) la cola crece sin límite dentro del proceso.
+
+Con marcas de agua por conexión:
+- Cola >= OUTBOUND_HIGH_WATERMARK: el socket queda "saturado" y se
+  descartan los eventos no esenciales (typing_state, status)
+- Cola <= OUTBOUND_LOW_WATERMARK: vuelve a recibir todo
+- Saturado por más de SLOW_CONSUMER_GRACE_SECONDS, o cola >=
+  OUTBOUND_MAX_QUEUE: se desconecta (el cliente reconecta y usa resync)
+
+Los eventos esenciales (mensajes, acks, errores) nunca se descartan.
+"""
+
+import time
+import threading
+from socketio import packet as sio_packet
+
+
+# Eventos que se pueden perder sin romper el estado del cliente
+DROPPABLE_EVENTS = frozenset({'typing_state', 'status'})
+
+
+class BackpressureService:
+    """
+    Contabilidad de la cola de salida por conexión
+    Todos los métodos son estáticos, no necesitas instanciar la clase
+    """
+
+    _lock = threading.Lock()
+    _saturated = {}     # eio_sid -> instante (monotónico) en que se saturó
+    _dropped = {}       # evento -> cantidad descartada
+    _disconnected = 0
+    _max_depth = 0
+    _server = None      # servidor instalado (para medir colas en stats)
+
+    @staticmethod
+    def install(server, config):
+        """
+        Envuelve el envío de paquetes de un servidor Socket.IO
+
+        Args:
+            server: socketio.Server (socketio.server de Flask-SocketIO)
+            config (dict): Configuración de la app
+
+        Returns:
+            bool: True si se instaló, False si está desactivado
+        """
+        high = config.get('OUTBOUND_HIGH_WATERMARK', 0)
+        if high <= 0 or getattr(server, '_backpressure_installed', False):
+            return False
+
+        limits = {
+            'high': high,
+            'low': min(config.get('OUTBOUND_LOW_WATERMARK', high // 2), high),
+            'max': max(config.get('OUTBOUND_MAX_QUEUE', high * 4), high),
+            'grace': config.get('SLOW_CONSUMER_GRACE_SECONDS', 10.0)
+        }
+        send_packet = server._send_packet
+
+        def guarded_send_packet(eio_sid, pkt):
+            if BackpressureService.admit(server, eio_sid, pkt, limits):
+                send_packet(eio_sid, pkt)
+
+        server._send_packet = guarded_send_packet
+        server._backpressure_installed = True
+        BackpressureService._server = server
+        return True
+
+    @staticmethod
+    def queue_depth(server, eio_sid):
+        """
+        Paquetes pendientes de escribir hacia un cliente
+
+        Returns:
+            int: Tamaño de la cola (0 si el socket ya no existe)
+        """
+        socket = server.eio.sockets.get(eio_sid)
+        if socket is None:
+            return 0
+        return socket.queue.qsize()
+
+    @staticmethod
+    def event_name(pkt):
+        """Nombre del evento de un paquete Socket.IO (None si no es evento)"""
+        if pkt.packet_type in (sio_packet.EVENT, sio_packet.BINARY_EVENT) \
+                and isinstance(pkt.data, list) and pkt.data:
+            return pkt.data[0]
+        return None
+
+    @staticmethod
+    def admit(server, eio_sid, pkt, limits, now=None):
+        """
+        Decide si un paquete se encola hacia el cliente
+
+        Args:
+            server: socketio.Server
+            eio_sid (str): Engine.IO session id del destinatario
+            pkt: Paquete Socket.IO
+            limits (dict): {'high', 'low', 'max', 'grace'}
+            now (float): Instante monotónico (tests)
+
+        Returns:
+            bool: True si se envía, False si se descarta
+        """
+        depth = BackpressureService.queue_depth(server, eio_sid)
+        now = time.monotonic() if now is None else now
+        event = BackpressureService.event_name(pkt)
+
+        with BackpressureService._lock:
+            if depth > BackpressureService._max_depth:
+                BackpressureService._max_depth = depth
+
+            since = BackpressureService._saturated.get(eio_sid)
+            if since is None and depth >= limits['high']:
+                since = BackpressureService._saturated[eio_sid] = now
+            elif since is not None and depth <= limits['low']:
+                del BackpressureService._saturated[eio_sid]
+                since = None
+
+            if since is None:
+                return True
+
+            stalled = depth >= limits['max'] or now - since >= limits['grace']
+            if stalled:
+                del BackpressureService._saturated[eio_sid]
+                BackpressureService._disconnected += 1
+            elif event in DROPPABLE_EVENTS:
+                BackpressureService._dropped[event] = BackpressureService._dropped.get(event, 0) + 1
+                return False
+            else:
+                return True
+
+        # Fuera del lock y del emit en curso: el cierre dispara "disconnect"
+        print(f"[backpressure] cliente lento desconectado eio_sid={eio_sid} cola={depth}")
+        server.start_background_task(server.eio.disconnect, eio_sid)
+        return False
+
+    @staticmethod
+    def forget(eio_sid):
+        """Olvida el estado de una conexión cerrada"""
+        with BackpressureService._lock:
+            BackpressureService._saturated.pop(eio_sid, None)
+
+    @staticmethod
+    def stats():
+        """
+        Métricas de la cola de salida
+
+        Returns:
+            dict: {'queued_packets', 'deepest_queue', 'saturated_connections',
+                   'max_queue_depth', 'dropped_events', 'dropped_by_event',
+                   'slow_consumers_disconnected'}
+        """
+        server = BackpressureService._server
+        depths = [s.queue.qsize() for s in list(server.eio.sockets.values())] if server else []
+
+        with BackpressureService._lock:
+            return {
+                'queued_packets': sum(depths),
+                'deepest_queue': max(depths, default=0),
+                'saturated_connections': len(BackpressureService._saturated),
+                'max_queue_depth': BackpressureService._max_depth,
+                'dropped_events': sum(BackpressureService._dropped.values()),
+                'dropped_by_event': dict(BackpressureService._dropped),
+                'slow_consumers_disconnected': BackpressureService._disconnected
+            }
+
+    @staticmethod
+    def reset():
+        """Limpia estado y métricas (útil en tests)"""
+        with BackpressureService._lock:
+            BackpressureService._saturated.clear()
+            BackpressureService._dropped.clear()
+            BackpressureService._disconnected = 0
+            BackpressureService._max_depth = 0
+            BackpressureService._server = None
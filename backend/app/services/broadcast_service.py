@@ -0,0 +1,98 @@
+# app/services/broadcast_service.py
+"""
+Broadcast de mensajes por lotes (opcional, BROADCAST_BATCH_WINDOW_MS > 0)
+En salas con ráfagas, los mensajes que llegan dentro de una ventana
+corta se envían juntos en un solo evento "messages_batch" en lugar de
+un paquete por mensaje y por miembro.
+
+Las salas tranquilas no pagan latencia extra: si no hubo envíos en la
+última ventana, el mensaje sale de inmediato como "message".
+"""
+
+import time
+import threading
+from app.services.wire_service import WireService
+
+
+class BroadcastService:
+    """
+    Buffers por sala para agrupar broadcasts
+    Todos los métodos son estáticos, no necesitas instanciar la clase
+    """
+
+    _lock = threading.Lock()
+    _buffers = {}       # room -> lista de mensajes pendientes
+    _last_sent = {}     # room -> instante (monotónico) del último envío
+
+    @staticmethod
+    def publish(socketio, room, message, window):
+        """
+        Envía un mensaje a la sala, agrupándolo si la sala está en ráfaga
+
+        Args:
+            socketio: Instancia de SocketIO (emit, start_background_task, sleep)
+            room (str): Sala destino
+            message (dict): Mensaje ya formateado
+            window (float): Ventana de agrupación en segundos
+
+        Returns:
+            bool: True si se envió de inmediato, False si quedó en el lote
+        """
+        now = time.monotonic()
+        with BroadcastService._lock:
+            buffer = BroadcastService._buffers.get(room)
+            if buffer is not None:
+                # Ya hay un envío programado para esta sala
+                buffer.append(message)
+                return False
+
+            elapsed = now - BroadcastService._last_sent.get(room, float('-inf'))
+            if elapsed >= window:
+                BroadcastService._last_sent[room] = now
+            else:
+                BroadcastService._buffers[room] = [message]
+
+        if elapsed >= window:
+            WireService.broadcast(socketio.emit, "message", room, message)
+            return True
+
+        socketio.start_background_task(
+            BroadcastService._flush_after, socketio, room, window - elapsed
+        )
+        return False
+
+    @staticmethod
+    def _flush_after(socketio, room, delay):
+        socketio.sleep(delay)
+        BroadcastService.flush(socketio, room)
+
+    @staticmethod
+    def flush(socketio, room):
+        """
+        Envía lo acumulado para una sala
+
+        Args:
+            socketio: Instancia de SocketIO
+            room (str): Sala
+
+        Returns:
+            int: Cantidad de mensajes enviados
+        """
+        with BroadcastService._lock:
+            batch = BroadcastService._buffers.pop(room, None)
+            if not batch:
+                return 0
+            BroadcastService._last_sent[room] = time.monotonic()
+
+        if len(batch) == 1:
+            WireService.broadcast(socketio.emit, "message", room, batch[0])
+        else:
+            WireService.broadcast(socketio.emit, "messages_batch", room, {"room": room, "messages": batch})
+        return len(batch)
+
+    @staticmethod
+    def reset():
+        """Descarta buffers y marcas de tiempo (útil en tests)"""
+        with BroadcastService._lock:
+            BroadcastService._buffers.clear()
+            BroadcastService._last_sent.clear()
@@ -0,0 +1,160 @@
+# app/services/compression_service.py
+"""
+Compresión de respuestas HTTP JSON (gzip, brotli, zstd)
+Se aplica en after_request a las respuestas 200 JSON de al menos
+COMPRESSION_MIN_BYTES, con la codificación que acepte el cliente
+(Accept-Encoding) en el orden de COMPRESSION_ENCODINGS. Las respuestas
+en streaming (ej. GET /auth/users?export=true) se envían tal cual:
+comprimirlas obligaría a cargar todo el cuerpo en memoria.
+
+Las respuestas con ETag (ver middleware/http_cache.py) se guardan ya
+comprimidas: mientras el recurso no cambie, el mismo ETag reutiliza el
+cuerpo comprimido sin volver a gastar CPU.
+
+stats() reporta por codificación los bytes ahorrados contra el tiempo de
+CPU gastado, para decidir si compensa cada codificación y nivel.
+"""
+
+import time
+import threading
+from flask import request
+from app.utils.cache import TTLCache
+from app.utils.compression import available_encodings, compress
+
+
+class CompressionService:
+    """
+    Negociación, caché de cuerpos comprimidos y métricas
+    Todos los métodos son estáticos, no necesitas instanciar la clase
+    """
+
+    _lock = threading.Lock()
+    _enabled = True
+    _min_bytes = 1024
+    _encodings = ['gzip']
+    _cache = TTLCache(ttl=60, max_size=256)
+    _stats = {}     # encoding -> contadores (ver _count)
+
+    @staticmethod
+    def configure(config):
+        """
+        Lee umbral, codificaciones y caché de la configuración
+
+        Args:
+            config (dict): Configuración de la app
+        """
+        CompressionService._enabled = config.get('COMPRESSION_ENABLED', True)
+        CompressionService._min_bytes = config.get('COMPRESSION_MIN_BYTES', 1024)
+        CompressionService._encodings = available_encodings(
+            config.get('COMPRESSION_ENCODINGS', 'zstd,br,gzip')
+        )
+        CompressionService._cache = TTLCache(
+            ttl=config.get('COMPRESSION_CACHE_TTL_SECONDS', 60),
+            max_size=config.get('COMPRESSION_CACHE_SIZE', 256)
+        )
+
+    @staticmethod
+    def compress_response(response):
+        """
+        Hook after_request: comprime la respuesta si corresponde
+
+        Args:
+            response: flask.Response
+
+        Returns:
+            flask.Response: La misma respuesta (comprimida o no)
+        """
+        if (not CompressionService._enabled
+                or response.status_code != 200
+                or response.direct_passthrough
+                or response.is_streamed
+                or response.mimetype != 'application/json'
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        size = response.content_length
+        if size is None:
+            size = len(response.get_data())
+        if size < CompressionService._min_bytes:
+            return response
+
+        # El cuerpo depende de Accept-Encoding: las cachés deben distinguirlo
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(CompressionService._encodings)
+        if encoding is None:
+            return response
+
+        etag, _ = response.get_etag()
+        key = (encoding, request.full_path, etag) if etag else None
+        body = CompressionService._cache.get(key) if key else None
+
+        if body is not None:
+            CompressionService._count(encoding, size, len(body), cpu=0.0, cached=True)
+        else:
+            data = response.get_data()
+            start = time.thread_time()
+            body = compress(encoding, data)
+            cpu = time.thread_time() - start
+            if len(body) >= size:
+                # Cuerpos poco comprimibles: no vale la pena
+                CompressionService._count(encoding, size, size, cpu=cpu, skipped=True)
+                return response
+            CompressionService._count(encoding, size, len(body), cpu=cpu)
+            if key:
+                CompressionService._cache.set(key, body)
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def _count(encoding, size_in, size_out, cpu, cached=False, skipped=False):
+        with CompressionService._lock:
+            counts = CompressionService._stats.setdefault(encoding, {
+                'responses': 0,
+                'cache_hits': 0,
+                'skipped': 0,
+                'bytes_in': 0,
+                'bytes_out': 0,
+                'cpu_seconds': 0.0
+            })
+            counts['responses'] += 1
+            counts['cache_hits'] += cached
+            counts['skipped'] += skipped
+            counts['bytes_in'] += size_in
+            counts['bytes_out'] += size_out
+            counts['cpu_seconds'] += cpu
+
+    @staticmethod
+    def stats():
+        """
+        Métricas de compresión de este proceso
+
+        Returns:
+            dict: {encodings: [...], by_encoding: {enc: {responses,
+                   cache_hits, skipped, bytes_in, bytes_out, bytes_saved,
+                   ratio, cpu_ms, cpu_us_per_kb_saved}}}
+        """
+        with CompressionService._lock:
+            by_encoding = {}
+            for encoding, counts in CompressionService._stats.items():
+                saved = counts['bytes_in'] - counts['bytes_out']
+                by_encoding[encoding] = {
+                    'responses': counts['responses'],
+                    'cache_hits': counts['cache_hits'],
+                    'skipped': counts['skipped'],
+                    'bytes_in': counts['bytes_in'],
+                    'bytes_out': counts['bytes_out'],
+                    'bytes_saved': saved,
+                    'ratio': round(counts['bytes_out'] / counts['bytes_in'], 3) if counts['bytes_in'] else None,
+                    'cpu_ms': round(counts['cpu_seconds'] * 1000, 3),
+                    'cpu_us_per_kb_saved': round(counts['cpu_seconds'] * 1e6 / (saved / 1024), 2) if saved > 0 else None
+                }
+            return {'encodings': list(CompressionService._encodings), 'by_encoding': by_encoding}
+
+    @staticmethod
+    def reset():
+        """Limpia métricas y cuerpos cacheados (útil en tests)"""
+        with CompressionService._lock:
+            CompressionService._stats.clear()
+        CompressionService._cache.invalidate()
@@ -0,0 +1,160 @@
+# app/services/history_service.py
+"""
+Historial reciente en memoria ("hot history") y reanudación de sesión
+Guarda los últimos HOT_HISTORY_SIZE mensajes de cada sala ya formateados
+para emitir, de modo que un cliente que se reconecta tras un corte
+recibe solo lo que se perdió sin consultar MongoDB.
+
+La caché solo es fiable si todos los mensajes de una sala pasan por este
+proceso: un solo worker, o modo multiproceso con afinidad de salas.
+Con una cola de mensajes sin afinidad, se usa siempre MongoDB.
+"""
+
+import threading
+from collections import deque
+from flask import current_app
+
+
+class HistoryService:
+    """
+    Caché de mensajes recientes por sala: room -> deque de mensajes
+    Todos los métodos son estáticos, no necesitas instanciar la clase
+    """
+
+    _lock = threading.Lock()
+    _rooms = {}
+
+    @staticmethod
+    def enabled():
+        """Indica si la caché en memoria refleja todos los mensajes de la sala"""
+        config = current_app.config
+        if config.get('HOT_HISTORY_SIZE', 0) <= 0:
+            return False
+        return not config.get('SOCKETIO_MESSAGE_QUEUE') or bool(config.get('SHARDING_ENABLED'))
+
+    @staticmethod
+    def recent(room):
+        """
+        Obtiene los mensajes recientes de una sala (carga desde MongoDB
+        la primera vez)
+
+        Args:
+            room (str): Nombre de la sala
+
+        Returns:
+            list: Mensajes formateados para emit, en orden cronológico
+        """
+        with HistoryService._lock:
+            cached = HistoryService._rooms.get(room)
+            if cached is not None:
+                return list(cached)
+
+        from app.models import get_message_model
+        message_model = get_message_model()
+        size = current_app.config.get('HOT_HISTORY_SIZE', 200)
+        docs = message_model.get_room_messages(room, limit=size)
+        messages = [message_model.format_message_for_emit(d) for d in docs]
+
+        with HistoryService._lock:
+            # Otro request pudo cargarla mientras tanto
+            cached = HistoryService._rooms.setdefault(room, deque(messages, maxlen=size))
+            return list(cached)
+
+    @staticmethod
+    def append(room, message):
+        """
+        Agrega un mensaje nuevo a la caché de la sala (si está cargada)
+
+        Args:
+            room (str): Sala
+            message (dict): Mensaje formateado para emit
+        """
+        with HistoryService._lock:
+            cached = HistoryService._rooms.get(room)
+            if cached is not None:
+                cached.append(message)
+
+    @staticmethod
+    def remove(room, message_id):
+        """Quita un mensaje eliminado de la caché de la sala"""
+        with HistoryService._lock:
+            cached = HistoryService._rooms.get(room)
+            if cached is not None:
+                HistoryService._rooms[room] = deque(
+                    (m for m in cached if m.get("id") != message_id), maxlen=cached.maxlen
+                )
+
+    @staticmethod
+    def drop(room=None):
+        """Descarta la caché de una sala (o de todas si room es None)"""
+        with HistoryService._lock:
+            if room is None:
+                HistoryService._rooms.clear()
+            else:
+                HistoryService._rooms.pop(room, None)
+
+    @staticmethod
+    def missed_since(room, last_message_id=None, last_seq=None, max_messages=100):
+        """
+        Calcula los mensajes que un cliente se perdió
+        Con last_seq la respuesta es exacta (rango de enteros); last_message_id
+        se mantiene para clientes que aún no conocen la secuencia
+
+        Args:
+            room (str): Sala
+            last_message_id (str): Último mensaje que el cliente recibió
+            last_seq (int): Última secuencia que el cliente recibió
+            max_messages (int): Máximo a reenviar antes de declarar el hueco muy grande
+
+        Returns:
+            list | None: Mensajes faltantes (cronológico), o None si el hueco
+                         es demasiado grande o el mensaje no se encuentra
+        """
+        if last_seq is not None:
+            return HistoryService._missed_since_seq(room, last_seq, max_messages)
+
+        from bson import ObjectId
+        from bson.errors import InvalidId
+
+        if HistoryService.enabled():
+            cached = HistoryService.recent(room)
+            for index, message in enumerate(cached):
+                if message.get("id") == last_message_id:
+                    missed = cached[index + 1:]
+                    return missed if len(missed) <= max_messages else None
+
+        # No está en la caché: hueco más viejo que la caché, o caché desactivada
+        try:
+            anchor = ObjectId(last_message_id)
+        except (InvalidId, TypeError):
+            return None
+
+        from app.models import get_message_model
+        message_model = get_message_model()
+        docs = message_model.get_messages_after(room, anchor, limit=max_messages + 1)
+        if docs is None or len(docs) > max_messages:
+            return None
+        return [message_model.format_message_for_emit(d) for d in docs]
+
+    @staticmethod
+    def _missed_since_seq(room, last_seq, max_messages):
+        from app.models import get_message_model, get_room_model
+
+        current = get_room_model().get_last_seq(room)
+        if current is None or last_seq > current:
+            return None     # sala sin secuencia o recreada: historial completo
+        if current - last_seq > max_messages:
+            return None
+        if current == last_seq:
+            return []
+
+        if HistoryService.enabled():
+            cached = HistoryService.recent(room)
+            # Entradas sin seq (cargadas antes de numerar la sala): a MongoDB
+            if (cached and all(m.get("seq") is not None for m in cached)
+                    and cached[0]["seq"] <= last_seq + 1):
+                return [m for m in cached if m["seq"] > last_seq]
+
+        message_model = get_message_model()
+        docs = message_model.get_messages_by_seq(room, after_seq=last_seq, limit=max_messages)
+        return [message_model.format_message_for_emit(d) for d in docs]
@@ -0,0 +1,201 @@
+# app/services/job_service.py
+"""
+Servicio de trabajos en segundo plano
+Ejecuta operaciones largas (borrados masivos) fuera del request HTTP
+y guarda su estado y progreso en la colección 'jobs'
+"""
+
+import uuid
+import traceback
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from flask import current_app
+
+
+class JobService:
+    """
+    Servicio para lanzar y consultar trabajos en segundo plano
+    Todos los métodos son estáticos, no necesitas instanciar la clase
+
+    Estados de un trabajo: pending -> running -> done | failed
+    """
+
+    @staticmethod
+    def _jobs():
+        from app.utils.database import mongo
+        return mongo.db.jobs
+
+    @staticmethod
+    def start(kind, target, func, requested_by=None, **kwargs):
+        """
+        Registra un trabajo y lo lanza en segundo plano
+
+        Args:
+            kind (str): Tipo de trabajo (ej. 'purge_user_messages')
+            target (str): Sobre qué actúa (username, nombre de sala...)
+            func (callable): func(job_id, **kwargs) -> dict con el resultado
+            requested_by (str): Username que lo solicitó (opcional)
+            **kwargs: Argumentos para func
+
+        Returns:
+            dict: Documento del trabajo (ya finalizado si JOBS_RUN_INLINE)
+        """
+        now = datetime.now(ZoneInfo('America/Guayaquil'))
+        job_doc = {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "target": target,
+            "requested_by": requested_by,
+            "status": "pending",
+            "progress": {},
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        JobService._jobs().insert_one(job_doc)
+
+        app = current_app._get_current_object()
+
+        if app.config.get('JOBS_RUN_INLINE'):
+            JobService._run(app, job_doc["id"], func, kwargs)
+        else:
+            from app import socketio
+            socketio.start_background_task(
+                JobService._run, app, job_doc["id"], func, kwargs
+            )
+
+        return JobService.get(job_doc["id"])
+
+    @staticmethod
+    def _run(app, job_id, func, kwargs):
+        """
+        Ejecuta el trabajo dentro de un contexto de aplicación
+        """
+        with app.app_context():
+            JobService._set(job_id, status="running")
+            try:
+                result = func(job_id, **kwargs)
+                JobService._set(job_id, status="done", result=result)
+                print(f"[job] {job_id} terminado: {result}")
+            except Exception as e:
+                traceback.print_exc()
+                JobService._set(job_id, status="failed", error=str(e))
+                print(f"[job error] {job_id}: {str(e)}")
+
+    @staticmethod
+    def _set(job_id, **fields):
+        fields["updated_at"] = datetime.now(ZoneInfo('America/Guayaquil'))
+        JobService._jobs().update_one({"id": job_id}, {"$set": fields})
+
+    @staticmethod
+    def is_active(kind, target, since):
+        """
+        Indica si hay un trabajo de ese tipo en curso que avanzó hace poco
+
+        Args:
+            kind (str): Tipo de trabajo
+            target (str): Sobre qué actúa
+            since (datetime): Solo cuentan los actualizados desde entonces
+
+        Returns:
+            bool: True si otro proceso lo está ejecutando
+        """
+        return JobService._jobs().count_documents({
+            "kind": kind,
+            "target": target,
+            "status": {"$in": ["pending", "running"]},
+            "updated_at": {"$gte": since}
+        }, limit=1) > 0
+
+    @staticmethod
+    def fail_abandoned(kind, target, before):
+        """
+        Marca como fallidos los trabajos que quedaron en curso sin avanzar
+        (el proceso que los ejecutaba se reinició)
+
+        Args:
+            kind (str): Tipo de trabajo
+            target (str): Sobre qué actúa
+            before (datetime): Sin actualizaciones desde antes de esta fecha
+
+        Returns:
+            int: Cantidad de trabajos marcados
+        """
+        result = JobService._jobs().update_many(
+            {"kind": kind, "target": target,
+             "status": {"$in": ["pending", "running"]},
+             "updated_at": {"$lt": before}},
+            {"$set": {"status": "failed", "error": "interrumpido",
+                      "updated_at": datetime.now(ZoneInfo('America/Guayaquil'))}}
+        )
+        return result.modified_count
+
+    @staticmethod
+    def update_progress(job_id, **progress):
+        """
+        Actualiza el progreso de un trabajo en curso
+
+        Args:
+            job_id (str): ID del trabajo
+            **progress: Campos de progreso (ej. messages_deleted=1500)
+        """
+        JobService._set(job_id, **{f"progress.{k}": v for k, v in progress.items()})
+
+    @staticmethod
+    def get(job_id):
+        """
+        Obtiene un trabajo por su ID
+
+        Args:
+            job_id (str): ID del trabajo
+
+        Returns:
+            dict | None: Documento del trabajo o None
+        """
+        return JobService._jobs().find_one({"id": job_id}, {"_id": 0})
+
+    @staticmethod
+    def format_job(job):
+        """
+        Formatea un trabajo para respuesta HTTP
+
+        Args:
+            job (dict): Documento del trabajo
+
+        Returns:
+            dict: Trabajo con fechas en ISO 8601
+        """
+        formatted = dict(job)
+        for field in ("created_at", "updated_at"):
+            if formatted.get(field):
+                formatted[field] = formatted[field].isoformat()
+        return formatted
+
+    @staticmethod
+    def purge_user_messages(job_id, username):
+        """
+        Trabajo: elimina los mensajes de un usuario por lotes con pausas
+
+        Args:
+            job_id (str): ID del trabajo (para reportar progreso)
+            username (str): Usuario cuyos mensajes se eliminan
+
+        Returns:
+            dict: {'messages_deleted': int}
+        """
+        from app import socketio
+        from app.models import get_message_model
+
+        config = current_app.config
+        deleted = get_message_model().delete_user_messages_batched(
+            username,
+            batch_size=config.get('JOB_BATCH_SIZE', 500),
+            pause=config.get('JOB_BATCH_PAUSE_SECONDS', 0.05),
+            on_progress=lambda n: JobService.update_progress(job_id, messages_deleted=n),
+            sleep=socketio.sleep
+        )
+        # Los mensajes borrados pueden estar en el historial en memoria de cualquier sala
+        from app.services.history_service import HistoryService
+        HistoryService.drop()
+        return {"messages_deleted": deleted}
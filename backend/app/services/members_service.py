@@ -0,0 +1,165 @@
+# app/services/members_service.py
+"""
+Suscripción a la lista de miembros de una sala
+Al entrar, el cliente recibe "members_snapshot" (página + versión); luego
+la sala recibe "members_delta" con las altas y bajas, sin volver a
+consultar MongoDB ni reenviar la lista completa.
+
+Protocolo del cliente:
+- Aplica un delta solo si delta.from_version == su versión
+- Si no coincide (se perdió un delta) envía "members_sync" con su
+  versión y recibe el delta faltante, o un snapshot si es muy viejo
+- Snapshots paginados: "members_sync" con cursor trae la página
+  siguiente; al terminar, sincroniza desde la versión de la primera página
+
+Todo sale del registro en memoria de PresenceService.
+"""
+
+import threading
+from app.utils.pagination import encode_cursor, decode_cursor
+
+
+class MembersService:
+    """
+    Publicación de snapshots y deltas de miembros
+    Todos los métodos son estáticos, no necesitas instanciar la clase
+    """
+
+    _lock = threading.Lock()
+    _flusher_started = False
+
+    @staticmethod
+    def snapshot(room, limit=200, cursor=None):
+        """
+        Página de la lista de miembros
+
+        Args:
+            room (str): Sala
+            limit (int): Tamaño de página
+            cursor (str): Cursor de la página anterior (None = primera)
+
+        Returns:
+            dict: {room, version, members, count, next_cursor}
+
+        Raises:
+            ValueError: Si el cursor es inválido
+        """
+        from app.services.presence_service import PresenceService
+
+        after = None
+        if cursor:
+            after = decode_cursor(cursor).get("username")
+            if not isinstance(after, str):
+                raise ValueError("cursor inválido")
+
+        members, version, has_more = PresenceService.members_page(room, limit=limit, after=after)
+        return {
+            "room": room,
+            "version": version,
+            "members": members,
+            "count": PresenceService.count_members(room),
+            "next_cursor": encode_cursor({"username": members[-1]["username"]}) if has_more else None
+        }
+
+    @staticmethod
+    def delta_since(room, version):
+        """
+        Cambios netos desde una versión
+
+        Args:
+            room (str): Sala
+            version (int): Versión que conoce el cliente
+
+        Returns:
+            dict | None: {room, from_version, version, added, removed}, o
+                         None si el diario ya no la cubre
+        """
+        from app.services.presence_service import PresenceService
+
+        changes = PresenceService.member_changes(room, version)
+        if changes is None:
+            return None
+
+        # Estado inicial (lo que conoce el cliente) y final de cada usuario
+        initially_present, final = {}, {}
+        for _, kind, member in changes:
+            username = member["username"]
+            initially_present.setdefault(username, kind == "removed")
+            final[username] = member if kind == "added" else None
+
+        added = [final[u] for u in sorted(final) if final[u] is not None]
+        removed = [u for u in sorted(final) if final[u] is None and initially_present[u]]
+        return {
+            "room": room,
+            "from_version": version,
+            "version": changes[-1][0] if changes else version,
+            "added": added,
+            "removed": removed
+        }
+
+    @staticmethod
+    def flush():
+        """
+        Arma los members_delta de las salas con cambios
+
+        Returns:
+            list: Deltas a emitir (uno por sala)
+        """
+        from app.services.presence_service import PresenceService
+
+        deltas = []
+        for room, since in PresenceService.take_dirty_rooms().items():
+            delta = MembersService.delta_since(room, since)
+            if delta is None:
+                # El diario ya no cubre el cambio: los clientes piden snapshot
+                delta = {
+                    "room": room,
+                    "from_version": since,
+                    "version": PresenceService.members_version(room),
+                    "reset": True
+                }
+            # Aunque no haya cambios netos se envía, para que la versión avance
+            deltas.append(delta)
+        return deltas
+
+    @staticmethod
+    def publish(socketio, emit, interval):
+        """
+        Publica los cambios pendientes: en línea (interval 0) o con la
+        tarea periódica
+
+        Args:
+            socketio: Instancia de SocketIO
+            emit (callable): flask_socketio.emit del handler actual
+            interval (float): Segundos entre publicaciones
+        """
+        if interval > 0:
+            MembersService.ensure_flusher(socketio, interval)
+            return
+        for delta in MembersService.flush():
+            emit("members_delta", delta, room=delta["room"])
+
+    @staticmethod
+    def ensure_flusher(socketio, interval):
+        """
+        Lanza (una sola vez) la tarea que emite "members_delta" cada intervalo
+
+        Args:
+            socketio: Instancia de SocketIO
+            interval (float): Segundos entre emisiones
+        """
+        with MembersService._lock:
+            if MembersService._flusher_started:
+                return
+            MembersService._flusher_started = True
+        socketio.start_background_task(MembersService._flush_loop, socketio, interval)
+
+    @staticmethod
+    def _flush_loop(socketio, interval):
+        while True:
+            socketio.sleep(interval)
+            try:
+                for delta in MembersService.flush():
+                    socketio.emit("members_delta", delta, room=delta["room"])
+            except Exception as e:
+                print(f"[members error] {str(e)}")
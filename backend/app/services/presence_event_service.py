@@ -0,0 +1,152 @@
+# app/services/presence_event_service.py
+"""
+Eventos de presencia por sala (entradas, salidas y desconexiones)
+Los avisos van solo a la sala afectada, nunca a todo el servidor, y su
+forma depende del tamaño de la sala:
+
+- Menos de PRESENCE_BATCH_MIN_MEMBERS: aviso inmediato por usuario
+  ("user_joined", "user_left", "user_disconnected") como siempre
+- Desde PRESENCE_BATCH_MIN_MEMBERS: se acumulan y salen juntos cada
+  PRESENCE_FLUSH_INTERVAL_MS como un solo "presence_delta"
+- Desde PRESENCE_SUPPRESS_MIN_MEMBERS: el delta lleva solo conteos, sin
+  la lista de usuarios
+
+Quien entra y sale dentro de la misma ventana no aparece en el delta.
+"""
+
+import threading
+
+
+class PresenceEventService:
+    """
+    Cambios de presencia pendientes: room -> {"joined": {...}, "left": {...}}
+    Todos los métodos son estáticos, no necesitas instanciar la clase
+    """
+
+    _lock = threading.Lock()
+    _pending = {}
+    _flusher_started = False
+    _batch_min = 50
+    _suppress_min = 500
+    _interval = 1.0
+
+    EVENTS = {
+        "joined": "user_joined",
+        "left": "user_left",
+        "disconnected": "user_disconnected"
+    }
+
+    @staticmethod
+    def configure(config):
+        """
+        Lee umbrales e intervalo de la configuración
+
+        Args:
+            config (dict): Configuración de la app
+        """
+        PresenceEventService._batch_min = config.get('PRESENCE_BATCH_MIN_MEMBERS', 50)
+        PresenceEventService._suppress_min = config.get('PRESENCE_SUPPRESS_MIN_MEMBERS', 500)
+        PresenceEventService._interval = config.get('PRESENCE_FLUSH_INTERVAL_MS', 1000) / 1000
+
+    @staticmethod
+    def announce(socketio, emit, room, kind, payload):
+        """
+        Anuncia un cambio de presencia en una sala
+
+        Args:
+            socketio: Instancia de SocketIO (tarea de envío periódico)
+            emit (callable): flask_socketio.emit del handler actual
+            room (str): Sala afectada
+            kind (str): 'joined', 'left' o 'disconnected'
+            payload (dict): Datos del aviso individual (username, nickname, ...)
+
+        Returns:
+            bool: True si se envió el aviso individual (sala pequeña),
+                  False si quedó para el próximo presence_delta
+        """
+        from app.services.presence_service import PresenceService
+
+        if PresenceService.count_in_room(room) < PresenceEventService._batch_min:
+            emit(PresenceEventService.EVENTS[kind], payload, room=room)
+            return True
+
+        username = payload["username"]
+        entry = {"username": username, "nickname": payload.get("nickname")}
+        with PresenceEventService._lock:
+            pending = PresenceEventService._pending.setdefault(room, {"joined": {}, "left": {}})
+            if kind == "joined":
+                if pending["left"].pop(username, None) is None:
+                    pending["joined"][username] = entry
+            elif pending["joined"].pop(username, None) is None:
+                pending["left"][username] = entry
+
+        if PresenceEventService._interval > 0:
+            PresenceEventService.ensure_flusher(socketio, PresenceEventService._interval)
+        else:
+            for delta in PresenceEventService.flush():
+                emit("presence_delta", delta, room=delta["room"])
+        return False
+
+    @staticmethod
+    def flush():
+        """
+        Arma los presence_delta pendientes
+
+        Returns:
+            list: [{room, members_count, joined_count, left_count,
+                    joined?, left?}] (las listas se omiten en salas muy grandes)
+        """
+        from app.services.presence_service import PresenceService
+
+        with PresenceEventService._lock:
+            pending, PresenceEventService._pending = PresenceEventService._pending, {}
+
+        deltas = []
+        for room, changes in pending.items():
+            joined = [changes["joined"][u] for u in sorted(changes["joined"])]
+            left = [changes["left"][u] for u in sorted(changes["left"])]
+            if not joined and not left:
+                continue
+            members_count = PresenceService.count_in_room(room)
+            delta = {
+                "room": room,
+                "members_count": members_count,
+                "joined_count": len(joined),
+                "left_count": len(left)
+            }
+            if members_count < PresenceEventService._suppress_min:
+                delta["joined"] = joined
+                delta["left"] = left
+            deltas.append(delta)
+        return deltas
+
+    @staticmethod
+    def ensure_flusher(socketio, interval):
+        """
+        Lanza (una sola vez) la tarea que emite "presence_delta" cada intervalo
+
+        Args:
+            socketio: Instancia de SocketIO
+            interval (float): Segundos entre emisiones
+        """
+        with PresenceEventService._lock:
+            if PresenceEventService._flusher_started:
+                return
+            PresenceEventService._flusher_started = True
+        socketio.start_background_task(PresenceEventService._flush_loop, socketio, interval)
+
+    @staticmethod
+    def _flush_loop(socketio, interval):
+        while True:
+            socketio.sleep(interval)
+            try:
+                for delta in PresenceEventService.flush():
+                    socketio.emit("presence_delta", delta, room=delta["room"])
+            except Exception as e:
+                print(f"[presence error] {str(e)}")
+
+    @staticmethod
+    def reset():
+        """Limpia los cambios pendientes (útil en tests)"""
+        with PresenceEventService._lock:
+            PresenceEventService._pending.clear()
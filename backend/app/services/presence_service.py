@@ -0,0 +1,285 @@
+# app/services/presence_service.py
+"""
+Servicio de presencia en memoria
+Registra qué socket está en qué sala sin consultar MongoDB
+(usuarios online, miembros de una sala, conteos por sala)
+
+Además lleva la lista de miembros (usuarios distintos) de cada sala con
+un número de versión y un diario acotado de altas/bajas, para enviar a
+los clientes deltas en lugar de la lista completa.
+
+Nota: el registro es por proceso. Con varios workers cada uno conoce
+solo los sockets conectados a él.
+"""
+
+import threading
+from collections import deque
+
+
+class PresenceService:
+    """
+    Registro de presencia: sid -> {username, nickname, room, is_anonymous}
+    Todos los métodos son estáticos, no necesitas instanciar la clase
+    """
+
+    _lock = threading.RLock()
+    _sessions = {}      # sid -> dict con datos del usuario
+    _rooms = {}         # room -> set de sids
+    _members = {}       # room -> {username: {username, nickname, is_anonymous, sids}}
+    _versions = {}      # room -> versión de la lista de miembros
+    _journal = {}       # room -> deque de (versión, 'added' | 'removed', miembro)
+    _dirty = {}         # room -> versión anterior al primer cambio sin publicar
+    JOURNAL_SIZE = 1000
+
+    @staticmethod
+    def join(sid, username, room, nickname=None, is_anonymous=False):
+        """
+        Registra que un socket entró a una sala (sale de la anterior si había)
+
+        Args:
+            sid (str): Socket ID
+            username (str): Username
+            room (str): Sala a la que entra
+            nickname (str): Nickname (usuarios anónimos)
+            is_anonymous (bool): Si es usuario anónimo
+        """
+        with PresenceService._lock:
+            PresenceService.leave(sid)
+            PresenceService._sessions[sid] = {
+                "username": username,
+                "nickname": nickname,
+                "room": room,
+                "is_anonymous": is_anonymous
+            }
+            PresenceService._rooms.setdefault(room, set()).add(sid)
+
+            members = PresenceService._members.setdefault(room, {})
+            entry = members.get(username)
+            if entry is None:
+                members[username] = {
+                    "username": username,
+                    "nickname": nickname,
+                    "is_anonymous": is_anonymous,
+                    "sids": 1
+                }
+                PresenceService._record(room, "added", username)
+            else:
+                entry["sids"] += 1
+
+    @staticmethod
+    def leave(sid):
+        """
+        Registra que un socket salió de su sala (o se desconectó)
+
+        Args:
+            sid (str): Socket ID
+
+        Returns:
+            dict | None: Datos de la sesión que salió, o None
+        """
+        with PresenceService._lock:
+            session = PresenceService._sessions.pop(sid, None)
+            if session:
+                sids = PresenceService._rooms.get(session["room"])
+                if sids is not None:
+                    sids.discard(sid)
+                    if not sids:
+                        del PresenceService._rooms[session["room"]]
+                PresenceService._remove_member(session["room"], session["username"])
+            return session
+
+    @staticmethod
+    def _remove_member(room, username):
+        members = PresenceService._members.get(room, {})
+        entry = members.get(username)
+        if entry is None:
+            return
+        entry["sids"] -= 1
+        if entry["sids"] > 0:
+            return      # sigue conectado desde otra pestaña
+        PresenceService._record(room, "removed", username)
+        del members[username]
+        if not members:
+            del PresenceService._members[room]
+
+    @staticmethod
+    def _record(room, kind, username):
+        version = PresenceService._versions.get(room, 0) + 1
+        PresenceService._versions[room] = version
+        member = PresenceService._public_member(PresenceService._members[room][username])
+        journal = PresenceService._journal.get(room)
+        if journal is None:
+            journal = PresenceService._journal[room] = deque(maxlen=PresenceService.JOURNAL_SIZE)
+        journal.append((version, kind, member))
+        PresenceService._dirty.setdefault(room, version - 1)
+
+    @staticmethod
+    def _public_member(entry):
+        return {
+            "username": entry["username"],
+            "nickname": entry["nickname"],
+            "is_anonymous": entry["is_anonymous"]
+        }
+
+    @staticmethod
+    def get_session(sid):
+        """
+        Obtiene los datos de presencia de un socket
+
+        Returns:
+            dict | None: {username, nickname, room, is_anonymous} o None
+        """
+        return PresenceService._sessions.get(sid)
+
+    @staticmethod
+    def count_online():
+        """
+        Cuenta los usuarios que están en alguna sala
+
+        Returns:
+            int: Usuarios distintos online en este proceso
+        """
+        with PresenceService._lock:
+            return len({s["username"] for s in PresenceService._sessions.values()})
+
+    @staticmethod
+    def count_in_room(room):
+        """
+        Cuenta los sockets presentes en una sala
+
+        Returns:
+            int: Cantidad de sockets
+        """
+        return len(PresenceService._rooms.get(room, ()))
+
+    @staticmethod
+    def sids(room):
+        """
+        Lista los sockets presentes en una sala
+
+        Returns:
+            list: Socket IDs
+        """
+        with PresenceService._lock:
+            return list(PresenceService._rooms.get(room, ()))
+
+    @staticmethod
+    def rooms():
+        """
+        Lista las salas con al menos un socket presente
+
+        Returns:
+            list: Nombres de sala
+        """
+        with PresenceService._lock:
+            return list(PresenceService._rooms)
+
+    @staticmethod
+    def members(room):
+        """
+        Lista los miembros presentes en una sala
+
+        Returns:
+            list: [{username, nickname, is_anonymous}, ...] ordenados por username
+        """
+        with PresenceService._lock:
+            members = PresenceService._members.get(room, {})
+            return [PresenceService._public_member(members[u]) for u in sorted(members)]
+
+    @staticmethod
+    def members_page(room, limit=200, after=None):
+        """
+        Página de la lista de miembros de una sala, ordenada por username
+
+        Args:
+            room (str): Sala
+            limit (int): Máximo de miembros
+            after (str): Último username de la página anterior
+
+        Returns:
+            tuple: (miembros, versión, hay_más)
+        """
+        with PresenceService._lock:
+            members = PresenceService._members.get(room, {})
+            usernames = sorted(u for u in members if after is None or u > after)
+            page = [PresenceService._public_member(members[u]) for u in usernames[:limit]]
+            return page, PresenceService._versions.get(room, 0), len(usernames) > limit
+
+    @staticmethod
+    def count_members(room):
+        """Cuenta los usuarios distintos presentes en una sala"""
+        return len(PresenceService._members.get(room, ()))
+
+    @staticmethod
+    def members_version(room):
+        """Versión actual de la lista de miembros de una sala"""
+        return PresenceService._versions.get(room, 0)
+
+    @staticmethod
+    def member_changes(room, since_version):
+        """
+        Altas y bajas posteriores a una versión
+
+        Args:
+            room (str): Sala
+            since_version (int): Última versión que conoce el cliente
+
+        Returns:
+            list | None: [(versión, 'added' | 'removed', miembro)], o None si
+                         el diario ya no cubre esa versión (pedir snapshot)
+        """
+        with PresenceService._lock:
+            current = PresenceService._versions.get(room, 0)
+            if since_version > current:
+                return None
+            if since_version == current:
+                return []
+            journal = PresenceService._journal.get(room)
+            if not journal or journal[0][0] > since_version + 1:
+                return None
+            return [change for change in journal if change[0] > since_version]
+
+    @staticmethod
+    def drop_room(room):
+        """
+        Olvida una sala completa (eliminada): sus sockets, miembros y diario
+
+        Args:
+            room (str): Sala
+
+        Returns:
+            set: Sockets que estaban en la sala
+        """
+        with PresenceService._lock:
+            sids = PresenceService._rooms.pop(room, set())
+            for sid in sids:
+                PresenceService._sessions.pop(sid, None)
+            PresenceService._members.pop(room, None)
+            PresenceService._versions.pop(room, None)
+            PresenceService._journal.pop(room, None)
+            PresenceService._dirty.pop(room, None)
+            return sids
+
+    @staticmethod
+    def take_dirty_rooms():
+        """
+        Devuelve y limpia las salas con cambios de miembros sin publicar
+
+        Returns:
+            dict: {room: versión anterior al primer cambio sin publicar}
+        """
+        with PresenceService._lock:
+            dirty = dict(PresenceService._dirty)
+            PresenceService._dirty.clear()
+            return dirty
+
+    @staticmethod
+    def reset():
+        """Limpia el registro (útil en tests)"""
+        with PresenceService._lock:
+            PresenceService._sessions.clear()
+            PresenceService._rooms.clear()
+            PresenceService._members.clear()
+            PresenceService._versions.clear()
+            PresenceService._journal.clear()
+            PresenceService._dirty.clear()
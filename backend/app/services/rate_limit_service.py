@@ -0,0 +1,135 @@
+# app/services/rate_limit_service.py
+"""
+Límites de frecuencia para eventos WebSocket y rutas HTTP
+Cada evento limitado consume una ficha del balde del socket y otra del
+balde del usuario (varias pestañas del mismo usuario comparten el
+segundo). La comprobación ocurre antes de decodificar el JWT y de
+cualquier consulta a MongoDB.
+
+En HTTP los baldes son por IP y por usuario autenticado.
+
+Políticas: SOCKET_RATE_LIMITS / HTTP_RATE_LIMITS =
+"evento=fichas_por_segundo/ráfaga,..." (en HTTP, "default" aplica a las
+rutas sin política propia)
+Almacén: RATE_LIMIT_STORE = 'memory' (por proceso) o 'mongodb'
+(compartido entre nodos)
+"""
+
+import threading
+from app.utils.rate_limit import MemoryBucketStore, MongoBucketStore, parse_policies
+
+
+class RateLimitService:
+    """
+    Token buckets por (evento, sid) y (evento, usuario)
+    Todos los métodos son estáticos, no necesitas instanciar la clase
+    """
+
+    _lock = threading.Lock()
+    _store = None
+    _policies = {}
+    _http_policies = {}
+    _rejected = {}      # evento (o "http:<ruta>") -> cantidad de rechazos
+
+    @staticmethod
+    def configure(config):
+        """
+        Elige almacén y políticas según la configuración
+
+        Args:
+            config (dict): Configuración de la app
+        """
+        if not config.get('RATE_LIMIT_ENABLED', True):
+            RateLimitService._store = None
+            RateLimitService._policies = {}
+            RateLimitService._http_policies = {}
+            return
+
+        if config.get('RATE_LIMIT_STORE', 'memory') == 'mongodb':
+            from app.utils.database import mongo
+            store = MongoBucketStore(mongo.db.rate_limits)
+        else:
+            store = MemoryBucketStore()
+
+        RateLimitService._policies = parse_policies(config.get('SOCKET_RATE_LIMITS', ''))
+        RateLimitService._http_policies = parse_policies(config.get('HTTP_RATE_LIMITS', ''))
+        RateLimitService._store = store
+
+    @staticmethod
+    def check(event, sid, username=None):
+        """
+        Consume una ficha para un evento
+
+        Args:
+            event (str): Nombre del evento
+            sid (str): Socket ID
+            username (str): Usuario, si ya se conoce
+
+        Returns:
+            float: 0 si se permite, o segundos a esperar si se rechaza
+        """
+        store = RateLimitService._store
+        policy = RateLimitService._policies.get(event)
+        if store is None or policy is None:
+            return 0
+
+        rate, burst = policy
+        retry_after = store.consume(f"{event}:sid:{sid}", rate, burst)
+        if not retry_after and username:
+            retry_after = store.consume(f"{event}:user:{username}", rate, burst)
+
+        if retry_after:
+            RateLimitService._count_rejection(event)
+        return retry_after
+
+    @staticmethod
+    def check_http(route, ip, username=None):
+        """
+        Consume una ficha para una petición HTTP
+
+        Args:
+            route (str): Nombre de la política de la ruta ('login', 'upload', ...)
+            ip (str): IP del cliente
+            username (str): Usuario autenticado, si la ruta lo requiere
+
+        Returns:
+            float: 0 si se permite, o segundos a esperar si se rechaza
+        """
+        store = RateLimitService._store
+        policies = RateLimitService._http_policies
+        policy = policies.get(route) or policies.get('default')
+        if store is None or policy is None:
+            return 0
+
+        rate, burst = policy
+        retry_after = store.consume(f"http:{route}:ip:{ip}", rate, burst)
+        if not retry_after and username:
+            retry_after = store.consume(f"http:{route}:user:{username}", rate, burst)
+
+        if retry_after:
+            RateLimitService._count_rejection(f"http:{route}")
+        return retry_after
+
+    @staticmethod
+    def _count_rejection(key):
+        with RateLimitService._lock:
+            RateLimitService._rejected[key] = RateLimitService._rejected.get(key, 0) + 1
+
+    @staticmethod
+    def stats():
+        """
+        Rechazos por evento desde el arranque
+
+        Returns:
+            dict: {evento: cantidad}
+        """
+        with RateLimitService._lock:
+            return dict(RateLimitService._rejected)
+
+    @staticmethod
+    def reset():
+        """Vacía los baldes y las métricas (útil en tests)"""
+        with RateLimitService._lock:
+            RateLimitService._rejected.clear()
+        if RateLimitService._store is not None:
+            RateLimitService._store.reset()
@@ -0,0 +1,347 @@
+# app/services/room_directory_service.py
+"""
+Directorio de salas en vivo
+Los clientes se suscriben con "subscribe_rooms_directory", reciben el
+listado completo una vez ("rooms_directory") y después solo los cambios,
+en la sala de Socket.IO "#rooms_directory" (el "#" no es válido en un
+nombre de sala, así no choca con una sala de chat real):
+
+- "room_created"  {version, room: {...}}
+- "room_updated"  {version, room: {...}}
+- "room_deleted"  {version, room: "Nombre"}
+- "room_counts"   {version, rooms: {"Nombre": {members, messages}}}
+
+Los conteos se agrupan: entradas, salidas y mensajes solo marcan la sala,
+y cada ROOM_DIRECTORY_COUNTS_INTERVAL_MS se envían las que cambiaron.
+
+Cada evento lo publica solo el worker que hizo el cambio; la versión es
+global (contador en la colección "counters" de MongoDB), así un cliente
+puede comparar versiones aunque reconecte a otro worker.
+
+El listado vive en memoria y se reconstruye con list_rooms_with_stats
+cada ROOM_DIRECTORY_REFRESH_SECONDS (0 = en cada consulta), o antes si
+el contador saltó (otro worker cambió el listado). Con cola de mensajes
+esos cambios ya los publicó su worker y la reconstrucción es silenciosa;
+sin cola cada worker publica a sus propios suscriptores las diferencias
+halladas al reconstruir.
+"""
+
+import threading
+import time
+from pymongo import ReturnDocument
+
+
+class RoomDirectoryService:
+    """
+    Caché del listado de salas: name -> entrada (orden de creación)
+    Todos los métodos son estáticos, no necesitas instanciar la clase
+    """
+
+    ROOM = "#rooms_directory"
+    COUNTER = "rooms_directory"     # _id del contador de versiones
+
+    _lock = threading.Lock()
+    _rooms = None
+    _loaded_at = 0.0
+    _version = 0
+    _dirty = set()
+    _flusher_started = False
+    _refresh = 60.0
+    _interval = 2.0
+    _shared = False     # True con cola de mensajes (eventos de otros workers llegan solos)
+
+    @staticmethod
+    def configure(config):
+        """
+        Lee los intervalos de la configuración
+
+        Args:
+            config (dict): Configuración de la app
+        """
+        RoomDirectoryService._refresh = config.get('ROOM_DIRECTORY_REFRESH_SECONDS', 60)
+        RoomDirectoryService._interval = config.get('ROOM_DIRECTORY_COUNTS_INTERVAL_MS', 2000) / 1000
+        RoomDirectoryService._shared = bool(config.get('SOCKETIO_MESSAGE_QUEUE'))
+
+    @staticmethod
+    def list_rooms():
+        """
+        Listado de salas con estadísticas (desde la caché)
+
+        Returns:
+            list: Entradas de RoomService.room_entry
+        """
+        RoomDirectoryService._ensure_fresh()
+        with RoomDirectoryService._lock:
+            return [dict(entry) for entry in RoomDirectoryService._rooms.values()]
+
+    @staticmethod
+    def snapshot():
+        """
+        Listado completo para un suscriptor nuevo
+
+        Returns:
+            dict: {version, rooms}
+        """
+        rooms = RoomDirectoryService.list_rooms()
+        return {"version": RoomDirectoryService._version, "rooms": rooms}
+
+    @staticmethod
+    def etag():
+        """
+        ETag débil del listado: la versión global que refleja esta caché
+
+        Returns:
+            str: Valor del ETag
+        """
+        RoomDirectoryService._ensure_fresh()
+        return f"rooms-{RoomDirectoryService._version}"
+
+    @staticmethod
+    def room_created(room):
+        """
+        Agrega una sala recién creada y la publica
+
+        Args:
+            room (dict): Documento de la sala
+        """
+        from app.services.room_service import RoomService
+
+        entry = RoomService.room_entry(room, members=0, messages=room.get('message_count') or 0)
+        with RoomDirectoryService._lock:
+            if RoomDirectoryService._rooms is not None:
+                RoomDirectoryService._rooms[entry['name']] = dict(entry)
+        version = RoomDirectoryService._bump()
+        RoomDirectoryService._emit("room_created", {"version": version, "room": entry})
+
+    @staticmethod
+    def room_updated(room):
+        """
+        Actualiza los datos de una sala y los publica
+
+        Args:
+            room (dict): Documento actualizado de la sala
+        """
+        from app.services.room_service import RoomService
+        from app.models import get_user_model
+
+        name = room.get('name')
+        with RoomDirectoryService._lock:
+            cached = (RoomDirectoryService._rooms or {}).get(name)
+        if cached:
+            members, messages = cached['members'], cached['messages']
+        else:
+            members = get_user_model().count_in_room(name)
+            messages = RoomService.get_message_count(room)
+
+        entry = RoomService.room_entry(room, members=members, messages=messages)
+        with RoomDirectoryService._lock:
+            if RoomDirectoryService._rooms is not None and name in RoomDirectoryService._rooms:
+                RoomDirectoryService._rooms[name] = dict(entry)
+        version = RoomDirectoryService._bump()
+        RoomDirectoryService._emit("room_updated", {"version": version, "room": entry})
+
+    @staticmethod
+    def room_deleted(room_name):
+        """
+        Quita una sala del listado y lo publica
+
+        Args:
+            room_name (str): Nombre de la sala
+        """
+        with RoomDirectoryService._lock:
+            if RoomDirectoryService._rooms is not None:
+                RoomDirectoryService._rooms.pop(room_name, None)
+            RoomDirectoryService._dirty.discard(room_name)
+        version = RoomDirectoryService._bump()
+        RoomDirectoryService._emit("room_deleted", {"version": version, "room": room_name})
+
+    @staticmethod
+    def touch(room_name):
+        """
+        Marca que cambiaron los conteos de una sala (entradas, salidas,
+        mensajes). Se publican con la tarea periódica, o en línea si el
+        intervalo es 0
+
+        Args:
+            room_name (str): Nombre de la sala
+        """
+        if not room_name:
+            return
+        with RoomDirectoryService._lock:
+            RoomDirectoryService._dirty.add(room_name)
+
+        if RoomDirectoryService._interval > 0:
+            from flask import current_app
+            from app import socketio
+            RoomDirectoryService.ensure_flusher(
+                current_app._get_current_object(), socketio, RoomDirectoryService._interval
+            )
+            return
+        counts = RoomDirectoryService.flush()
+        if counts:
+            RoomDirectoryService._emit("room_counts", counts)
+
+    @staticmethod
+    def flush():
+        """
+        Recalcula los conteos de las salas marcadas
+
+        Returns:
+            dict | None: {version, rooms: {name: {members, messages}}} con
+                         las salas cuyo conteo cambió, o None si ninguna
+        """
+        from app.models import get_user_model, get_room_model
+
+        with RoomDirectoryService._lock:
+            dirty, RoomDirectoryService._dirty = RoomDirectoryService._dirty, set()
+            rooms = RoomDirectoryService._rooms
+        # Sin listado cargado no hay suscriptores a quienes avisar
+        if rooms is None or not dirty:
+            return None
+
+        user_model = get_user_model()
+        room_model = get_room_model()
+        changed = {}
+        for name in sorted(dirty):
+            entry = rooms.get(name)
+            room = room_model.find_by_name(name) if entry else None
+            if not room:
+                continue
+            messages = room.get('message_count')
+            counts = {
+                "members": user_model.count_in_room(name),
+                "messages": entry['messages'] if messages is None else messages
+            }
+            if counts != {"members": entry['members'], "messages": entry['messages']}:
+                changed[name] = counts
+
+        if not changed:
+            return None
+        with RoomDirectoryService._lock:
+            for name, counts in changed.items():
+                if name in RoomDirectoryService._rooms:
+                    RoomDirectoryService._rooms[name].update(counts)
+        version = RoomDirectoryService._bump()
+        return {"version": version, "rooms": changed}
+
+    @staticmethod
+    def ensure_flusher(app, socketio, interval):
+        """
+        Lanza (una sola vez) la tarea que emite "room_counts" cada intervalo
+        y reconstruye el listado cuando vence
+
+        Args:
+            app: Aplicación Flask (contexto para MongoDB)
+            socketio: Instancia de SocketIO
+            interval (float): Segundos entre emisiones
+        """
+        with RoomDirectoryService._lock:
+            if RoomDirectoryService._flusher_started:
+                return
+            RoomDirectoryService._flusher_started = True
+        socketio.start_background_task(RoomDirectoryService._flush_loop, app, socketio, interval)
+
+    @staticmethod
+    def _flush_loop(app, socketio, interval):
+        while True:
+            socketio.sleep(interval)
+            try:
+                with app.app_context():
+                    counts = RoomDirectoryService.flush()
+                    if counts:
+                        RoomDirectoryService._emit("room_counts", counts)
+                    if RoomDirectoryService._rooms is not None:
+                        RoomDirectoryService._ensure_fresh()
+            except Exception as e:
+                print(f"[directory error] {str(e)}")
+
+    @staticmethod
+    def _ensure_fresh():
+        """Reconstruye el listado si no está cargado o venció"""
+        age = time.monotonic() - RoomDirectoryService._loaded_at
+        if RoomDirectoryService._rooms is None or age >= RoomDirectoryService._refresh:
+            RoomDirectoryService._reload()
+
+    @staticmethod
+    def _reload():
+        """
+        Reconstruye el listado desde MongoDB. Sin cola de mensajes publica
+        a los suscriptores de este worker las diferencias con la versión en
+        memoria; con cola ya las publicó el worker que hizo cada cambio
+        """
+        from app.services.room_service import RoomService
+
+        # Versión leída antes que el listado: nunca más nueva que su contenido
+        version = RoomDirectoryService._current_version()
+        fresh = {entry['name']: entry for entry in RoomService.list_rooms_with_stats()}
+        events = []
+        with RoomDirectoryService._lock:
+            previous = RoomDirectoryService._rooms
+            RoomDirectoryService._rooms = {name: dict(entry) for name, entry in fresh.items()}
+            RoomDirectoryService._loaded_at = time.monotonic()
+            RoomDirectoryService._version = max(RoomDirectoryService._version, version)
+            if previous is None or RoomDirectoryService._shared:
+                return
+
+            counts = {}
+            for name, entry in fresh.items():
+                old = previous.get(name)
+                if old is None:
+                    events.append(("room_created", {"room": entry}))
+                elif (old['description'], old['type']) != (entry['description'], entry['type']):
+                    events.append(("room_updated", {"room": entry}))
+                elif (old['members'], old['messages']) != (entry['members'], entry['messages']):
+                    counts[name] = {"members": entry['members'], "messages": entry['messages']}
+            for name in previous:
+                if name not in fresh:
+                    events.append(("room_deleted", {"room": name}))
+            if counts:
+                events.append(("room_counts", {"rooms": counts}))
+
+        for event, payload in events:
+            RoomDirectoryService._emit(event, {"version": RoomDirectoryService._bump(), **payload})
+
+    @staticmethod
+    def _counters():
+        from app.utils.database import mongo
+        return mongo.db.counters
+
+    @staticmethod
+    def _current_version():
+        """Versión global actual del listado (sin incrementarla)"""
+        doc = RoomDirectoryService._counters().find_one({"_id": RoomDirectoryService.COUNTER})
+        return doc["version"] if doc else 0
+
+    @staticmethod
+    def _bump():
+        """
+        Reserva la siguiente versión global (atómico entre workers). Si el
+        contador saltó, otro worker cambió el listado desde nuestra última
+        versión: la caché se reconstruye en la próxima consulta
+        """
+        doc = RoomDirectoryService._counters().find_one_and_update(
+            {"_id": RoomDirectoryService.COUNTER},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        version = doc["version"]
+        with RoomDirectoryService._lock:
+            if version != RoomDirectoryService._version + 1:
+                RoomDirectoryService._loaded_at = float('-inf')
+            RoomDirectoryService._version = max(RoomDirectoryService._version, version)
+        return version
+
+    @staticmethod
+    def _emit(event, payload):
+        from app import socketio
+        socketio.emit(event, payload, room=RoomDirectoryService.ROOM)
+
+    @staticmethod
+    def reset():
+        """Vacía la caché y los cambios pendientes (útil en tests)"""
+        with RoomDirectoryService._lock:
+            RoomDirectoryService._rooms = None
+            RoomDirectoryService._loaded_at = 0.0
+            RoomDirectoryService._version = 0
+            RoomDirectoryService._dirty.clear()
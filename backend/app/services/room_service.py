@@ -4,7 +4,9 @@ Servicio de lógica de negocio para Salas
 Contiene operaciones complejas que involucran múltiples modelos
 """
 
+import threading
 from app.models import get_user_model, get_room_model, get_message_model
+from app.utils.cache import TTLCache
 
 
 class RoomService:
@@ -13,11 +15,108 @@ class RoomService:
     Métodos que requieren coordinación entre modelos
     """
     
+    # Lecturas por sala (detalles, resumen): las peticiones idénticas
+    # simultáneas comparten una sola consulta (ver configure_reads).
+    # La caché es de este proceso; la clave lleva el ETag de la sala, así
+    # las escrituras de otros workers (mensajes, entradas, salidas) la cambian
+    _reads = TTLCache(ttl=0, max_size=1024)
+    _read_generation = {}
+    
+    # Salas antiguas con numeración en curso en este proceso
+    _backfills = set()
+    _backfills_lock = threading.Lock()
+    
+    @staticmethod
+    def configure_reads(microcache_seconds):
+        """
+        Ajusta cuánto se reutiliza una lectura ya resuelta
+        
+        Args:
+            microcache_seconds (float): Segundos de microcaché
+                (0 = solo se comparten las consultas simultáneas)
+        """
+        RoomService._reads.ttl = microcache_seconds
+        RoomService._reads.invalidate()
+    
+    @staticmethod
+    def invalidate_reads(room_name):
+        """
+        Descarta las lecturas cacheadas de una sala (tras modificarla)
+        
+        Args:
+            room_name (str): Nombre de la sala
+        """
+        # Las claves incluyen la generación: las lecturas viejas quedan inalcanzables
+        RoomService._read_generation[room_name] = RoomService._read_generation.get(room_name, 0) + 1
+    
+    @staticmethod
+    def read_stats():
+        """Contadores de la caché de lecturas (ver TTLCache.stats)"""
+        return RoomService._reads.stats()
+    
+    # Campos que determinan cada lectura (ver room_etag)
+    ETAG_SCOPES = {
+        'details': ('version', 'members'),
+        'messages': ('last_seq', 'message_count'),
+        'summary': ('version', 'members', 'last_seq', 'message_count')
+    }
+    
     @staticmethod
-    def get_room_details_with_members(room_name):
+    def room_etag(room_name, scope, *params):
+        """
+        ETag débil de una lectura de sala, sin ejecutar la consulta completa
+        Sale del id de la sala (distingue una sala recreada con el mismo
+        nombre), su versión, la última secuencia y los contadores
+        
+        Args:
+            room_name (str): Nombre de la sala
+            scope (str): 'details', 'messages' o 'summary'
+            *params: Parámetros ya normalizados que cambian la respuesta
+                (ej. limit en 'messages')
+        
+        Returns:
+            str | None: Valor del ETag, o None si la sala no existe o es
+                        antigua y aún no tiene secuencia (sin validación)
+        """
+        room = get_room_model().get_validators(room_name)
+        if not room:
+            return None
+        
+        parts = [room['id']]
+        for field in RoomService.ETAG_SCOPES[scope]:
+            if field == 'members':
+                parts.append(get_user_model().count_in_room(room_name))
+            elif field == 'version':
+                parts.append(room.get('version', 0))
+            elif room.get(field) is None:
+                return None
+            else:
+                parts.append(room[field])
+        parts.extend(params)
+        return '-'.join(str(p) for p in parts)
+    
+    @staticmethod
+    def get_room_details_with_members(room_name, version=None):
         """
         Obtiene detalles completos de una sala incluyendo miembros
+        (resultado compartido entre llamadas simultáneas: no mutarlo)
+        
+        Args:
+            room_name (str): Nombre de la sala
+            version (str): ETag leído antes de la consulta (ver room_etag);
+                forma parte de la clave, así un cuerpo cacheado nunca es
+                anterior al ETag con el que se responde. Si no se da, se lee
+                aquí: un cambio hecho por cualquier worker cambia la clave
         """
+        if version is None:
+            version = RoomService.room_etag(room_name, 'details')
+        return RoomService._reads.get_or_compute(
+            ('details', room_name, RoomService._read_generation.get(room_name, 0), version),
+            lambda: RoomService._load_room_details(room_name)
+        )
+    
+    @staticmethod
+    def _load_room_details(room_name):
         room_model = get_room_model()
         user_model = get_user_model()
         
@@ -43,25 +142,42 @@ class RoomService:
         
         room_model = get_room_model()
         user_model = get_user_model()
-        message_model = get_message_model()
         
         rooms = room_model.list_all()
         result = []
         
         for room in rooms:
-            name = room.get('name')
-            result.append({
-                'id': room.get('id'),
-                'name': name,
-                'description': room.get('description'),
-                'type': room.get('type', 'text'),
-                'members': user_model.count_in_room(name),
-                'messages': message_model.count_room_messages(name),
-                'created_at': room.get('created_at').isoformat() if room.get('created_at') else None
-            })
+            result.append(RoomService.room_entry(
+                room,
+                members=user_model.count_in_room(room.get('name')),
+                messages=RoomService.get_message_count(room)
+            ))
         
         return result
     
+    @staticmethod
+    def room_entry(room, members, messages):
+        """
+        Arma la entrada de una sala tal como aparece en los listados
+        
+        Args:
+            room (dict): Documento de la sala
+            members (int): Usuarios en la sala
+            messages (int): Mensajes de la sala
+        
+        Returns:
+            dict: {id, name, description, type, members, messages, created_at}
+        """
+        return {
+            'id': room.get('id'),
+            'name': room.get('name'),
+            'description': room.get('description'),
+            'type': room.get('type', 'text'),
+            'members': members,
+            'messages': messages,
+            'created_at': room.get('created_at').isoformat() if room.get('created_at') else None
+        }
+    
     @staticmethod
     def validate_join_request(username, room_name, provided_pin):
         room_model = get_room_model()
@@ -106,25 +222,208 @@ class RoomService:
         return True, None
     
     @staticmethod
-    def delete_room_cascade(room_name):
+    def start_room_deletion(room_name, requested_by=None):
+        """
+        Inicia la eliminación asíncrona de una sala
+        1. Marca la sala (tombstone): deja de aparecer en listados al instante
+        2. Expulsa a los miembros conectados vía Socket.IO
+        3. Lanza el borrado por lotes como trabajo en segundo plano
+        
+        Args:
+            room_name (str): Nombre de la sala
+            requested_by (str): Username que solicita la eliminación
+        
+        Returns:
+            dict | None: Documento del trabajo, o None si la sala no existe
+        """
+        from app.services.job_service import JobService
+        from app.services.history_service import HistoryService
+        from app.services.room_directory_service import RoomDirectoryService
+        
         room_model = get_room_model()
-        message_model = get_message_model()
-        user_model = get_user_model()
         
-        # Contar antes de eliminar
-        messages_count = message_model.count_room_messages(room_name)
-        users_count = user_model.count_in_room(room_name)
+        if not room_model.mark_deleting(room_name):
+            return None
+        
+        RoomService.evict_room_members(room_name)
+        RoomService.invalidate_reads(room_name)
+        HistoryService.drop(room_name)
+        RoomDirectoryService.room_deleted(room_name)
+        
+        return JobService.start(
+            'delete_room',
+            room_name,
+            RoomService._delete_room_job,
+            requested_by=requested_by,
+            room_name=room_name
+        )
+    
+    @staticmethod
+    def resume_room_deletions(stale_seconds=300):
+        """
+        Reanuda las eliminaciones que quedaron a medias (el proceso se
+        reinició con la sala marcada): sin esto la sala queda oculta y su
+        nombre bloqueado para siempre. Se llama al arrancar.
+        
+        Args:
+            stale_seconds (int): Una eliminación sin avance en este tiempo
+                se considera interrumpida
         
-        # 1. Eliminar todos los mensajes
-        messages_deleted = message_model.delete_room_messages(room_name)
+        Returns:
+            list: Documentos de los trabajos relanzados
+        """
+        from datetime import datetime, timedelta
+        from zoneinfo import ZoneInfo
+        from app.services.job_service import JobService
+        
+        room_model = get_room_model()
+        before = datetime.now(ZoneInfo('America/Guayaquil')) - timedelta(seconds=stale_seconds)
         
-        # 2. Limpiar usuarios que están en la sala
-        # (actualizar current_room a None)
+        jobs = []
+        for room_name in room_model.list_deleting(before):
+            # Sigue avanzando en otro proceso
+            if JobService.is_active('delete_room', room_name, since=before):
+                continue
+            if not room_model.claim_deletion(room_name, before):
+                continue
+            JobService.fail_abandoned('delete_room', room_name, before)
+            print(f"[delete_room] reanudando eliminación de {room_name}")
+            jobs.append(JobService.start(
+                'delete_room',
+                room_name,
+                RoomService._delete_room_job,
+                room_name=room_name
+            ))
+        return jobs
+    
+    @staticmethod
+    def evict_room_members(room_name):
+        """
+        Notifica a los sockets de la sala que fue eliminada y los saca de ella
+        
+        Args:
+            room_name (str): Nombre de la sala
+        """
+        from app import socketio
+        from app.services.presence_service import PresenceService
+        from app.services.typing_service import TypingService
+        
+        socketio.emit("room_deleted", {"room": room_name}, room=room_name)
+        socketio.close_room(room_name)
+        socketio.close_room(f"{room_name}#compact")
+        socketio.close_room(f"{room_name}#json")
+        
+        # Presencia, miembros (members_snapshot/delta) y escritura en memoria:
+        # los sockets expulsados ya no cuentan aunque sigan conectados
+        PresenceService.drop_room(room_name)
+        TypingService.drop_room(room_name)
+    
+    @staticmethod
+    def _delete_room_job(job_id, room_name):
+        return RoomService.delete_room_cascade(room_name, job_id=job_id)
+    
+    @staticmethod
+    def start_sequence_backfill(room_name):
+        """
+        Lanza en segundo plano la numeración de una sala antigua
+        (una vez por sala en este proceso; entre procesos decide init_seq)
+        
+        Args:
+            room_name (str): Nombre de la sala
+        
+        Returns:
+            dict | None: Documento del trabajo, o None si ya estaba en curso
+                         o no hay contexto de app (ver migrate_sequences.py)
+        """
+        from flask import has_app_context
+        from app.services.job_service import JobService
+        
+        if not has_app_context():
+            return None
+        with RoomService._backfills_lock:
+            if room_name in RoomService._backfills:
+                return None
+            RoomService._backfills.add(room_name)
+        
+        try:
+            return JobService.start(
+                'backfill_sequences',
+                room_name,
+                RoomService._backfill_sequences_job,
+                room_name=room_name
+            )
+        except Exception:
+            with RoomService._backfills_lock:
+                RoomService._backfills.discard(room_name)
+            raise
+    
+    @staticmethod
+    def _backfill_sequences_job(job_id, room_name):
+        from flask import current_app
+        from app import socketio
+        from app.services.job_service import JobService
+        from app.services.history_service import HistoryService
+        
+        config = current_app.config
+        try:
+            numbered = get_message_model().backfill_sequences(
+                room_name,
+                batch_size=config.get('JOB_BATCH_SIZE', 500),
+                pause=config.get('JOB_BATCH_PAUSE_SECONDS', 0.05),
+                on_progress=lambda n: JobService.update_progress(job_id, messages_numbered=n),
+                sleep=socketio.sleep
+            )
+        finally:
+            with RoomService._backfills_lock:
+                RoomService._backfills.discard(room_name)
+        # El historial en memoria puede tener mensajes aún sin número
+        HistoryService.drop(room_name)
+        RoomService.invalidate_reads(room_name)
+        return {"messages_numbered": numbered or 0, "won": numbered is not None}
+    
+    @staticmethod
+    def delete_room_cascade(room_name, job_id=None):
+        """
+        Elimina una sala y sus datos relacionados por lotes acotados
+        
+        Args:
+            room_name (str): Nombre de la sala
+            job_id (str): Trabajo al que reportar el progreso (opcional)
+        
+        Returns:
+            dict: {'room_deleted', 'messages_deleted', 'users_cleared'}
+        """
+        from flask import current_app
+        from app import socketio
+        from app.services.job_service import JobService
+        
+        room_model = get_room_model()
+        message_model = get_message_model()
+        config = current_app.config
+        
+        def report(deleted):
+            if job_id:
+                JobService.update_progress(job_id, messages_deleted=deleted)
+        
+        # 1. Limpiar usuarios que están en la sala
+        # (actualizar current_room a None). Va primero para que nadie
+        # pueda seguir enviando mensajes mientras se borra el historial
         from app.utils.database import mongo
         users_updated = mongo.db.users.update_many(
             {"current_room": room_name},
             {"$set": {"current_room": None}}
         )
+        if job_id:
+            JobService.update_progress(job_id, users_cleared=users_updated.modified_count)
+        
+        # 2. Eliminar los mensajes por lotes (con pausas entre lotes)
+        messages_deleted = message_model.delete_room_messages_batched(
+            room_name,
+            batch_size=config.get('JOB_BATCH_SIZE', 500),
+            pause=config.get('JOB_BATCH_PAUSE_SECONDS', 0.05),
+            on_progress=report,
+            sleep=socketio.sleep
+        )
         
         # 3. Eliminar la sala
         room_deleted = room_model.delete_room(room_name)
@@ -136,17 +435,56 @@ class RoomService:
         }
     
     @staticmethod
-    def get_room_summary(room_name):
+    def get_message_count(room):
+        """
+        Obtiene la cantidad de mensajes de una sala desde su contador
+        Si la sala es anterior a los contadores, lo calcula una vez y lo guarda
+        
+        Args:
+            room (dict): Documento de la sala
+        
+        Returns:
+            int: Cantidad de mensajes
+        """
+        count = room.get('message_count')
+        if count is None:
+            name = room.get('name')
+            count = get_message_model().count_room_messages(name)
+            get_room_model().set_message_count(name, count)
+        return count
+    
+    @staticmethod
+    def get_room_summary(room_name, version=None):
+        """
+        Obtiene resumen de una sala (detalles + estadísticas + mensajes recientes)
+        Se resuelve con una sola agregación y el contador de mensajes de la
+        sala, así la latencia no crece con el tamaño del historial
+        (resultado compartido entre llamadas simultáneas: no mutarlo)
+        
+        Args:
+            room_name (str): Nombre de la sala
+            version (str): ETag leído antes de la consulta (ver
+                get_room_details_with_members)
+        """
+        if version is None:
+            version = RoomService.room_etag(room_name, 'summary')
+        return RoomService._reads.get_or_compute(
+            ('summary', room_name, RoomService._read_generation.get(room_name, 0), version),
+            lambda: RoomService._load_room_summary(room_name)
+        )
+    
+    @staticmethod
+    def _load_room_summary(room_name):
         room_model = get_room_model()
-        user_model = get_user_model()
         message_model = get_message_model()
         
-        room = room_model.find_by_name(room_name)
+        room = room_model.aggregate_summary(room_name, recent_limit=10)
         if not room:
             return None
         
-        # Obtener últimos mensajes
-        recent_messages = message_model.get_room_messages(room_name, limit=10)
+        # La agregación devuelve los más recientes primero
+        recent_messages = list(reversed(room.get('recent_messages', [])))
+        members = room.get('members') or [{'count': 0}]
         
         return {
             'room': {
@@ -157,8 +495,8 @@ class RoomService:
                 'created_at': room.get('created_at').isoformat() if room.get('created_at') else None
             },
             'stats': {
-                'total_members': user_model.count_in_room(room_name),
-                'total_messages': message_model.count_room_messages(room_name)
+                'total_members': members[0]['count'],
+                'total_messages': RoomService.get_message_count(room)
             },
             'recent_messages': message_model.format_messages_for_api(recent_messages)
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,201 @@
+# app/services/shard_service.py
+"""
+Servicio de afinidad sala -> worker (modo multiproceso)
+Cada sala la atiende un único worker, elegido por hashing consistente
+sobre el nombre de la sala. Así una sala con mucho tráfico solo ocupa
+el hub de eventlet de su worker y no frena a las salas de los demás.
+
+Los workers se registran con un heartbeat en la colección 'workers'.
+Cuando uno entra o sale, el anillo se recalcula y las salas que cambian
+de dueño reciben "room_moved" para que sus clientes se reconecten.
+
+Requiere SOCKETIO_MESSAGE_QUEUE para que los emits entre salas de
+distintos workers (ej. room_deleted) lleguen a todos.
+"""
+
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
+from app.utils.hash_ring import HashRing
+
+
+class ShardService:
+    """
+    Enrutamiento de salas a workers y registro de workers
+    Todos los métodos son estáticos, no necesitas instanciar la clase
+    """
+
+    _lock = threading.Lock()
+    _ring = None
+    _workers = {}       # worker_id -> url
+
+    @staticmethod
+    def _collection():
+        from app.utils.database import mongo
+        return mongo.db.workers
+
+    @staticmethod
+    def enabled():
+        """Indica si el modo multiproceso con afinidad está activo"""
+        return bool(current_app.config.get('SHARDING_ENABLED'))
+
+    @staticmethod
+    def worker_id():
+        """Identificador de este worker (WORKER_ID o host-pid)"""
+        return current_app.config.get('WORKER_ID') or f'{socket.gethostname()}-{os.getpid()}'
+
+    @staticmethod
+    def register_worker():
+        """
+        Registra (o renueva) este worker en la colección 'workers'
+        Se llama periódicamente como heartbeat
+        """
+        ShardService._collection().update_one(
+            {'worker_id': ShardService.worker_id()},
+            {'$set': {
+                'url': current_app.config.get('WORKER_URL'),
+                'last_seen': datetime.utcnow()
+            }},
+            upsert=True
+        )
+
+    @staticmethod
+    def unregister_worker():
+        """Quita este worker del registro (apagado ordenado)"""
+        ShardService._collection().delete_one({'worker_id': ShardService.worker_id()})
+
+    @staticmethod
+    def active_workers():
+        """
+        Lista los workers con heartbeat reciente
+
+        Returns:
+            dict: {worker_id: url}
+        """
+        ttl = current_app.config.get('WORKER_TTL_SECONDS', 15)
+        since = datetime.utcnow() - timedelta(seconds=ttl)
+        cursor = ShardService._collection().find(
+            {'last_seen': {'$gte': since}},
+            {'_id': 0, 'worker_id': 1, 'url': 1}
+        )
+        return {w['worker_id']: w.get('url') for w in cursor}
+
+    @staticmethod
+    def refresh_ring():
+        """
+        Reconstruye el anillo si cambió el conjunto de workers
+
+        Returns:
+            bool: True si el conjunto de workers cambió
+        """
+        workers = ShardService.active_workers()
+        # Este worker siempre forma parte del anillo aunque su heartbeat falle
+        workers.setdefault(ShardService.worker_id(), current_app.config.get('WORKER_URL'))
+
+        with ShardService._lock:
+            if ShardService._ring is not None and workers.keys() == ShardService._workers.keys():
+                ShardService._workers = workers
+                return False
+
+            ShardService._ring = HashRing(
+                workers, replicas=current_app.config.get('HASH_RING_REPLICAS', 100)
+            )
+            ShardService._workers = workers
+            print(f"[shard] workers activos: {ShardService._ring.nodes}")
+            return True
+
+    @staticmethod
+    def owner_of(room_name):
+        """
+        Obtiene el worker dueño de una sala
+
+        Returns:
+            dict: {'worker_id', 'url'}
+        """
+        if ShardService._ring is None:
+            ShardService.refresh_ring()
+        worker_id = ShardService._ring.get_node(room_name)
+        return {'worker_id': worker_id, 'url': ShardService._workers.get(worker_id)}
+
+    @staticmethod
+    def route(room_name):
+        """
+        Decide si la sala se atiende en este worker
+
+        Args:
+            room_name (str): Nombre de la sala
+
+        Returns:
+            dict | None: None si la sala es local (o el modo está apagado);
+                         si no, {'room', 'worker_id', 'url'} del dueño
+        """
+        if not ShardService.enabled():
+            return None
+        owner = ShardService.owner_of(room_name)
+        if owner['worker_id'] == ShardService.worker_id():
+            return None
+        return {'room': room_name, **owner}
+
+    @staticmethod
+    def rebalance():
+        """
+        Avisa a las salas locales que cambiaron de dueño
+
+        Returns:
+            list: Salas movidas a otro worker
+        """
+        from app import socketio
+        from app.services.presence_service import PresenceService
+
+        me = ShardService.worker_id()
+        moved = []
+        for room_name in PresenceService.rooms():
+            owner = ShardService.owner_of(room_name)
+            if owner['worker_id'] == me:
+                continue
+            moved.append(room_name)
+            socketio.emit("room_moved", {'room': room_name, **owner}, room=room_name)
+            print(f"[shard] sala {room_name} -> {owner['worker_id']}")
+        return moved
+
+    @staticmethod
+    def start(app):
+        """
+        Registra el worker y lanza el heartbeat en segundo plano
+        (solo si SHARDING_ENABLED está activo)
+        """
+        from app import socketio
+
+        if not app.config.get('SHARDING_ENABLED'):
+            return
+
+        with app.app_context():
+            ShardService._collection().create_index('worker_id', unique=True)
+            ShardService.register_worker()
+            ShardService.refresh_ring()
+
+        socketio.start_background_task(ShardService._heartbeat_loop, app)
+
+    @staticmethod
+    def _heartbeat_loop(app):
+        from app import socketio
+
+        interval = app.config.get('WORKER_HEARTBEAT_SECONDS', 5)
+        while True:
+            socketio.sleep(interval)
+            try:
+                with app.app_context():
+                    ShardService.register_worker()
+                    if ShardService.refresh_ring():
+                        ShardService.rebalance()
+            except Exception as e:
+                print(f"[shard error] heartbeat: {str(e)}")
+
+    @staticmethod
+    def reset():
+        """Olvida el anillo calculado (útil en tests)"""
+        with ShardService._lock:
+            ShardService._ring = None
+            ShardService._workers = {}
@@ -0,0 +1,64 @@
+# app/services/stats_service.py
+"""
+Servicio de estadísticas globales
+Calcula totales con operaciones baratas (metadatos de colección y
+registro de presencia) y los sirve desde una caché de TTL corto
+"""
+
+from flask import current_app
+from app.utils.cache import TTLCache
+
+
+class StatsService:
+    """
+    Estadísticas globales del sistema para dashboards
+    Todos los métodos son estáticos, no necesitas instanciar la clase
+    """
+
+    _cache = TTLCache(ttl=5.0)
+
+    @staticmethod
+    def get_global_stats():
+        """
+        Obtiene las estadísticas globales
+        Con N clientes consultando a la vez, solo uno calcula (single-flight)
+        y el resto reutiliza el resultado hasta que expira el TTL
+
+        Returns:
+            dict: {'total_rooms', 'total_messages', 'total_users_online'}
+        """
+        StatsService._cache.ttl = current_app.config.get('STATS_CACHE_TTL_SECONDS', 5.0)
+        return StatsService._cache.get_or_compute('global', StatsService.compute_global_stats)
+
+    @staticmethod
+    def compute_global_stats():
+        """
+        Calcula las estadísticas sin recorrer colecciones completas
+        - total_messages: estimated_document_count (metadatos, O(1))
+        - total_users_online: registro de presencia en memoria; con varios
+          workers (cola de mensajes o sharding) cada uno conoce solo sus
+          sockets, así que se cuenta en MongoDB (current_room indexado)
+
+        Returns:
+            dict: {'total_rooms', 'total_messages', 'total_users_online'}
+        """
+        from app.models import get_room_model, get_user_model
+        from app.services.presence_service import PresenceService
+        from app.utils.database import mongo
+
+        if (current_app.config.get('SOCKETIO_MESSAGE_QUEUE')
+                or current_app.config.get('SHARDING_ENABLED')):
+            online = get_user_model().count_online()
+        else:
+            online = PresenceService.count_online()
+
+        return {
+            'total_rooms': get_room_model().count_all(),
+            'total_messages': mongo.db.messages.estimated_document_count(),
+            'total_users_online': online
+        }
+
+    @staticmethod
+    def invalidate():
+        """Descarta las estadísticas en caché"""
+        StatsService._cache.invalidate()
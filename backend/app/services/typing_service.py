@@ -0,0 +1,119 @@
+# app/services/typing_service.py
+"""
+Agregador de indicadores de "escribiendo..."
+En lugar de reenviar cada evento de teclado a toda la sala, guarda en
+memoria quién está escribiendo en cada sala y emite un único evento
+"typing_state" por sala a intervalos fijos, solo si el estado cambió.
+Las entradas sin renovar expiran solas (cliente que se fue sin avisar).
+"""
+
+import time
+import threading
+
+
+class TypingService:
+    """
+    Estado de escritura por sala: room -> {username: {nickname, expires_at}}
+    Todos los métodos son estáticos, no necesitas instanciar la clase
+    """
+
+    _lock = threading.Lock()
+    _rooms = {}
+    _dirty = set()          # salas con cambios pendientes de emitir
+    _flusher_started = False
+
+    @staticmethod
+    def update(room, username, nickname=None, is_typing=True, ttl=5.0, now=None):
+        """
+        Registra que un usuario empezó o dejó de escribir
+
+        Args:
+            room (str): Sala
+            username (str): Username
+            nickname (str): Nickname (usuarios anónimos)
+            is_typing (bool): True si está escribiendo
+            ttl (float): Segundos hasta que la entrada expira si no se renueva
+            now (float): Reloj monotónico (inyectable para tests)
+        """
+        now = time.monotonic() if now is None else now
+        with TypingService._lock:
+            typing = TypingService._rooms.setdefault(room, {})
+            if is_typing:
+                if username not in typing:
+                    TypingService._dirty.add(room)
+                typing[username] = {"nickname": nickname, "expires_at": now + ttl}
+            elif typing.pop(username, None) is not None:
+                TypingService._dirty.add(room)
+            if not typing:
+                del TypingService._rooms[room]
+
+    @staticmethod
+    def flush(now=None):
+        """
+        Expira entradas viejas y devuelve las salas cuyo estado cambió
+
+        Args:
+            now (float): Reloj monotónico (inyectable para tests)
+
+        Returns:
+            dict: {room: [{username, nickname}, ...]} solo salas con cambios
+        """
+        now = time.monotonic() if now is None else now
+        with TypingService._lock:
+            for room, typing in list(TypingService._rooms.items()):
+                expired = [u for u, entry in typing.items() if entry["expires_at"] <= now]
+                for username in expired:
+                    del typing[username]
+                if expired:
+                    TypingService._dirty.add(room)
+                if not typing:
+                    del TypingService._rooms[room]
+
+            changes = {}
+            for room in TypingService._dirty:
+                typing = TypingService._rooms.get(room, {})
+                changes[room] = [
+                    {"username": u, "nickname": typing[u]["nickname"]}
+                    for u in sorted(typing)
+                ]
+            TypingService._dirty.clear()
+            return changes
+
+    @staticmethod
+    def ensure_flusher(socketio, interval):
+        """
+        Lanza (una sola vez) la tarea que emite "typing_state" cada intervalo
+
+        Args:
+            socketio: Instancia de SocketIO
+            interval (float): Segundos entre emisiones
+        """
+        with TypingService._lock:
+            if TypingService._flusher_started:
+                return
+            TypingService._flusher_started = True
+        socketio.start_background_task(TypingService._flush_loop, socketio, interval)
+
+    @staticmethod
+    def _flush_loop(socketio, interval):
+        while True:
+            socketio.sleep(interval)
+            try:
+                for room, users in TypingService.flush().items():
+                    socketio.emit("typing_state", {"room": room, "users": users}, room=room)
+            except Exception as e:
+                print(f"[typing error] {str(e)}")
+
+    @staticmethod
+    def drop_room(room):
+        """Olvida quién escribía en una sala (eliminada), sin emitir nada"""
+        with TypingService._lock:
+            TypingService._rooms.pop(room, None)
+            TypingService._dirty.discard(room)
+
+    @staticmethod
+    def reset():
+        """Limpia el estado (útil en tests)"""
+        with TypingService._lock:
+            TypingService._rooms.clear()
+            TypingService._dirty.clear()
@@ -0,0 +1,191 @@
+# app/services/wire_service.py
+"""
+Formato compacto de eventos de chat (opcional, negociado al conectar)
+Los clientes que se conectan con auth {"wire": "msgpack"} reciben los
+eventos "message" y "messages_batch" como binario msgpack con claves
+cortas y timestamps en milisegundos epoch. El resto de clientes sigue
+recibiendo JSON exactamente igual que antes.
+
+Claves cortas de un mensaje:
+    i=id  s=seq  r=room  u=username  n=nickname  m=msg  t=timestamp (ms)
+    f=file_url  o=original_filename  x=security_flags (solo si hay hallazgos)
+Las claves con valor None se omiten.
+
+Cada socket entra además a la sala de su formato: "<sala>#compact" o
+"<sala>#json". En un solo proceso el broadcast se parte en JSON (saltando
+a los compactos locales) + binario. Con cola de mensajes (varios workers)
+los compactos de otros procesos no se pueden saltar por sid, así que el
+JSON va a "<sala>#json" y el binario a "<sala>#compact".
+"""
+
+import threading
+from datetime import datetime, timezone
+
+try:
+    import msgpack
+except ImportError:  # msgpack es opcional
+    msgpack = None
+
+
+WIRE_JSON = 'json'
+WIRE_MSGPACK = 'msgpack'
+
+_SHORT_KEYS = {
+    'id': 'i',
+    'seq': 's',
+    'room': 'r',
+    'username': 'u',
+    'nickname': 'n',
+    'msg': 'm',
+    'file_url': 'f',
+    'original_filename': 'o'
+}
+
+
+class WireService:
+    """
+    Formato de cable por socket: sid -> 'json' | 'msgpack'
+    Todos los métodos son estáticos, no necesitas instanciar la clase
+    """
+
+    _lock = threading.Lock()
+    _formats = {}
+    _shared = False     # True con cola de mensajes: exclusión por sala, no por sid
+
+    @staticmethod
+    def configure(config):
+        """
+        Ajusta el reparto según el despliegue
+
+        Args:
+            config: app.config (usa SOCKETIO_MESSAGE_QUEUE)
+        """
+        WireService._shared = bool(config.get('SOCKETIO_MESSAGE_QUEUE'))
+
+    @staticmethod
+    def negotiate(sid, requested):
+        """
+        Fija el formato de un socket al conectar
+
+        Args:
+            sid (str): Socket ID
+            requested (str): Formato pedido por el cliente (None = JSON)
+
+        Returns:
+            str: Formato aceptado ('msgpack' solo si está instalado)
+        """
+        fmt = WIRE_MSGPACK if requested == WIRE_MSGPACK and msgpack is not None else WIRE_JSON
+        with WireService._lock:
+            if fmt == WIRE_JSON:
+                WireService._formats.pop(sid, None)
+            else:
+                WireService._formats[sid] = fmt
+        return fmt
+
+    @staticmethod
+    def forget(sid):
+        """Olvida el formato de un socket (al desconectar)"""
+        with WireService._lock:
+            WireService._formats.pop(sid, None)
+
+    @staticmethod
+    def is_compact(sid):
+        """Indica si el socket usa el formato compacto"""
+        return sid in WireService._formats
+
+    @staticmethod
+    def compact_room(room):
+        """Sala paralela de los clientes compactos"""
+        return f"{room}#compact"
+
+    @staticmethod
+    def json_room(room):
+        """Sala paralela de los clientes JSON"""
+        return f"{room}#json"
+
+    @staticmethod
+    def format_room(sid, room):
+        """Sala paralela que corresponde al formato del socket"""
+        if WireService.is_compact(sid):
+            return WireService.compact_room(room)
+        return WireService.json_room(room)
+
+    @staticmethod
+    def compact_sids(room):
+        """
+        Sockets compactos presentes en una sala
+
+        Returns:
+            list: Socket IDs
+        """
+        from app.services.presence_service import PresenceService
+        return [sid for sid in PresenceService.sids(room) if sid in WireService._formats]
+
+    @staticmethod
+    def pack_message(message):
+        """
+        Convierte un mensaje formateado a su forma compacta (dict de claves cortas)
+
+        Args:
+            message (dict): Mensaje de format_message_for_emit
+
+        Returns:
+            dict: Mensaje con claves cortas
+        """
+        packed = {
+            short: message[key]
+            for key, short in _SHORT_KEYS.items()
+            if message.get(key) is not None
+        }
+        timestamp = message.get('timestamp')
+        if isinstance(timestamp, datetime):
+            if timestamp.tzinfo is None:
+                timestamp = timestamp.replace(tzinfo=timezone.utc)
+            packed['t'] = int(timestamp.timestamp() * 1000)
+
+        from app.models.message import is_default_security_flags
+        flags = message.get('security_flags')
+        if not is_default_security_flags(flags):
+            packed['x'] = dict(flags)
+        return packed
+
+    @staticmethod
+    def encode(payload):
+        """Serializa un payload compacto a bytes msgpack"""
+        return msgpack.packb(payload, use_bin_type=True)
+
+    @staticmethod
+    def broadcast(emit, event, room, payload):
+        """
+        Envía un evento de chat a la sala respetando el formato de cada socket
+
+        Args:
+            emit (callable): flask_socketio.emit o socketio.emit
+            event (str): "message" o "messages_batch"
+            room (str): Sala
+            payload (dict): Payload JSON del evento
+        """
+        if WireService._shared:
+            # Puede haber compactos en otros workers: cada formato a su sala
+            emit(event, payload, room=WireService.json_room(room))
+            if msgpack is None:
+                return
+        else:
+            compact = WireService.compact_sids(room)
+            if not compact:
+                emit(event, payload, room=room)
+                return
+            emit(event, payload, room=room, skip_sid=compact)
+
+        if event == "messages_batch":
+            packed = {'r': payload['room'], 'b': [WireService.pack_message(m) for m in payload['messages']]}
+        else:
+            packed = WireService.pack_message(payload)
+        emit(event, WireService.encode(packed), room=WireService.compact_room(room))
+
+    @staticmethod
+    def reset():
+        """Limpia el registro (útil en tests)"""
+        with WireService._lock:
+            WireService._formats.clear()
+            WireService._shared = False
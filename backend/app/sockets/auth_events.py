@@ -4,10 +4,10 @@ Eventos WebSocket de Autenticación
 Maneja registro, login y conexión de usuarios via WebSocket
 """
 
-from flask import request
+from flask import request, current_app
 from flask_socketio import emit
 from app.models import get_user_model
-from app.services import JWTService
+from app.services import JWTService, PresenceService, TypingService, WireService, BackpressureService, PresenceEventService, MembersService, RoomDirectoryService
 
 
 def register_auth_events(socketio):
@@ -25,7 +25,11 @@ def register_auth_events(socketio):
         Se ejecuta cuando un cliente establece conexión WebSocket
         
         Auth (opcional):
-            {"token": "eyJ..."}
+            {"token": "eyJ...", "wire": "msgpack"}
+        
+        Con "wire": "msgpack" los eventos "message" y "messages_batch"
+        llegan en formato binario compacto (ver WireService). El formato
+        aceptado se confirma en el campo "wire" del evento "status".
         
         Nota: La conexión se acepta pero si se envía un token, se valida
         """
@@ -37,8 +41,14 @@ def register_auth_events(socketio):
         username = None
         is_authenticated = False
         
+        requested_wire = request.args.get("wire")
         if isinstance(auth, dict):
             token = auth.get("token")
+            requested_wire = auth.get("wire") or requested_wire
+        
+        if not current_app.config.get("WIRE_COMPACT_ENABLED", True):
+            requested_wire = None
+        wire = WireService.negotiate(sid, requested_wire)
         
         # Si se proporciona token, validarlo
         if token:
@@ -59,7 +69,8 @@ def register_auth_events(socketio):
             "msg": "Conexión WebSocket establecida",
             "sid": sid,
             "authenticated": is_authenticated,
-            "username": username
+            "username": username,
+            "wire": wire
         })
     
     
@@ -186,6 +197,15 @@ def register_auth_events(socketio):
         sid = request.sid
         user_model = get_user_model()
         
+        WireService.forget(sid)
+        BackpressureService.forget(socketio.server.manager.eio_sid_from_sid(sid, "/"))
+        session = PresenceService.leave(sid)
+        if session:
+            TypingService.update(session["room"], session["username"], is_typing=False)
+            MembersService.publish(
+                socketio, emit, current_app.config.get('MEMBERS_FLUSH_INTERVAL_MS', 250) / 1000
+            )
+        
         # Buscar usuario por socket_id
         user = user_model.find_by_socket_id(sid)
         
@@ -211,20 +231,24 @@ def register_auth_events(socketio):
                 }
                 if current_room:
                     payload["room"] = current_room
+                    PresenceEventService.announce(socketio, emit, current_room, "disconnected", payload)
                 
-                emit("user_disconnected", payload, broadcast=True)
                 print(f"[disconnect] Usuario anónimo '{nickname}' eliminado (sid={sid})")
             else:
                 # Usuario normal: limpiar socket_id y current_room
                 user_model.clear_socket(sid)
                 
-                # Notificar desconexión
-                emit("user_disconnected", {
-                    "username": username,
-                    "room": current_room,
-                    "timestamp": ts.isoformat()
-                }, broadcast=True)
+                # Notificar desconexión solo a su sala
+                if current_room:
+                    PresenceEventService.announce(socketio, emit, current_room, "disconnected", {
+                        "username": username,
+                        "room": current_room,
+                        "timestamp": ts.isoformat()
+                    })
                 print(f"[disconnect] Usuario '{username}' desconectado (sid={sid})")
+            
+            # El conteo del directorio sale de current_room, recién limpiado
+            RoomDirectoryService.touch(current_room)
         else:
             print(f"[disconnect] Socket no asociado a usuario: {sid}")
     
@@ -4,10 +4,20 @@ Eventos WebSocket de Mensajes
 Maneja envío y recepción de mensajes en tiempo real
 """
 
+from flask import request, current_app
 from flask_socketio import emit
-from app.middleware import require_token_socket
+from app.middleware import require_token_socket, rate_limit_socket
 from app.models import get_user_model, get_room_model, get_message_model
-from app.services import RoomService
+from app.services import (
+    RoomService,
+    ShardService,
+    PresenceService,
+    TypingService,
+    BroadcastService,
+    HistoryService,
+    WireService,
+    RoomDirectoryService
+)
 
 
 def register_message_events(socketio):
@@ -19,6 +29,7 @@ def register_message_events(socketio):
     """
     
     @socketio.on("send_message")
+    @rate_limit_socket("send_message")
     @require_token_socket
     def handle_send_message(username, data):
         """
@@ -31,19 +42,35 @@ def register_message_events(socketio):
                 "room": "General",
                 "msg": "Hola a todos!",
                 "file_url": "https://...",          # Opcional
-                "original_filename": "imagen.jpg"   # Opcional
+                "original_filename": "imagen.jpg",  # Opcional
+                "file_size": 204800,                # Opcional, bytes
+                "client_msg_id": "c-42"             # Opcional, para reintentos
             }
         
         Emite:
+            - "message_ack" al emisor si envió client_msg_id:
+              {client_msg_id, id, seq, room, duplicate}
+              (duplicate=true: reintento de un mensaje ya guardado, no se reenvía)
             - "message" a todos en la sala con el mensaje
+            - "messages_batch" ({room, messages: [...]}) en lugar de varios
+              "message" si BROADCAST_BATCH_WINDOW_MS > 0 y la sala está en ráfaga
+            - "room_moved" si la sala pasó a otro worker
             - "msg_error" si hay error
         """
         room = (data.get("room") or "").strip()
         msg = (data.get("msg") or "").strip()
         file_url = data.get("file_url")
         original_filename = data.get("original_filename")
+        file_size = data.get("file_size")
+        client_msg_id = data.get("client_msg_id")
         
         # Validaciones básicas
+        if client_msg_id is not None and (
+            not isinstance(client_msg_id, str) or not 0 < len(client_msg_id) <= 64
+        ):
+            emit("msg_error", {"msg": "client_msg_id inválido (texto de 1 a 64 caracteres)"})
+            return
+        
         if not msg and not file_url:
             emit("msg_error", {"msg": "msg o file_url requeridos"})
             return
@@ -52,6 +79,12 @@ def register_message_events(socketio):
             emit("msg_error", {"msg": "room requerido"})
             return
         
+        # La sala cambió de worker (rebalanceo): el cliente debe reconectarse
+        moved = ShardService.route(room)
+        if moved:
+            emit("room_moved", moved)
+            return
+        
         user_model = get_user_model()
         room_model = get_room_model()
         message_model = get_message_model()
@@ -70,21 +103,44 @@ def register_message_events(socketio):
                 })
                 return
         
-        # Crear mensaje en la base de datos
-        message = message_model.create_message(
-            room=room,
-            username=username,
+        # Crear mensaje en la base de datos (una sola vez por client_msg_id)
+        fields = dict(
             msg=msg,
             nickname=user.get("nickname"),
             file_url=file_url,
-            original_filename=original_filename
+            original_filename=original_filename,
+            file_size=file_size if isinstance(file_size, int) else None
         )
+        if client_msg_id:
+            message, created = message_model.create_message_once(
+                room, username, client_msg_id, **fields
+            )
+        else:
+            message, created = message_model.create_message(room, username, **fields), True
         
         # Formatear mensaje para enviar
         formatted_message = message_model.format_message_for_emit(message)
         
-        # Enviar a todos en la sala
-        emit("message", formatted_message, room=room)
+        if client_msg_id:
+            emit("message_ack", {
+                "client_msg_id": client_msg_id,
+                "id": formatted_message["id"],
+                "seq": formatted_message["seq"],
+                "room": formatted_message["room"],
+                "duplicate": not created
+            })
+            if not created:
+                return
+        
+        HistoryService.append(room, formatted_message)
+        RoomDirectoryService.touch(room)
+        
+        # Enviar a todos en la sala (agrupado si está activado)
+        window_ms = current_app.config.get('BROADCAST_BATCH_WINDOW_MS', 0)
+        if window_ms > 0:
+            BroadcastService.publish(socketio, room, formatted_message, window_ms / 1000)
+        else:
+            WireService.broadcast(emit, "message", room, formatted_message)
         
         # Log
         if file_url:
@@ -94,6 +150,7 @@ def register_message_events(socketio):
     
     
     @socketio.on("get_messages")
+    @rate_limit_socket("get_messages")
     @require_token_socket
     def handle_get_messages(username, data):
         """
@@ -134,46 +191,119 @@ def register_message_events(socketio):
         })
     
     
-    @socketio.on("typing")
+    @socketio.on("resync")
+    @rate_limit_socket("resync")
     @require_token_socket
-    def handle_typing(username, data):
+    def handle_resync(username, data):
+        """
+        Evento: resync
+        Reanuda una sala tras una reconexión enviando solo los mensajes
+        que el cliente se perdió (hacer "join" antes)
+        
+        Data:
+            {
+                "token": "eyJ...",
+                "room": "General",
+                "last_seq": 41,                 # Último "seq" recibido
+                "last_message_id": "65a1..."    # Alternativa: último "id"
+            }
+        
+        Emite:
+            - "resync_messages" {room, messages, count} con lo que faltaba
+            - "resync_gap" {room, reason} si faltan demasiados mensajes
+              (el cliente debe pedir el historial con "get_messages")
+            - "resync_error" si hay error
+        """
+        room = (data.get("room") or "").strip()
+        last_message_id = data.get("last_message_id")
+        last_seq = data.get("last_seq")
+        
+        if last_seq is not None and (not isinstance(last_seq, int) or last_seq < 0):
+            emit("resync_error", {"msg": "last_seq debe ser un entero >= 0"})
+            return
+        
+        if not room or (last_seq is None and not last_message_id):
+            emit("resync_error", {"msg": "room y last_seq (o last_message_id) requeridos"})
+            return
+        
+        session = PresenceService.get_session(request.sid)
+        if not session or session["room"] != room or session["username"] != username:
+            emit("resync_error", {"msg": "no perteneces a esa sala"})
+            return
+        
+        missed = HistoryService.missed_since(
+            room,
+            last_message_id=str(last_message_id) if last_message_id else None,
+            last_seq=last_seq,
+            max_messages=current_app.config.get('RESYNC_MAX_MESSAGES', 100)
+        )
+        
+        if missed is None:
+            emit("resync_gap", {"room": room, "reason": "gap_too_large"})
+            return
+        
+        emit("resync_messages", {
+            "room": room,
+            "messages": missed,
+            "count": len(missed)
+        })
+    
+    
+    @socketio.on("typing")
+    @rate_limit_socket("typing")
+    def handle_typing(data):
         """
         Evento: typing
         Notifica que un usuario está escribiendo
+        No emite nada directamente: el estado se agrega por sala y se
+        envía como un solo evento cada TYPING_FLUSH_INTERVAL_MS
+        
+        Es el evento más frecuente: no verifica el JWT ni consulta MongoDB.
+        El usuario sale del registro de presencia, que solo tiene sockets
+        que entraron a la sala con un token válido ("join")
         
         Data:
             {
-                "token": "eyJ...",
                 "room": "General",
                 "is_typing": true
             }
         
         Emite:
-            - "user_typing" a todos en la sala (excepto al emisor)
+            - "typing_state" a todos en la sala:
+              {"room": "General", "users": [{"username", "nickname"}, ...]}
+              (el cliente se excluye a sí mismo de la lista)
         """
         room = (data.get("room") or "").strip()
-        is_typing = data.get("is_typing", False)
+        is_typing = bool(data.get("is_typing", False))
         
         if not room:
             return
         
-        user_model = get_user_model()
-        user = user_model.find_by_username(username)
+        # Verificar que está en la sala (registro en memoria, sin MongoDB)
+        session = PresenceService.get_session(request.sid)
+        if not session or session["room"] != room:
+            return
+        username = session["username"]
         
-        # Verificar que está en la sala
-        if not user or user.get("current_room") != room:
+        TypingService.update(
+            room, username,
+            nickname=session.get("nickname"),
+            is_typing=is_typing,
+            ttl=current_app.config.get('TYPING_TTL_SECONDS', 5)
+        )
+        
+        interval_ms = current_app.config.get('TYPING_FLUSH_INTERVAL_MS', 250)
+        if interval_ms > 0:
+            TypingService.ensure_flusher(socketio, interval_ms / 1000)
             return
         
-        # Notificar a los demás
-        emit("user_typing", {
-            "username": username,
-            "nickname": user.get("nickname"),
-            "room": room,
-            "is_typing": is_typing
-        }, room=room, include_self=False)
+        # Sin intervalo: emitir de inmediato (modo testing)
+        for room_name, users in TypingService.flush().items():
+            emit("typing_state", {"room": room_name, "users": users}, room=room_name)
     
     
     @socketio.on("delete_message")
+    @rate_limit_socket("delete_message")
     @require_token_socket
     def handle_delete_message(username, data):
         """
@@ -222,8 +352,11 @@ def register_message_events(socketio):
             emit("error", {"msg": "No tienes permiso para eliminar este mensaje"})
             return
         
-        # Eliminar mensaje
-        mongo.db.messages.delete_one({"_id": ObjectId(message_id)})
+        # Eliminar mensaje (y sus adjuntos)
+        message_model = get_message_model()
+        message_model.delete_message(ObjectId(message_id))
+        HistoryService.remove(room, message_id)
+        RoomDirectoryService.touch(room)
         
         # Notificar a todos
         emit("message_deleted", {
@@ -236,6 +369,7 @@ def register_message_events(socketio):
     
     
     @socketio.on("search_messages")
+    @rate_limit_socket("search_messages")
     @require_token_socket
     def handle_search_messages(username, data):
         """
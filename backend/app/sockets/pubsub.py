@@ -0,0 +1,175 @@
+# app/sockets/pubsub.py
+"""
+Fan-out de Socket.IO entre procesos y nodos
+Sin cola de mensajes, emit(..., room=sala) solo llega a los sockets
+conectados al proceso actual. Con SOCKETIO_MESSAGE_QUEUE todos los
+workers publican y escuchan en el mismo canal.
+
+Backends soportados (según el esquema de la URL):
+- redis:// / rediss://      -> RedisManager (Redis o compatible: KeyDB, Valkey)
+- amqp:// y otros de kombu  -> KombuManager (RabbitMQ, etc.)
+- zmq+tcp://                -> ZmqManager (sockets locales, ideal para pruebas)
+- kafka://                  -> KafkaManager
+- mongodb:// / mongodb+srv:// -> MongoPubSubManager (colección capped, sin
+                               infraestructura extra; funciona en standalone)
+"""
+
+import time
+import pymongo
+import socketio
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+
+MONGO_SCHEMES = ('mongodb://', 'mongodb+srv://')
+
+
+class MongoPubSubManager(socketio.PubSubManager):
+    """
+    Gestor pub/sub sobre una colección capped de MongoDB
+    Cada emit se inserta como documento y cada worker lo lee con un
+    cursor tailable. No usa change streams porque requieren replica set.
+
+    Args:
+        url (str): URI de MongoDB
+        channel (str): Canal (la colección es socketio_<channel>)
+        write_only (bool): Solo publicar (procesos externos sin servidor)
+        size_bytes (int): Tamaño máximo de la colección capped
+        logger: Logger opcional
+        json: Módulo JSON opcional
+    """
+
+    name = 'mongodb'
+
+    def __init__(self, url='mongodb://localhost:27017/salas_distribuidas',
+                 channel='salas-socketio', write_only=False,
+                 size_bytes=16 * 1024 * 1024, logger=None, json=None):
+        super().__init__(channel=channel, write_only=write_only,
+                         logger=logger, json=json)
+        self.url = url
+        self.size_bytes = size_bytes
+        self.client = pymongo.MongoClient(url)
+        self.db = self.client.get_default_database(default='salas_distribuidas')
+        self.collection = self._ensure_collection()
+
+    def _ensure_collection(self):
+        """Crea la colección capped si no existe"""
+        name = f'socketio_{self.channel}'
+        try:
+            self.db.create_collection(name, capped=True, size=self.size_bytes)
+        except CollectionInvalid:
+            pass  # ya existe
+        return self.db[name]
+
+    def _publish(self, data):
+        try:
+            self.collection.insert_one({
+                'payload': self.json.dumps(data),
+                'ts': time.time()
+            })
+        except PyMongoError as e:
+            self._get_logger().error(f'No se pudo publicar en MongoDB: {e}')
+
+    def _listen(self):
+        # Empezar después del último mensaje existente (no reenviar historial)
+        last_id = self._blocking(self._newest_id)
+
+        while True:
+            try:
+                cursor, skip_to = self._blocking(self._open_cursor, last_id)
+                while cursor.alive:
+                    # getMore espera en el servidor: en un hilo real, no en el hub
+                    doc = self._blocking(cursor.try_next)
+                    if doc is None:
+                        self.server.sleep(0)
+                        continue
+                    if skip_to is not None:
+                        # Ya entregados antes de recrear el cursor
+                        if doc['_id'] == skip_to:
+                            skip_to = None
+                        continue
+                    last_id = doc['_id']
+                    yield doc['payload']
+            except PyMongoError as e:
+                self._get_logger().error(f'Error leyendo cola MongoDB: {e}')
+            # Cursor muerto (colección vacía o error): reintentar
+            self.server.sleep(0.1)
+
+    def _newest_id(self):
+        last = self.collection.find_one(sort=[('$natural', pymongo.DESCENDING)])
+        return last['_id'] if last else None
+
+    def _open_cursor(self, last_id):
+        """
+        Abre el cursor tailable en orden de inserción ($natural)
+        Los ObjectId de distintos procesos no están ordenados entre sí, así
+        que no se reanuda con $gt: se recorre desde el inicio y se saltan
+        los documentos hasta el último entregado
+
+        Returns:
+            tuple: (cursor, _id hasta el que saltar o None)
+        """
+        if last_id is not None and self.collection.find_one({'_id': last_id}) is None:
+            # La colección capped ya lo descartó: seguir desde lo más nuevo
+            self._get_logger().warning('Cola MongoDB: se perdieron mensajes al reanudar')
+            last_id = self._newest_id()
+        cursor = self.collection.find(
+            {}, cursor_type=pymongo.CursorType.TAILABLE_AWAIT
+        ).sort('$natural', pymongo.ASCENDING)
+        return cursor, last_id
+
+    def _blocking(self, func, *args):
+        """
+        Ejecuta una llamada bloqueante de pymongo sin detener el event loop
+        (con eventlet sin monkey_patch, en el pool de hilos reales)
+        """
+        if getattr(self.server, 'async_mode', None) == 'eventlet':
+            from eventlet import tpool
+            return tpool.execute(func, *args)
+        return func(*args)
+
+
+def create_client_manager(url, channel='salas-socketio', write_only=False):
+    """
+    Crea el gestor de clientes Socket.IO adecuado para la URL
+
+    Args:
+        url (str): URL de la cola (None o vacío = un solo proceso)
+        channel (str): Canal compartido por todos los workers
+        write_only (bool): Solo publicar, sin escuchar
+
+    Returns:
+        socketio.Manager | None: Gestor de clientes, o None si no hay cola
+    """
+    if not url:
+        return None
+
+    if url.startswith(MONGO_SCHEMES):
+        return MongoPubSubManager(url, channel=channel, write_only=write_only)
+    if url.startswith(('redis://', 'rediss://')):
+        return socketio.RedisManager(url, channel=channel, write_only=write_only)
+    if url.startswith('kafka://'):
+        return socketio.KafkaManager(url, channel=channel, write_only=write_only)
+    if url.startswith('zmq'):
+        return socketio.ZmqManager(url, channel=channel, write_only=write_only)
+    return socketio.KombuManager(url, channel=channel, write_only=write_only)
+
+
+def socketio_queue_options(config):
+    """
+    Opciones para socketio.init_app según la configuración
+
+    Args:
+        config (dict): app.config
+
+    Returns:
+        dict: {'client_manager': ...} o {} si no hay cola configurada
+    """
+    manager = create_client_manager(
+        config.get('SOCKETIO_MESSAGE_QUEUE'),
+        channel=config.get('SOCKETIO_CHANNEL', 'salas-socketio')
+    )
+    if manager is None:
+        return {}
+
+    print(f"[sockets] fan-out entre procesos vía {manager.name}")
+    return {'client_manager': manager}
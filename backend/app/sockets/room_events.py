@@ -4,13 +4,13 @@ Eventos WebSocket de Salas
 Maneja unirse, salir y gestión de salas en tiempo real
 """
 
-from flask import request
+from flask import request, current_app
 from flask_socketio import emit, join_room, leave_room
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from app.middleware import require_token_socket
+from app.middleware import require_token_socket, rate_limit_socket
 from app.models import get_user_model, get_room_model
-from app.services import JWTService, RoomService
+from app.services import JWTService, RoomService, PresenceService, ShardService, TypingService, WireService, PresenceEventService, MembersService, RoomDirectoryService
 
 
 def register_room_events(socketio):
@@ -37,6 +37,9 @@ def register_room_events(socketio):
         Emite:
             - "join_success" al usuario que se une
             - "user_joined" a todos en la sala
+              (en salas grandes, "presence_delta" periódico)
+            - "join_redirect" si la sala la atiende otro worker
+              ({room, worker_id, url}: el cliente debe reconectarse a url)
             - "join_error" si hay error
         """
         sid = request.sid
@@ -58,6 +61,12 @@ def register_room_events(socketio):
             emit("join_error", {"msg": "Sala no existe"})
             return
         
+        # 2b. En modo multiproceso, la sala debe atenderla este worker
+        redirect = ShardService.route(room_name)
+        if redirect:
+            emit("join_redirect", redirect)
+            return
+        
         # 3. Verificar PIN si es requerido
         if not room_model.verify_pin(room_name, provided_pin):
             emit("join_error", {"msg": "PIN inválido"})
@@ -84,25 +93,43 @@ def register_room_events(socketio):
             return
         
         # 5. Actualizar usuario en la base de datos
-        user_model.update_room(username, room_name, socket_id=sid)
+        user = user_model.update_room(username, room_name, socket_id=sid) or {}
+        previous = PresenceService.get_session(sid)
+        PresenceService.join(
+            sid, username, room_name,
+            nickname=user.get("nickname"),
+            is_anonymous=user.get("is_anonymous", False)
+        )
         
         # 6. Unir al usuario a la sala de WebSocket
         join_room(room_name)
+        if previous and previous["room"] != room_name:
+            leave_room(WireService.format_room(sid, previous["room"]))
+        join_room(WireService.format_room(sid, room_name))
         
-        # 7. Confirmar al usuario
+        # 7. Confirmar al usuario y enviarle la lista de miembros (versionada)
         emit("join_success", {"room": room_name})
+        emit("members_snapshot", MembersService.snapshot(
+            room_name, limit=current_app.config.get('MEMBERS_SNAPSHOT_PAGE_SIZE', 200)
+        ))
         
-        # 8. Notificar a todos en la sala
+        # 8. Notificar a la sala (en salas grandes, agrupado en presence_delta)
         ts = datetime.now(ZoneInfo('America/Guayaquil'))
-        emit("user_joined", {
+        announced = PresenceEventService.announce(socketio, emit, room_name, "joined", {
             "username": username,
+            "nickname": user.get("nickname"),
             "room": room_name,
             "timestamp": ts.isoformat()
-        }, room=room_name)
+        })
+        if announced:
+            emit("status", {
+                "msg": f"{username} se unió a {room_name}"
+            }, room=room_name)
         
-        emit("status", {
-            "msg": f"{username} se unió a {room_name}"
-        }, room=room_name)
+        MembersService.publish(socketio, emit, _members_interval())
+        RoomDirectoryService.touch(room_name)
+        if previous and previous["room"] != room_name:
+            RoomDirectoryService.touch(previous["room"])
         
         print(f"[join] {username} -> {room_name}")
     
@@ -123,6 +150,7 @@ def register_room_events(socketio):
         Emite:
             - "leave_success" al usuario
             - "user_left" a todos en la sala
+              (en salas grandes, "presence_delta" periódico)
             - "leave_error" si hay error
         """
         room = (data.get("room") or "").strip()
@@ -147,8 +175,11 @@ def register_room_events(socketio):
         if user.get("is_anonymous"):
             nickname = user.get("nickname")
             user_model.delete_anonymous_user(username)
+            PresenceService.leave(request.sid)
+            TypingService.update(room, username, is_typing=False)
             
             leave_room(room)
+            leave_room(WireService.format_room(request.sid, room))
             emit("leave_success", {"room": room})
             
             ts = datetime.now(ZoneInfo('America/Guayaquil'))
@@ -158,29 +189,37 @@ def register_room_events(socketio):
                 "room": room,
                 "timestamp": ts.isoformat()
             }
-            emit("user_left", payload, room=room)
-            emit("status", {
-                "msg": f"{nickname} salió de {room}"
-            }, room=room)
+            if PresenceEventService.announce(socketio, emit, room, "left", payload):
+                emit("status", {
+                    "msg": f"{nickname} salió de {room}"
+                }, room=room)
             
+            MembersService.publish(socketio, emit, _members_interval())
+            RoomDirectoryService.touch(room)
             print(f"[leave] {username} (anon: {nickname}) <- {room}")
         else:
             # Usuario normal: limpiar current_room
             user_model.update_room(username, None)
+            PresenceService.leave(request.sid)
+            TypingService.update(room, username, is_typing=False)
             
             leave_room(room)
+            leave_room(WireService.format_room(request.sid, room))
             emit("leave_success", {"room": room})
             
             ts = datetime.now(ZoneInfo('America/Guayaquil'))
-            emit("user_left", {
+            announced = PresenceEventService.announce(socketio, emit, room, "left", {
                 "username": username,
                 "room": room,
                 "timestamp": ts.isoformat()
-            }, room=room)
-            emit("status", {
-                "msg": f"{username} salió de {room}"
-            }, room=room)
+            })
+            if announced:
+                emit("status", {
+                    "msg": f"{username} salió de {room}"
+                }, room=room)
             
+            MembersService.publish(socketio, emit, _members_interval())
+            RoomDirectoryService.touch(room)
             print(f"[leave] {username} <- {room}")
     
     
@@ -225,10 +264,35 @@ def register_room_events(socketio):
         Emite:
             - "rooms_list" con la lista de salas
         """
-        rooms = RoomService.list_rooms_with_stats()
+        rooms = RoomDirectoryService.list_rooms()
         emit("rooms_list", {"rooms": rooms})
     
     
+    @socketio.on("subscribe_rooms_directory")
+    def handle_subscribe_rooms_directory(data=None):
+        """
+        Evento: subscribe_rooms_directory
+        Suscribe al directorio de salas en vivo (no requiere autenticación),
+        en lugar de repetir "list_rooms"
+        
+        Emite:
+            - "rooms_directory" con {version, rooms} al suscriptor
+            - Luego, a los suscriptores: "room_created", "room_updated",
+              "room_deleted" y "room_counts" (agrupado)
+        """
+        join_room(RoomDirectoryService.ROOM)
+        emit("rooms_directory", RoomDirectoryService.snapshot())
+    
+    
+    @socketio.on("unsubscribe_rooms_directory")
+    def handle_unsubscribe_rooms_directory(data=None):
+        """
+        Evento: unsubscribe_rooms_directory
+        Deja de recibir los cambios del directorio de salas
+        """
+        leave_room(RoomDirectoryService.ROOM)
+    
+    
     @socketio.on("get_members")
     @require_token_socket
     def handle_get_members(username, data):
@@ -272,4 +336,58 @@ def register_room_events(socketio):
         })
     
     
-    print("[sockets] Eventos de salas registrados")
\ No newline at end of file
+    @socketio.on("members_sync")
+    @rate_limit_socket("members_sync")
+    @require_token_socket
+    def handle_members_sync(username, data):
+        """
+        Evento: members_sync
+        Pone al día la lista de miembros de una sala desde memoria
+        
+        Data:
+            {
+                "token": "eyJ...",
+                "room": "General",
+                "version": 41,               # Versión que conoce el cliente (opcional)
+                "cursor": "eyJ1c2VybmFt..."  # Página siguiente del snapshot (opcional)
+            }
+        
+        Emite:
+            - "members_delta" solo a este cliente si el diario cubre su versión
+              ({room, from_version, version, added, removed})
+            - "members_snapshot" (página) en otro caso
+              ({room, version, members, count, next_cursor})
+            - "error" si hay error
+        """
+        room_name = (data.get("room") or "").strip()
+        version = data.get("version")
+        cursor = data.get("cursor")
+        
+        if not room_name:
+            emit("error", {"msg": "room requerido"})
+            return
+        
+        if isinstance(version, int) and not isinstance(version, bool) and not cursor:
+            delta = MembersService.delta_since(room_name, version)
+            if delta is not None:
+                emit("members_delta", delta)
+                return
+        
+        try:
+            snapshot = MembersService.snapshot(
+                room_name,
+                limit=current_app.config.get('MEMBERS_SNAPSHOT_PAGE_SIZE', 200),
+                cursor=cursor
+            )
+        except ValueError:
+            emit("error", {"msg": "cursor inválido"})
+            return
+        
+        emit("members_snapshot", snapshot)
+    
+    
+    print("[sockets] Eventos de salas registrados")
+
+
+def _members_interval():
+    return current_app.config.get('MEMBERS_FLUSH_INTERVAL_MS', 250) / 1000
\ No newline at end of file
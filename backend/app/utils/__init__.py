@@ -4,6 +4,11 @@ Utils Package
 Este paquete contiene utilidades y helpers para toda la aplicación:
 - database: Configuración e instancias de MongoDB y Bcrypt
 - validators: Funciones para validar datos de entrada
+- pagination: Cursores opacos para paginación por keyset
+- hash_ring: Hashing consistente (sala -> worker)
+- serialization: Capa JSON (orjson) para Flask y Socket.IO
+- rate_limit: Token buckets en memoria o compartidos en MongoDB
+- compression: Códecs de compresión HTTP (gzip, brotli y zstd opcionales)
 """
 
 from app.utils.database import mongo, bcrypt, init_database
@@ -14,6 +19,11 @@ from app.utils.validators import (
     validate_all
 )
 
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.hash_ring import HashRing
+from app.utils.rate_limit import MemoryBucketStore, MongoBucketStore, parse_policies
+from app.utils.compression import available_encodings, compress
+
 # Exportar todo lo que es público
 __all__ = [
     'mongo',
@@ -21,5 +31,13 @@ __all__ = [
     'init_database',
     'Validators',
     'ValidationError',
-    'validate_all'
+    'validate_all',
+    'encode_cursor',
+    'decode_cursor',
+    'HashRing',
+    'MemoryBucketStore',
+    'MongoBucketStore',
+    'parse_policies',
+    'available_encodings',
+    'compress'
 ]
@@ -0,0 +1,138 @@
+"""
+Caché en memoria con TTL y "single-flight"
+Si varios clientes piden el mismo valor a la vez y no está en caché,
+solo uno lo calcula y el resto espera y reutiliza el resultado
+"""
+
+import time
+import threading
+
+
+class _Flight:
+    """Cálculo en curso compartido por todos los que esperan la misma clave"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Caché clave -> valor con expiración y coalescencia de cálculos
+
+    Ejemplo:
+        cache = TTLCache(ttl=5)
+        stats = cache.get_or_compute('global', compute_stats)
+    """
+
+    def __init__(self, ttl=5.0, clock=time.monotonic, max_size=None):
+        """
+        Args:
+            ttl (float): Segundos que un valor se considera fresco
+                (0 = sin caché, solo coalescencia de llamadas simultáneas)
+            clock (callable): Reloj monotónico (inyectable para tests)
+            max_size (int): Máximo de claves; al superarlo se descartan
+                las más antiguas (None = sin límite)
+        """
+        self.ttl = ttl
+        self.clock = clock
+        self.max_size = max_size
+        self._values = {}
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "computed": 0, "coalesced": 0}
+
+    def get(self, key):
+        """
+        Obtiene un valor fresco de la caché
+
+        Returns:
+            El valor, o None si no existe o expiró
+        """
+        entry = self._values.get(key)
+        if entry and entry[1] > self.clock():
+            return entry[0]
+        return None
+
+    def set(self, key, value):
+        """Guarda un valor con el TTL configurado"""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._values.pop(key, None)
+            self._values[key] = (value, self.clock() + self.ttl)
+            if self.max_size is not None:
+                while len(self._values) > self.max_size:
+                    # dict conserva el orden de inserción: la primera es la más antigua
+                    self._values.pop(next(iter(self._values)))
+
+    def invalidate(self, key=None):
+        """
+        Invalida una clave (o toda la caché si key es None)
+        """
+        with self._lock:
+            if key is None:
+                self._values.clear()
+            else:
+                self._values.pop(key, None)
+
+    def stats(self):
+        """
+        Contadores de uso
+
+        Returns:
+            dict: {hits (frescos en caché), computed (cálculos ejecutados),
+                   coalesced (esperaron un cálculo en curso), size}
+        """
+        return {**self._counts, "size": len(self._values)}
+
+    def get_or_compute(self, key, compute):
+        """
+        Devuelve el valor en caché o lo calcula una sola vez
+
+        Args:
+            key: Clave hashable
+            compute (callable): Función sin argumentos que calcula el valor
+
+        Returns:
+            El valor (compartido entre todos los que lo pidieron a la vez)
+
+        Raises:
+            Exception: La misma que lanzó compute, para todos los que esperaban
+        """
+        value = self.get(key)
+        if value is not None:
+            self._counts["hits"] += 1
+            return value
+
+        with self._lock:
+            value = self.get(key)
+            if value is not None:
+                self._counts["hits"] += 1
+                return value
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+            self._counts["computed" if leader else "coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            self.set(key, flight.value)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
@@ -0,0 +1,69 @@
+"""
+Compresión de cuerpos HTTP
+gzip siempre está disponible (librería estándar); brotli ("br") y
+zstandard ("zstd") se usan solo si están instalados.
+
+Niveles elegidos para respuestas dinámicas: priorizan CPU sobre el
+último punto de ratio (ver benchmarks/compression.py).
+"""
+
+import gzip
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard es opcional
+    zstandard = None
+
+
+def _gzip(data):
+    return gzip.compress(data, compresslevel=5, mtime=0)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=4)
+
+
+def _zstd(data):
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+CODECS = {'gzip': _gzip}
+if brotli is not None:
+    CODECS['br'] = _brotli
+if zstandard is not None:
+    CODECS['zstd'] = _zstd
+
+
+def available_encodings(preferred):
+    """
+    Filtra las codificaciones instaladas conservando el orden de preferencia
+
+    Args:
+        preferred (str | list): 'zstd,br,gzip' o lista equivalente
+
+    Returns:
+        list: Codificaciones utilizables, de la preferida a la última
+    """
+    if isinstance(preferred, str):
+        preferred = preferred.split(',')
+    names = [p.strip() for p in preferred if p.strip()]
+    return [name for name in names if name in CODECS]
+
+
+def compress(encoding, data):
+    """
+    Comprime un cuerpo
+
+    Args:
+        encoding (str): 'gzip', 'br' o 'zstd' (ver available_encodings)
+        data (bytes): Cuerpo sin comprimir
+
+    Returns:
+        bytes: Cuerpo comprimido
+    """
+    return CODECS[encoding](data)
@@ -0,0 +1,75 @@
+"""
+Hashing consistente
+Asigna claves (nombres de sala) a nodos (workers) de forma estable:
+al agregar o quitar un nodo solo se mueve ~1/N de las claves
+"""
+
+import bisect
+import hashlib
+
+
+def _hash(value):
+    """Hash estable entre procesos (hash() de Python cambia por proceso)"""
+    return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing:
+    """
+    Anillo de hashing consistente con nodos virtuales
+
+    Ejemplo:
+        ring = HashRing(['worker-0', 'worker-1'])
+        ring.get_node('General')   # 'worker-1'
+    """
+
+    def __init__(self, nodes=(), replicas=100):
+        """
+        Args:
+            nodes (iterable): Identificadores de los nodos
+            replicas (int): Nodos virtuales por nodo (más = reparto más uniforme)
+        """
+        self.replicas = replicas
+        self._keys = []         # posiciones ordenadas en el anillo
+        self._owners = {}       # posición -> nodo
+        self._nodes = set()
+        for node in nodes:
+            self.add_node(node)
+
+    @property
+    def nodes(self):
+        """Nodos del anillo, ordenados"""
+        return sorted(self._nodes)
+
+    def add_node(self, node):
+        """Agrega un nodo con sus réplicas virtuales"""
+        if node in self._nodes:
+            return
+        self._nodes.add(node)
+        for i in range(self.replicas):
+            position = _hash(f'{node}#{i}')
+            bisect.insort(self._keys, position)
+            self._owners[position] = node
+
+    def remove_node(self, node):
+        """Quita un nodo y sus réplicas virtuales"""
+        if node not in self._nodes:
+            return
+        self._nodes.discard(node)
+        for i in range(self.replicas):
+            position = _hash(f'{node}#{i}')
+            index = bisect.bisect_left(self._keys, position)
+            if index < len(self._keys) and self._keys[index] == position:
+                del self._keys[index]
+            self._owners.pop(position, None)
+
+    def get_node(self, key):
+        """
+        Obtiene el nodo dueño de una clave
+
+        Returns:
+            str | None: Nodo, o None si el anillo está vacío
+        """
+        if not self._keys:
+            return None
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._owners[self._keys[index]]
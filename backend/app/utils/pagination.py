@@ -0,0 +1,70 @@
+"""
+Utilidades de paginación por cursor
+Codifica y decodifica cursores opacos para recorrer colecciones grandes
+sin usar skip() (que escanea todos los documentos saltados)
+"""
+
+import base64
+from bson import json_util
+
+
+def encode_cursor(values):
+    """
+    Codifica un cursor opaco a partir de los valores de la última fila
+
+    Args:
+        values (dict): Valores de orden del último documento
+            (ej. {"created_at": datetime, "_id": ObjectId})
+
+    Returns:
+        str: Cursor en base64 url-safe
+    """
+    raw = json_util.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decodifica un cursor generado por encode_cursor
+
+    Args:
+        cursor (str): Cursor recibido del cliente
+
+    Returns:
+        dict: Valores de orden (con tipos BSON restaurados)
+
+    Raises:
+        ValueError: Si el cursor es inválido
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("cursor inválido")
+
+    if not isinstance(values, dict):
+        raise ValueError("cursor inválido")
+
+    return values
+
+
+def keyset_filter(field, value, last_id, direction=-1):
+    """
+    Construye el filtro de "keyset pagination" para (field, _id)
+
+    Args:
+        field (str): Campo de orden principal (ej. 'created_at')
+        value: Valor de ese campo en el último documento entregado
+        last_id: _id del último documento entregado (desempate)
+        direction (int): -1 para orden descendente, 1 ascendente
+
+    Returns:
+        dict: Filtro de MongoDB para obtener la página siguiente
+    """
+    op = "$lt" if direction < 0 else "$gt"
+    return {
+        "$or": [
+            {field: {op: value}},
+            {field: value, "_id": {op: last_id}}
+        ]
+    }
@@ -0,0 +1,145 @@
+"""
+Limitador de frecuencia por token bucket
+Cada clave (evento + sid, evento + usuario) tiene un balde de `burst`
+fichas que se rellena a `rate` fichas por segundo; cada evento consume
+una. Sin fichas, el evento se rechaza e indica cuánto esperar.
+
+Almacenes:
+- MemoryBucketStore: dict en el proceso (un solo nodo, el más rápido)
+- MongoBucketStore: colección compartida entre nodos; cada consulta es
+  un único find_one_and_update atómico (update con pipeline, MongoDB 4.2+)
+"""
+
+import time
+import threading
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+
+
+class MemoryBucketStore:
+    """
+    Baldes en memoria: clave -> (fichas, último instante)
+
+    Args:
+        max_keys (int): Máximo de baldes; al superarlo se descartan los
+            más antiguos (un balde olvidado equivale a uno lleno)
+        clock (callable): Reloj monotónico (inyectable para tests)
+    """
+
+    def __init__(self, max_keys=100000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, rate, burst, cost=1):
+        """
+        Intenta consumir fichas de un balde
+
+        Args:
+            key (str): Clave del balde
+            rate (float): Fichas por segundo
+            burst (int): Capacidad del balde
+            cost (int): Fichas que consume esta llamada
+
+        Returns:
+            float: 0 si se permite, o segundos a esperar si se rechaza
+        """
+        now = self.clock()
+        with self._lock:
+            entry = self._buckets.pop(key, None)
+            tokens = burst if entry is None else min(burst, entry[0] + (now - entry[1]) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            # Reinsertar al final mantiene el orden de uso para el descarte
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.pop(next(iter(self._buckets)))
+
+        return 0 if allowed else (cost - tokens) / rate
+
+    def reset(self):
+        """Vacía todos los baldes"""
+        with self._lock:
+            self._buckets.clear()
+
+
+class MongoBucketStore:
+    """
+    Baldes compartidos en MongoDB (colección `rate_limits`)
+    Los documentos expiran solos con un índice TTL sobre expire_at
+
+    Args:
+        collection: Colección de pymongo
+        clock (callable): Reloj de pared (los nodos deben estar sincronizados)
+    """
+
+    def __init__(self, collection, clock=time.time):
+        self.collection = collection
+        self.clock = clock
+        collection.create_index("expire_at", expireAfterSeconds=0)
+
+    def consume(self, key, rate, burst, cost=1):
+        """
+        Intenta consumir fichas de un balde (misma semántica que MemoryBucketStore)
+
+        Returns:
+            float: 0 si se permite, o segundos a esperar si se rechaza
+        """
+        now = self.clock()
+        refill_seconds = burst / rate
+        refilled = {"$min": [
+            burst,
+            {"$add": [
+                {"$ifNull": ["$tokens", burst]},
+                {"$multiply": [{"$subtract": [now, {"$ifNull": ["$ts", now]}]}, rate]}
+            ]}
+        ]}
+        doc = self.collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "ts": now}},
+                {"$set": {
+                    "allowed": {"$gte": ["$tokens", cost]},
+                    "tokens": {"$cond": [
+                        {"$gte": ["$tokens", cost]},
+                        {"$subtract": ["$tokens", cost]},
+                        "$tokens"
+                    ]},
+                    "expire_at": datetime.utcfromtimestamp(now) + timedelta(seconds=refill_seconds)
+                }}
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return 0 if doc["allowed"] else (cost - doc["tokens"]) / rate
+
+    def reset(self):
+        """Vacía todos los baldes"""
+        self.collection.delete_many({})
+
+
+def parse_policies(spec):
+    """
+    Convierte "evento=rate/burst,..." en políticas
+
+    Args:
+        spec (str): Por ejemplo "send_message=5/10,typing=4/8"
+
+    Returns:
+        dict: {evento: (rate, burst)}
+
+    Raises:
+        ValueError: Si el formato es inválido
+    """
+    policies = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        event, _, limits = item.partition("=")
+        rate, _, burst = limits.partition("/")
+        rate = float(rate)
+        burst = int(burst) if burst else max(1, int(rate))
+        if rate <= 0 or burst <= 0:
+            raise ValueError(f"Política inválida: {item}")
+        policies[event.strip()] = (rate, burst)
+    return policies
@@ -0,0 +1,129 @@
+"""
+Serialización JSON de la aplicación
+Una sola capa para las respuestas HTTP (Flask) y los paquetes Socket.IO.
+Usa orjson si está instalado (mucho más rápido que json de la librería
+estándar) y json estándar como respaldo, con el mismo formato de salida:
+
+- datetime -> ISO 8601; los datetime naive (como los devuelve MongoDB)
+  se consideran UTC y terminan en "Z"
+- ObjectId -> str
+
+Así los formateadores pueden dejar los datetime tal cual, sin llamar a
+isoformat() por cada mensaje.
+"""
+
+import json
+from datetime import date, datetime
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional
+    orjson = None
+
+
+def _default(obj):
+    """Tipos que json estándar no sabe serializar"""
+    if isinstance(obj, datetime):
+        return obj.isoformat() + "Z" if obj.tzinfo is None else obj.isoformat()
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Objeto de tipo {type(obj).__name__} no es serializable a JSON")
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def _orjson_default(obj):
+        if isinstance(obj, ObjectId):
+            return str(obj)
+        if isinstance(obj, (set, frozenset)):
+            return list(obj)
+        raise TypeError(f"Objeto de tipo {type(obj).__name__} no es serializable a JSON")
+
+
+class OrjsonProvider(JSONProvider):
+    """Proveedor JSON de Flask basado en orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_orjson_default, option=_ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Evita el paso intermedio por str: orjson ya produce bytes
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_orjson_default, option=_ORJSON_OPTIONS),
+            mimetype="application/json"
+        )
+
+
+class StdJSONProvider(DefaultJSONProvider):
+    """Proveedor JSON estándar de Flask con el mismo formato de fechas"""
+
+    default = staticmethod(_default)
+    sort_keys = False
+
+
+class OrjsonSocketJSON:
+    """Módulo "json" para python-socketio basado en orjson"""
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        return orjson.dumps(obj, default=_orjson_default, option=_ORJSON_OPTIONS).decode()
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+
+
+class StdSocketJSON:
+    """Módulo "json" para python-socketio basado en json estándar"""
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        kwargs.setdefault("separators", (",", ":"))
+        return json.dumps(obj, default=_default, **kwargs)
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return json.loads(s, **kwargs)
+
+
+def get_serializer(name="orjson"):
+    """
+    Elige el serializador
+
+    Args:
+        name (str): 'orjson' (si está instalado) o 'json'
+
+    Returns:
+        tuple: (clase JSONProvider de Flask, módulo json para Socket.IO)
+    """
+    if name == "orjson" and orjson is not None:
+        return OrjsonProvider, OrjsonSocketJSON
+    if name == "orjson":
+        print("[json] orjson no instalado, usando json estándar")
+    return StdJSONProvider, StdSocketJSON
+
+
+def init_serialization(app):
+    """
+    Configura la serialización de Flask según JSON_SERIALIZER
+
+    Args:
+        app: Aplicación Flask
+
+    Returns:
+        Módulo json para pasar a socketio.init_app(json=...)
+    """
+    provider_class, socket_json = get_serializer(app.config.get("JSON_SERIALIZER", "orjson"))
+    app.json = provider_class(app)
+    return socket_json
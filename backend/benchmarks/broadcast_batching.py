@@ -0,0 +1,90 @@
+"""
+Benchmark: broadcast por lotes (BROADCAST_BATCH_WINDOW_MS)
+
+Simula una sala con K miembros que recibe una ráfaga de mensajes y
+cuenta los paquetes que salen hacia los clientes y el CPU gastado por
+mensaje entregado, para distintas ventanas de agrupación.
+Usa un socketio.Server real (codificación real de paquetes); solo el
+transporte engine.io se sustituye por un contador.
+
+Uso (desde backend/):
+    python benchmarks/broadcast_batching.py
+    python benchmarks/broadcast_batching.py --members 500 --rate 200 --windows 0 10 25 50
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import socketio
+from app.services.broadcast_service import BroadcastService
+
+ROOM = 'bench'
+
+
+def build_server(members):
+    """Servidor Socket.IO con K clientes falsos en la sala"""
+    sio = socketio.Server(async_mode='threading')
+    sent = {'packets': 0}
+
+    def count_send(eio_sid, packet):
+        packet.encode()
+        sent['packets'] += 1
+
+    sio.eio.send_packet = count_send
+    for i in range(members):
+        sid = sio.manager.connect(f'eio-{i}', '/')
+        sio.manager.enter_room(sid, '/', ROOM)
+    return sio, sent
+
+
+def run(window_ms, members, messages, rate):
+    sio, sent = build_server(members)
+    BroadcastService.reset()
+    payload = {'username': 'bench', 'msg': 'x' * 80, 'room': ROOM}
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    for i in range(messages):
+        message = {**payload, 'id': i}
+        if window_ms > 0:
+            BroadcastService.publish(sio, ROOM, message, window_ms / 1000)
+        else:
+            sio.emit('message', message, room=ROOM)
+        time.sleep(1 / rate)
+
+    # Esperar el último flush programado
+    time.sleep(window_ms / 1000 + 0.05)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    delivered = messages * members
+    return {
+        'packets': sent['packets'],
+        'packets_per_sec': sent['packets'] / wall,
+        'cpu_us_per_delivered': cpu / delivered * 1e6
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--members', type=int, default=200)
+    parser.add_argument('--messages', type=int, default=300)
+    parser.add_argument('--rate', type=float, default=200, help='mensajes/s en la ráfaga')
+    parser.add_argument('--windows', type=int, nargs='+', default=[0, 10, 25, 50])
+    args = parser.parse_args()
+
+    print(f"miembros: {args.members} | mensajes: {args.messages} | ritmo: {args.rate}/s")
+    print(f"{'ventana ms':>10} {'paquetes':>10} {'paquetes/s':>11} {'CPU µs/entregado':>17}")
+    for window in args.windows:
+        r = run(window, args.members, args.messages, args.rate)
+        print(f"{window:>10} {r['packets']:>10} {r['packets_per_sec']:>11.0f} "
+              f"{r['cpu_us_per_delivered']:>17.2f}")
+
+
+if __name__ == '__main__':
+    main()
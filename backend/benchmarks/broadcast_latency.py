@@ -0,0 +1,145 @@
+"""
+Benchmark: latencia de broadcast entre workers Socket.IO
+
+Levanta N workers (procesos) que comparten una cola de mensajes, reparte
+los clientes entre ellos y mide cuánto tarda un emit a una sala en llegar
+a TODOS los clientes (incluidos los conectados a otros workers).
+
+Uso (desde backend/):
+    python benchmarks/broadcast_latency.py --queue mongodb://localhost:27017/salas_bench
+    python benchmarks/broadcast_latency.py --queue redis://localhost:6379/0 --workers 1 2 4
+
+Salida: una fila por cantidad de workers con p50 / p95 / máx en milisegundos
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCH_ROOM = 'bench'
+
+
+def run_worker(port, queue_url, channel):
+    """Proceso worker: servidor Socket.IO mínimo conectado a la cola"""
+    import eventlet
+    eventlet.monkey_patch()
+    import socketio
+    from app.sockets.pubsub import create_client_manager
+
+    sio = socketio.Server(
+        async_mode='eventlet',
+        client_manager=create_client_manager(queue_url, channel=channel)
+    )
+
+    @sio.on('bench_join')
+    def bench_join(sid):
+        sio.enter_room(sid, BENCH_ROOM)
+        return True
+
+    @sio.on('bench_ping')
+    def bench_ping(sid, data):
+        sio.emit('bench_pong', data, room=BENCH_ROOM)
+
+    eventlet.wsgi.server(
+        eventlet.listen(('127.0.0.1', port)),
+        socketio.WSGIApp(sio),
+        log_output=False
+    )
+
+
+def run_round(n_workers, clients, messages, queue_url, base_port):
+    """Ejecuta una ronda con n_workers y devuelve las latencias (ms)"""
+    import socketio
+
+    channel = f'bench-{os.getpid()}-{n_workers}'
+    procs = [
+        multiprocessing.Process(
+            target=run_worker, args=(base_port + i, queue_url, channel), daemon=True
+        )
+        for i in range(n_workers)
+    ]
+    for p in procs:
+        p.start()
+    time.sleep(1.5)
+
+    latencies = []
+    lock = threading.Lock()
+    received = {}
+    conns = []
+
+    try:
+        for c in range(clients):
+            client = socketio.Client()
+
+            @client.on('bench_pong')
+            def on_pong(data, _c=c):
+                elapsed = (time.time() - data['t']) * 1000
+                with lock:
+                    latencies.append(elapsed)
+                    received[data['seq']] = received.get(data['seq'], 0) + 1
+
+            client.connect(f'http://127.0.0.1:{base_port + c % n_workers}')
+            client.call('bench_join')
+            conns.append(client)
+
+        # Dar tiempo a que todos los listeners de la cola estén activos
+        time.sleep(0.5)
+
+        sender = conns[0]
+        for seq in range(messages):
+            sender.emit('bench_ping', {'seq': seq, 't': time.time()})
+            time.sleep(0.02)
+
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            with lock:
+                if len(latencies) >= messages * clients:
+                    break
+            time.sleep(0.05)
+    finally:
+        for client in conns:
+            client.disconnect()
+        for p in procs:
+            p.terminate()
+            p.join()
+
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--queue', default=os.getenv('SOCKETIO_MESSAGE_QUEUE'),
+                        help='URL de la cola (redis://, amqp://, zmq+tcp://, mongodb://)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--messages', type=int, default=100)
+    parser.add_argument('--port', type=int, default=6100)
+    args = parser.parse_args()
+
+    if not args.queue:
+        parser.error('indica --queue o SOCKETIO_MESSAGE_QUEUE')
+
+    print(f"cola: {args.queue} | clientes: {args.clients} | mensajes: {args.messages}")
+    print(f"{'workers':>8} {'entregados':>11} {'p50 ms':>8} {'p95 ms':>8} {'máx ms':>8}")
+
+    for n in args.workers:
+        lat = run_round(n, args.clients, args.messages, args.queue, args.port)
+        expected = args.clients * args.messages
+        if not lat:
+            print(f"{n:>8} {0:>5}/{expected:<5}        -        -        -")
+            continue
+        lat.sort()
+        p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+        print(f"{n:>8} {len(lat):>5}/{expected:<5} "
+              f"{statistics.median(lat):>8.2f} {p95:>8.2f} {lat[-1]:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
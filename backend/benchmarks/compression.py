@@ -0,0 +1,76 @@
+"""
+Benchmark: costo de CPU contra bytes ahorrados al comprimir historiales
+
+Comprime la respuesta JSON de GET /rooms/<room>/messages (500 mensajes por
+defecto) con cada codificación instalada (gzip siempre; br y zstd si están
+brotli/zstandard) y a varios niveles, para elegir los de
+app/utils/compression.py. Incluye la respuesta cacheada (mismo ETag), que
+no gasta CPU.
+
+Uso (desde backend/):
+    python benchmarks/compression.py
+    python benchmarks/compression.py --messages 100 --rounds 200
+"""
+
+import argparse
+import gzip
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.json_encode import sample_messages, _NoMongo
+from app.models.message import MessageModel
+from app.utils.compression import CODECS, brotli, zstandard
+from app.utils.serialization import OrjsonSocketJSON, StdSocketJSON, orjson
+
+
+def levels():
+    yield 'gzip (nivel 1)', lambda d: gzip.compress(d, compresslevel=1, mtime=0)
+    yield 'gzip (nivel 5, en uso)', CODECS['gzip']
+    yield 'gzip (nivel 9)', lambda d: gzip.compress(d, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield 'br (calidad 4, en uso)', CODECS['br']
+        yield 'br (calidad 11)', lambda d: brotli.compress(d, quality=11)
+    if zstandard is not None:
+        yield 'zstd (nivel 3, en uso)', CODECS['zstd']
+        yield 'zstd (nivel 19)', lambda d: zstandard.ZstdCompressor(level=19).compress(d)
+
+
+def bench(label, func, body, rounds):
+    start = time.thread_time()
+    for _ in range(rounds):
+        out = func(body)
+    cpu = (time.thread_time() - start) / rounds
+    saved_kb = (len(body) - len(out)) / 1024
+    per_kb = cpu * 1e6 / saved_kb if saved_kb > 0 else float('nan')
+    print(f"{label:<26} {len(out):>9} bytes {len(out) / len(body):>7.3f} "
+          f"{cpu * 1e3:>9.3f} ms CPU {per_kb:>9.2f} µs/KB ahorrado")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    model = MessageModel(_NoMongo)
+    payload = {'messages': model.format_messages_for_api(sample_messages(args.messages))}
+    encoder = OrjsonSocketJSON if orjson is not None else StdSocketJSON
+    body = encoder.dumps(payload).encode()
+
+    print(f"Historial de {args.messages} mensajes: {len(body)} bytes sin comprimir\n")
+    print(f"{'codificación':<26} {'tamaño':>15} {'ratio':>7} {'costo':>16} {'eficiencia':>22}")
+    for label, func in levels():
+        bench(label, func, body, args.rounds)
+    bench('caché por ETag', lambda d, cached=CODECS['gzip'](body): cached, body, args.rounds)
+
+    missing = [name for name, mod in (('brotli', brotli), ('zstandard', zstandard)) if mod is None]
+    if missing:
+        print(f"\n(no instalados: {', '.join(missing)})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: rendimiento de serialización de historiales de mensajes
+
+Compara el camino anterior (formatear con isoformat() por mensaje +
+json estándar) con la capa actual (datetime nativos + orjson) para un
+historial típico de get_messages.
+
+Uso (desde backend/):
+    python benchmarks/json_encode.py
+    python benchmarks/json_encode.py --messages 100 --rounds 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from app.models.message import MessageModel
+from app.utils.serialization import OrjsonSocketJSON, StdSocketJSON, orjson
+
+
+class _NoMongo:
+    """Lo mínimo para instanciar MessageModel sin base de datos"""
+    class db:
+        messages = None
+
+
+def sample_messages(n):
+    return [{
+        "_id": ObjectId(),
+        "seq": i,
+        "room": "General",
+        "username": f"user{i % 7}",
+        "nickname": None,
+        "msg": "Hola a todos, este es un mensaje de prueba " * 2,
+        "timestamp": datetime.utcnow(),
+        "file_url": None,
+        "original_filename": None
+    } for i in range(n)]
+
+
+def legacy_format(messages):
+    """Formateo anterior: isoformat() y dict de flags nuevo por mensaje"""
+    return [{
+        "id": str(m["_id"]),
+        "seq": m.get("seq"),
+        "username": m.get("username"),
+        "nickname": m.get("nickname"),
+        "msg": m.get("msg"),
+        "timestamp": m["timestamp"].isoformat() + "Z",
+        "file_url": m.get("file_url"),
+        "original_filename": m.get("original_filename"),
+        "security_flags": m.get("security_flags", {
+            'has_encryption': False,
+            'has_steganography_risk': False,
+            'has_malicious_patterns': False,
+            'has_suspicious_content': False,
+            'risk_level': 'low',
+            'issues': []
+        })
+    } for m in messages]
+
+
+def bench(label, encode, rounds, n):
+    start = time.perf_counter()
+    size = 0
+    for _ in range(rounds):
+        size = len(encode())
+    elapsed = time.perf_counter() - start
+    per_sec = rounds * n / elapsed
+    print(f"{label:<34} {per_sec:>12,.0f} msg/s {elapsed / rounds * 1e6:>10.1f} µs/historial {size:>8} bytes")
+    return per_sec
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=1000)
+    args = parser.parse_args()
+
+    docs = sample_messages(args.messages)
+    model = MessageModel(_NoMongo)
+
+    base = bench("isoformat + json estándar",
+                 lambda: json.dumps(legacy_format(docs)), args.rounds, args.messages)
+    bench("datetime nativo + json estándar",
+          lambda: StdSocketJSON.dumps(model.format_messages_for_api(docs)), args.rounds, args.messages)
+    if orjson is not None:
+        fast = bench("datetime nativo + orjson",
+                     lambda: OrjsonSocketJSON.dumps(model.format_messages_for_api(docs)),
+                     args.rounds, args.messages)
+        print(f"\norjson: {fast / base:.1f}x más mensajes/s que el camino anterior")
+    else:
+        print("\norjson no instalado: pip install orjson")
+
+
+if __name__ == '__main__':
+    main()
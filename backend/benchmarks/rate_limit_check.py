@@ -0,0 +1,71 @@
+"""
+Benchmark: costo por comprobación del limitador de eventos
+
+Mide cuánto cuesta RateLimitService.check (dos baldes: sid + usuario)
+con el almacén en memoria, comparado con lo que evita: decodificar el
+JWT de cada evento. Con --mongo mide también el almacén compartido
+(requiere MONGO_URI apuntando a un MongoDB real).
+
+Uso (desde backend/):
+    python benchmarks/rate_limit_check.py
+    python benchmarks/rate_limit_check.py --checks 200000 --clients 5000
+    MONGO_URI=mongodb://localhost:27017/salas python benchmarks/rate_limit_check.py --mongo
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.rate_limit_service import RateLimitService
+from app.utils.rate_limit import MemoryBucketStore, MongoBucketStore
+
+BENCH_SECRET = 'benchmark-secret-key-of-32-bytes!!'
+
+
+def bench(label, check, checks):
+    start = time.perf_counter()
+    for i in range(checks):
+        check(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {checks / elapsed:>12,.0f} checks/s {elapsed / checks * 1e6:>8.2f} µs/check")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--checks', type=int, default=100000)
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--mongo', action='store_true')
+    args = parser.parse_args()
+
+    RateLimitService._policies = {'send_message': (5.0, 10)}
+    clients = args.clients
+
+    RateLimitService._store = MemoryBucketStore()
+    bench("memoria (sid + usuario)",
+          lambda i: RateLimitService.check('send_message', f"sid{i % clients}", f"user{i % clients}"),
+          args.checks)
+
+    import jwt
+    token = jwt.encode({'sub': 'user1', 'exp': int(time.time()) + 3600}, BENCH_SECRET, algorithm='HS256')
+    bench("referencia: jwt.decode",
+          lambda i: jwt.decode(token, BENCH_SECRET, algorithms=['HS256']),
+          args.checks)
+
+    if args.mongo:
+        from pymongo import MongoClient
+        uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017/salas_bench')
+        collection = MongoClient(uri).get_default_database('salas_bench').rate_limits_bench
+        collection.delete_many({})
+        RateLimitService._store = MongoBucketStore(collection)
+        bench("mongodb (sid + usuario)",
+              lambda i: RateLimitService.check('send_message', f"sid{i % clients}", f"user{i % clients}"),
+              min(args.checks, 5000))
+        collection.drop()
+
+
+if __name__ == '__main__':
+    main()
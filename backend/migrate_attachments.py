@@ -0,0 +1,45 @@
+"""
+Migración - Registra los adjuntos de mensajes existentes
+
+La galería (GET /rooms/<sala>/attachments) lee la colección indexada de
+adjuntos, que solo se llena al enviar mensajes nuevos; esta migración
+registra los archivos de los mensajes anteriores a ella. Se puede
+repetir: los mensajes que ya tienen registro se saltan.
+
+Ejecuta:
+    python migrate_attachments.py             # migrar
+    python migrate_attachments.py --dry-run   # solo contar
+"""
+
+import argparse
+import os
+from app import create_app
+from app.utils.database import mongo
+from app.models import get_message_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='Solo contar, sin modificar')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    app = create_app(os.getenv('FLASK_ENV', 'development'))
+    with app.app_context():
+        with_files = mongo.db.messages.count_documents({"file_url": {"$ne": None}})
+        registered = mongo.db.attachments.estimated_document_count()
+        print(f"📏 {with_files} mensajes con archivo, {registered} adjuntos registrados")
+
+        if args.dry_run:
+            return
+
+        recorded = get_message_model().backfill_attachments(
+            batch_size=args.batch_size,
+            on_progress=lambda n: print(f"  ... {n} adjuntos registrados")
+        )
+        print(f"\n✅ {recorded} adjuntos registrados")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Migración - Compacta security_flags por defecto en mensajes existentes
+
+Los mensajes nuevos ya no guardan security_flags cuando no se detectó
+nada; esta migración quita ese subdocumento de los mensajes antiguos
+y muestra el tamaño de la colección antes y después.
+
+Ejecuta:
+    python migrate_security_flags.py             # migrar
+    python migrate_security_flags.py --dry-run   # solo medir
+"""
+
+import argparse
+import os
+import bson
+from app import create_app
+from app.utils.database import mongo
+from app.models import get_message_model
+
+
+def measure(sample_size=1000, history_limit=100):
+    """
+    Mide el tamaño de los mensajes
+
+    Returns:
+        dict: {count, avg_bson_bytes, history_bytes, size, storage_size}
+    """
+    messages = mongo.db.messages
+    sample = list(messages.find().sort("_id", -1).limit(sample_size))
+    sizes = [len(bson.encode(doc)) for doc in sample]
+
+    stats = {}
+    try:
+        stats = mongo.db.command("collstats", "messages")
+    except Exception:
+        pass  # collstats no disponible (permisos o servidor de pruebas)
+
+    return {
+        "count": messages.estimated_document_count(),
+        "avg_bson_bytes": sum(sizes) / len(sizes) if sizes else 0,
+        # Bytes que MongoDB envía para un historial típico (get_messages, 100)
+        "history_bytes": sum(sizes[:history_limit]),
+        "size": stats.get("size"),
+        "storage_size": stats.get("storageSize")
+    }
+
+
+def print_measure(title, m):
+    print(f"\n{title}")
+    print(f"  mensajes:                  {m['count']}")
+    print(f"  tamaño medio (BSON):       {m['avg_bson_bytes']:.0f} bytes")
+    print(f"  historial de 100 (BSON):   {m['history_bytes']} bytes")
+    if m["size"] is not None:
+        print(f"  colección (datos):         {m['size']} bytes")
+        print(f"  colección (almacenamiento): {m['storage_size']} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='Solo medir, sin modificar')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    app = create_app(os.getenv('FLASK_ENV', 'development'))
+    with app.app_context():
+        before = measure()
+        print_measure("📏 Antes", before)
+
+        if args.dry_run:
+            return
+
+        compacted = get_message_model().compact_security_flags(
+            batch_size=args.batch_size,
+            on_progress=lambda n: print(f"  ... {n} mensajes compactados")
+        )
+        print(f"\n✅ {compacted} mensajes compactados")
+
+        after = measure()
+        print_measure("📏 Después", after)
+        if before["avg_bson_bytes"]:
+            saved = 1 - after["avg_bson_bytes"] / before["avg_bson_bytes"]
+            print(f"\n  Ahorro por mensaje: {saved:.0%}")
+
+
+if __name__ == '__main__':
+    main()
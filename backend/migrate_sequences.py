@@ -0,0 +1,54 @@
+"""
+Migración - Numera (seq) los mensajes de las salas antiguas
+
+Las salas creadas antes de las secuencias por sala no tienen last_seq.
+Al enviar en una de ellas se lanza un trabajo que la numera en segundo
+plano; esta migración numera todas de una vez, por lotes, para que
+ningún mensaje nuevo tenga que esperar.
+
+Ejecuta:
+    python migrate_sequences.py             # migrar
+    python migrate_sequences.py --dry-run   # solo contar
+"""
+
+import argparse
+import os
+from app import create_app
+from app.utils.database import mongo
+from app.models import get_message_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='Solo contar, sin modificar')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    app = create_app(os.getenv('FLASK_ENV', 'development'))
+    with app.app_context():
+        rooms = [room["name"] for room in
+                 mongo.db.rooms.find({"last_seq": {"$exists": False}}, {"name": 1})]
+        print(f"📏 {len(rooms)} salas sin secuencia")
+
+        if args.dry_run:
+            for name in rooms:
+                count = mongo.db.messages.count_documents({"room": name})
+                print(f"  {name}: {count} mensajes")
+            return
+
+        model = get_message_model()
+        for name in rooms:
+            numbered = model.backfill_sequences(
+                name,
+                batch_size=args.batch_size,
+                on_progress=lambda n, name=name: print(f"  ... {name}: {n} mensajes numerados")
+            )
+            if numbered is None:
+                print(f"⏭️  {name}: ya numerada por otro proceso")
+            else:
+                print(f"✅ {name}: {numbered} mensajes numerados")
+
+
+if __name__ == '__main__':
+    main()
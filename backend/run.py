@@ -8,6 +8,6 @@ if __name__ == "__main__":
     socketio.run(
         app, 
         debug=app.config['DEBUG'], 
-        host="0.0.0.0", 
-        port=5000
+        host=os.getenv('HOST', '0.0.0.0'), 
+        port=int(os.getenv('PORT', 5000))
     )
\ No newline at end of file
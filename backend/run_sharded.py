@@ -0,0 +1,61 @@
+"""
+Lanza varios workers con afinidad de salas (uno por núcleo por defecto)
+
+Cada worker es un proceso independiente con su propio hub de eventlet,
+escucha en PORT_BASE + i y se registra en el anillo de salas.
+Los clientes que hacen join a una sala de otro worker reciben
+"join_redirect" con la URL a la que deben reconectarse.
+
+Uso:
+    SOCKETIO_MESSAGE_QUEUE=redis://localhost:6379/0 python run_sharded.py
+    python run_sharded.py --workers 4 --port 5000 --host 0.0.0.0 --public-host chat.example.com
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--host', default='0.0.0.0', help='Interfaz en la que escuchan los workers')
+    parser.add_argument('--port', type=int, default=5000, help='Puerto del primer worker')
+    parser.add_argument('--public-host', default='localhost',
+                        help='Host con el que los clientes alcanzan a los workers')
+    args = parser.parse_args()
+
+    if not os.getenv('SOCKETIO_MESSAGE_QUEUE'):
+        print("[sharded] aviso: sin SOCKETIO_MESSAGE_QUEUE los emits entre workers no se propagan")
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    procs = []
+    for i in range(args.workers):
+        port = args.port + i
+        env = {
+            **os.environ,
+            'HOST': args.host,
+            'PORT': str(port),
+            'WORKER_ID': f'worker-{i}',
+            'WORKER_URL': f'http://{args.public_host}:{port}',
+            'SHARDING_ENABLED': 'true'
+        }
+        procs.append(subprocess.Popen([sys.executable, os.path.join(here, 'run.py')], env=env))
+        print(f"[sharded] worker-{i} en puerto {port}")
+
+    def stop(*_):
+        for p in procs:
+            p.terminate()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for p in procs:
+        p.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+test_admission.py - Tests para el control de admisión HTTP
+Pruebas para services/admission_service.py y middleware/rate_limit.py
+"""
+
+import pytest
+from app import create_app
+from app.services import AdmissionService, RateLimitService
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config.update(
+        RATE_LIMIT_ENABLED=True,
+        HTTP_RATE_LIMITS='login=0.01/2,default=100/100',
+        HTTP_CONCURRENCY_LIMITS='rooms=1',
+        LOOP_LAG_SHED_MS=200
+    )
+    RateLimitService.configure(app.config)
+    RateLimitService.reset()
+    AdmissionService.configure(app.config)
+    AdmissionService.reset()
+    yield app
+    RateLimitService.configure({'RATE_LIMIT_ENABLED': False})
+    AdmissionService.configure({})
+    AdmissionService.reset()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def test_login_burst_gets_429(client):
+    """Test superar la ráfaga por IP responde 429 con Retry-After"""
+    credentials = {'username': 'nadie', 'password': 'incorrecta'}
+    statuses = [client.post('/auth/login', json=credentials).status_code for _ in range(3)]
+    assert statuses[:2] == [401, 401]
+    assert statuses[2] == 429
+
+    response = client.post('/auth/login', json=credentials)
+    assert response.get_json()['code'] == 'rate_limited'
+    assert int(response.headers['Retry-After']) >= 1
+    assert AdmissionService.stats()['rejected'] == {'rate_limited': 2}
+
+
+def test_concurrency_cap_gets_503(client):
+    """Test con la ruta llena responde 503 busy y al liberar vuelve a entrar"""
+    assert AdmissionService.admit('rooms', '10.0.0.1') is None
+
+    response = client.get('/rooms')
+    assert response.status_code == 503
+    assert response.get_json()['code'] == 'busy'
+    assert response.headers['Retry-After'] == '1'
+
+    AdmissionService.release('rooms')
+    assert client.get('/rooms').status_code == 200
+    assert AdmissionService.stats()['in_flight'] == {}
+
+
+def test_loop_lag_sheds_load(client):
+    """Test con el event loop retrasado se rechaza con 503"""
+    AdmissionService.record_lag(0.5)
+    response = client.get('/rooms')
+    assert response.status_code == 503
+    assert response.get_json()['code'] == 'overloaded'
+
+    AdmissionService.record_lag(0.01)
+    assert client.get('/rooms').status_code == 200
+    assert AdmissionService.stats()['rejected'] == {'overloaded': 1}
+
+
+def test_per_user_bucket():
+    """Test el balde por usuario se comparte entre IPs"""
+    RateLimitService.configure({'HTTP_RATE_LIMITS': 'upload=0.01/1'})
+    try:
+        assert RateLimitService.check_http('upload', '10.0.0.1', 'alice') == 0
+        assert RateLimitService.check_http('upload', '10.0.0.2', 'alice') > 0
+        assert RateLimitService.check_http('upload', '10.0.0.3', 'bob') == 0
+    finally:
+        RateLimitService.configure({'RATE_LIMIT_ENABLED': False})
+
+
+def test_default_policy_only_limits_expensive_routes():
+    """Test con la configuración por defecto las lecturas baratas no consumen baldes"""
+    from app.config import Config
+    RateLimitService.configure({'HTTP_RATE_LIMITS': Config.HTTP_RATE_LIMITS})
+    try:
+        assert all(RateLimitService.check_http('rooms', '10.0.0.1') == 0 for _ in range(100))
+        assert RateLimitService.check_http('upload', '10.0.0.1', 'alice') == 0
+        assert 'default' not in RateLimitService._http_policies
+    finally:
+        RateLimitService.configure({'RATE_LIMIT_ENABLED': False})
+
+
+def test_client_ip_from_trusted_proxy(monkeypatch):
+    """Test detrás de un proxy de confianza el balde es por IP real del cliente"""
+    from app.config import TestingConfig
+    monkeypatch.setattr(TestingConfig, 'TRUSTED_PROXY_HOPS', 1)
+    app = create_app('testing')
+    RateLimitService.configure({'HTTP_RATE_LIMITS': 'login=0.01/1'})
+    try:
+        client = app.test_client()
+        credentials = {'username': 'nadie', 'password': 'incorrecta'}
+
+        def login(ip):
+            return client.post('/auth/login', json=credentials,
+                               headers={'X-Forwarded-For': ip}).status_code
+
+        assert login('203.0.113.1') == 401
+        assert login('203.0.113.2') == 401     # otro cliente, mismo proxy
+        assert login('203.0.113.1') == 429
+    finally:
+        RateLimitService.configure({'RATE_LIMIT_ENABLED': False})
@@ -0,0 +1,184 @@
+"""
+test_attachments.py - Tests para la colección de adjuntos
+Pruebas para models/attachment.py y GET /rooms/<room>/attachments
+"""
+
+import pytest
+import json
+from app.models import get_message_model, get_attachment_model
+from app.models.attachment import AttachmentModel
+
+
+def _clean():
+    from app.utils.database import mongo
+    mongo.db.messages.delete_many({})
+    mongo.db.attachments.delete_many({})
+
+
+def _ensure_room(name):
+    from app.models import get_room_model
+    if not get_room_model().exists(name):
+        get_room_model().create_room(name)
+
+
+class TestAttachmentModel:
+    """Tests para el modelo Attachment"""
+
+    def test_detect_type(self):
+        """Test clasificar adjuntos por extensión"""
+        assert AttachmentModel.detect_type("foto.PNG") == 'image'
+        assert AttachmentModel.detect_type("video.mp4") == 'video'
+        assert AttachmentModel.detect_type("doc.pdf") == 'document'
+        assert AttachmentModel.detect_type("https://x.com/a.jpg?v=1") == 'image'
+        assert AttachmentModel.detect_type("sin_extension") == 'other'
+        assert AttachmentModel.detect_type(None) == 'other'
+
+    def test_create_message_records_attachment(self, app):
+        """Test create_message registra el adjunto en su colección"""
+        with app.app_context():
+            _clean()
+            message_model = get_message_model()
+            msg = message_model.create_message(
+                "Room1", "user1", msg="Foto",
+                file_url="https://example.com/foto.png",
+                original_filename="foto.png",
+                file_size=2048
+            )
+
+            attachments, next_cursor = get_attachment_model().get_room_attachments("Room1")
+
+            assert len(attachments) == 1
+            assert attachments[0]['message_id'] == msg['_id']
+            assert attachments[0]['type'] == 'image'
+            assert attachments[0]['size'] == 2048
+            assert next_cursor is None
+
+    def test_text_message_has_no_attachment(self, app):
+        """Test mensajes de texto no generan adjuntos"""
+        with app.app_context():
+            _clean()
+            get_message_model().create_message("Room1", "user1", msg="Hola")
+
+            attachments, _ = get_attachment_model().get_room_attachments("Room1")
+            assert attachments == []
+
+    def test_pagination_with_cursor(self, app):
+        """Test recorrer la galería por páginas sin repetir elementos"""
+        with app.app_context():
+            _clean()
+            message_model = get_message_model()
+            for i in range(5):
+                message_model.create_message(
+                    "Room1", "user1",
+                    file_url=f"https://example.com/f{i}.pdf",
+                    original_filename=f"f{i}.pdf"
+                )
+
+            attachment_model = get_attachment_model()
+            page1, cursor = attachment_model.get_room_attachments("Room1", limit=2)
+            page2, cursor2 = attachment_model.get_room_attachments("Room1", limit=2, cursor=cursor)
+            page3, cursor3 = attachment_model.get_room_attachments("Room1", limit=2, cursor=cursor2)
+
+            ids = [a['_id'] for a in page1 + page2 + page3]
+            assert len(ids) == 5
+            assert len(set(ids)) == 5
+            assert cursor3 is None
+
+    def test_filter_by_type(self, app):
+        """Test filtrar la galería por tipo de adjunto"""
+        with app.app_context():
+            _clean()
+            message_model = get_message_model()
+            message_model.create_message("Room1", "u", file_url="https://e.com/a.png", original_filename="a.png")
+            message_model.create_message("Room1", "u", file_url="https://e.com/b.pdf", original_filename="b.pdf")
+
+            images, _ = get_attachment_model().get_room_attachments("Room1", file_type='image')
+
+            assert len(images) == 1
+            assert images[0]['original_filename'] == 'a.png'
+
+    def test_invalid_cursor(self, app):
+        """Test cursor inválido lanza ValueError"""
+        with app.app_context():
+            with pytest.raises(ValueError, match="cursor inválido"):
+                get_attachment_model().get_room_attachments("Room1", cursor="no-es-un-cursor")
+
+    def test_delete_message_removes_attachment(self, app):
+        """Test eliminar un mensaje elimina su adjunto"""
+        with app.app_context():
+            _clean()
+            message_model = get_message_model()
+            msg = message_model.create_message("Room1", "u", file_url="https://e.com/a.png")
+
+            assert message_model.delete_message(msg['_id']) is True
+
+            attachments, _ = get_attachment_model().get_room_attachments("Room1")
+            assert attachments == []
+
+    def test_backfill_from_existing_messages(self, app):
+        """Test la migración registra los archivos de mensajes antiguos una sola vez"""
+        with app.app_context():
+            from app.utils.database import mongo
+            _clean()
+            mongo.db.messages.insert_many([
+                {"room": "Room1", "username": "u", "msg": "", "file_url": f"https://e.com/{i}.png",
+                 "original_filename": f"{i}.png"}
+                for i in range(3)
+            ] + [{"room": "Room1", "username": "u", "msg": "texto", "file_url": None}])
+            progress = []
+
+            message_model = get_message_model()
+            assert message_model.backfill_attachments(batch_size=2, on_progress=progress.append) == 3
+            assert progress == [2, 3]
+            assert message_model.backfill_attachments() == 0
+
+            attachments, _ = get_attachment_model().get_room_attachments("Room1")
+            assert sorted(a['original_filename'] for a in attachments) == ['0.png', '1.png', '2.png']
+            assert all(a['type'] == 'image' for a in attachments)
+
+
+class TestAttachmentsEndpoint:
+    """Tests para GET /rooms/<room_name>/attachments"""
+
+    def test_list_attachments(self, client, app):
+        """Test la galería devuelve adjuntos y cursor"""
+        with app.app_context():
+            _clean()
+            _ensure_room("General")
+            message_model = get_message_model()
+            for i in range(3):
+                message_model.create_message(
+                    "General", "admin",
+                    file_url=f"https://example.com/img{i}.png",
+                    original_filename=f"img{i}.png"
+                )
+
+        response = client.get('/rooms/General/attachments?limit=2')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert len(data['attachments']) == 2
+        assert data['attachments'][0]['type'] == 'image'
+        assert data['next_cursor'] is not None
+
+        response = client.get(f"/rooms/General/attachments?limit=2&cursor={data['next_cursor']}")
+        data = json.loads(response.data)
+        assert len(data['attachments']) == 1
+        assert data['next_cursor'] is None
+
+    def test_list_attachments_invalid_limit(self, client):
+        """Test límite fuera de rango"""
+        response = client.get('/rooms/General/attachments?limit=1000')
+        assert response.status_code == 400
+
+    def test_missing_room_is_404(self, client):
+        """Test una sala inexistente (o eliminándose) responde 404"""
+        response = client.get('/rooms/NoExiste/attachments')
+        assert response.status_code == 404
+
+    def test_list_attachments_invalid_cursor(self, client, app):
+        """Test cursor inválido devuelve 400"""
+        with app.app_context():
+            _ensure_room("General")
+        response = client.get('/rooms/General/attachments?cursor=xxx')
+        assert response.status_code == 400
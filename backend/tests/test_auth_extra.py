@@ -142,4 +142,41 @@ def test_unauthorized_handler(client):
     assert res.status_code == 401
     data = json.loads(res.data)
     # El middleware devuelve 'msg', no 'error'
-    assert 'msg' in data
\ No newline at end of file
+    assert 'msg' in data
+
+def test_list_users_paginated(client, token):
+    for i in range(3):
+        client.post('/auth/register', json={'username': f'page_user{i}', 'password': 'password123'})
+
+    res = client.get('/auth/users?prefix=page_&limit=2', headers={'Authorization': f'Bearer {token}'})
+    assert res.status_code == 200
+    data = json.loads(res.data)
+    assert [u['username'] for u in data['users']] == ['page_user0', 'page_user1']
+    assert data['next_cursor'] is not None
+    assert all('password' not in u and 'socket_id' not in u for u in data['users'])
+
+    res = client.get(
+        f"/auth/users?prefix=page_&limit=2&cursor={data['next_cursor']}",
+        headers={'Authorization': f'Bearer {token}'}
+    )
+    data = json.loads(res.data)
+    assert [u['username'] for u in data['users']] == ['page_user2']
+    assert data['next_cursor'] is None
+
+
+def test_list_users_invalid_cursor(client, token):
+    res = client.get('/auth/users?cursor=basura', headers={'Authorization': f'Bearer {token}'})
+    assert res.status_code == 400
+
+
+def test_list_users_export_streaming(client, token):
+    client.post('/auth/register', json={'username': 'export_user', 'password': 'password123'})
+
+    res = client.get('/auth/users?export=true', headers={'Authorization': f'Bearer {token}'})
+    assert res.status_code == 200
+    assert res.is_streamed
+    data = json.loads(res.get_data())
+    usernames = [u['username'] for u in data['users']]
+    assert usernames == sorted(usernames)
+    assert 'export_user' in usernames
+    assert all('password' not in u for u in data['users'])
@@ -0,0 +1,124 @@
+"""
+test_backpressure.py - Tests para el control de clientes lentos
+Pruebas para services/backpressure_service.py
+"""
+
+import queue
+import pytest
+from socketio import packet as sio_packet
+from app.services.backpressure_service import BackpressureService
+
+LIMITS = {'high': 4, 'low': 1, 'max': 10, 'grace': 5.0}
+
+
+class FakeEioSocket:
+    def __init__(self):
+        self.queue = queue.Queue()
+
+
+class FakeEngine:
+    def __init__(self):
+        self.sockets = {'eio-1': FakeEioSocket()}
+        self.disconnected = []
+
+    def disconnect(self, sid):
+        self.disconnected.append(sid)
+
+
+class FakeServer:
+    """socketio.Server mínimo: cola por socket y tareas inmediatas"""
+
+    def __init__(self):
+        self.eio = FakeEngine()
+        self.sent = []
+
+    def _send_packet(self, eio_sid, pkt):
+        self.sent.append(pkt.data[0])
+
+    def start_background_task(self, func, *args):
+        func(*args)
+
+    def fill(self, n):
+        q = self.eio.sockets['eio-1'].queue
+        while q.qsize() < n:
+            q.put(object())
+        while q.qsize() > n:
+            q.get()
+
+
+def _event(name):
+    return sio_packet.Packet(sio_packet.EVENT, data=[name, {}])
+
+
+@pytest.fixture
+def server():
+    BackpressureService.reset()
+    yield FakeServer()
+    BackpressureService.reset()
+
+
+def test_below_watermark_sends_everything(server):
+    """Test con la cola baja no se descarta nada"""
+    server.fill(2)
+    assert BackpressureService.admit(server, 'eio-1', _event('typing_state'), LIMITS, now=0)
+    assert BackpressureService.stats()['saturated_connections'] == 0
+
+
+def test_saturated_drops_only_non_essential(server):
+    """Test sobre la marca alta se pierde typing pero no los mensajes"""
+    server.fill(5)
+    assert not BackpressureService.admit(server, 'eio-1', _event('typing_state'), LIMITS, now=0)
+    assert not BackpressureService.admit(server, 'eio-1', _event('status'), LIMITS, now=1)
+    assert BackpressureService.admit(server, 'eio-1', _event('message'), LIMITS, now=1)
+
+    stats = BackpressureService.stats()
+    assert stats['saturated_connections'] == 1
+    assert stats['dropped_by_event'] == {'typing_state': 1, 'status': 1}
+    assert stats['max_queue_depth'] == 5
+
+
+def test_hysteresis_until_low_watermark(server):
+    """Test sigue saturado entre las marcas y se recupera en la baja"""
+    server.fill(5)
+    BackpressureService.admit(server, 'eio-1', _event('typing_state'), LIMITS, now=0)
+
+    server.fill(3)
+    assert not BackpressureService.admit(server, 'eio-1', _event('typing_state'), LIMITS, now=1)
+
+    server.fill(1)
+    assert BackpressureService.admit(server, 'eio-1', _event('typing_state'), LIMITS, now=2)
+    assert BackpressureService.stats()['saturated_connections'] == 0
+
+
+def test_slow_consumer_disconnected_after_grace(server):
+    """Test saturado más allá del periodo de gracia se desconecta"""
+    server.fill(5)
+    BackpressureService.admit(server, 'eio-1', _event('message'), LIMITS, now=0)
+    assert server.eio.disconnected == []
+
+    assert not BackpressureService.admit(server, 'eio-1', _event('message'), LIMITS, now=6)
+    assert server.eio.disconnected == ['eio-1']
+    assert BackpressureService.stats()['slow_consumers_disconnected'] == 1
+
+
+def test_hard_limit_disconnects_immediately(server):
+    """Test la cola en el máximo desconecta sin esperar la gracia"""
+    server.fill(4)
+    BackpressureService.admit(server, 'eio-1', _event('message'), LIMITS, now=0)
+    server.fill(10)
+    assert not BackpressureService.admit(server, 'eio-1', _event('message'), LIMITS, now=0.1)
+    assert server.eio.disconnected == ['eio-1']
+
+
+def test_install_wraps_send_packet_once(server):
+    """Test install envuelve el envío una sola vez y respeta la config"""
+    config = {'OUTBOUND_HIGH_WATERMARK': 4, 'OUTBOUND_LOW_WATERMARK': 1}
+    assert BackpressureService.install(server, {'OUTBOUND_HIGH_WATERMARK': 0}) is False
+    assert BackpressureService.install(server, config) is True
+    assert BackpressureService.install(server, config) is False
+
+    server.fill(5)
+    server._send_packet('eio-1', _event('typing_state'))
+    server._send_packet('eio-1', _event('message'))
+    assert server.sent == ['message']
+    assert BackpressureService.stats()['queued_packets'] == 5
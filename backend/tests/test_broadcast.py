@@ -0,0 +1,74 @@
+"""
+test_broadcast.py - Tests para el broadcast de mensajes por lotes
+Pruebas para services/broadcast_service.py
+"""
+
+import pytest
+from app.services.broadcast_service import BroadcastService
+
+
+class FakeSocketIO:
+    """SocketIO mínimo: registra emits y deja las tareas pendientes"""
+
+    def __init__(self):
+        self.emitted = []
+        self.tasks = []
+
+    def emit(self, event, data, room=None):
+        self.emitted.append((event, data, room))
+
+    def start_background_task(self, func, *args):
+        self.tasks.append((func, args))
+
+    def sleep(self, seconds):
+        pass
+
+    def run_tasks(self):
+        tasks, self.tasks = self.tasks, []
+        for func, args in tasks:
+            func(*args)
+
+
+@pytest.fixture
+def sio():
+    BroadcastService.reset()
+    yield FakeSocketIO()
+    BroadcastService.reset()
+
+
+def test_quiet_room_sends_immediately(sio):
+    """Test el primer mensaje de una sala tranquila no espera"""
+    assert BroadcastService.publish(sio, 'General', {'msg': 'hola'}, window=60) is True
+    assert sio.emitted == [('message', {'msg': 'hola'}, 'General')]
+    assert sio.tasks == []
+
+
+def test_burst_is_batched(sio):
+    """Test los mensajes dentro de la ventana salen en un solo evento"""
+    BroadcastService.publish(sio, 'General', {'msg': '1'}, window=60)
+    for i in range(2, 5):
+        assert BroadcastService.publish(sio, 'General', {'msg': str(i)}, window=60) is False
+
+    # Un solo flush programado para toda la ráfaga
+    assert len(sio.tasks) == 1
+    sio.run_tasks()
+
+    assert len(sio.emitted) == 2
+    event, data, room = sio.emitted[1]
+    assert event == 'messages_batch' and room == 'General'
+    assert [m['msg'] for m in data['messages']] == ['2', '3', '4']
+
+
+def test_rooms_are_independent(sio):
+    """Test la ráfaga de una sala no retrasa a otra"""
+    BroadcastService.publish(sio, 'A', {'msg': '1'}, window=60)
+    BroadcastService.publish(sio, 'A', {'msg': '2'}, window=60)
+    assert BroadcastService.publish(sio, 'B', {'msg': '1'}, window=60) is True
+
+
+def test_single_pending_message_sent_as_message(sio):
+    """Test un lote de un solo mensaje se envía como "message" normal"""
+    BroadcastService.publish(sio, 'General', {'msg': '1'}, window=60)
+    BroadcastService.publish(sio, 'General', {'msg': '2'}, window=60)
+    sio.run_tasks()
+    assert sio.emitted[-1] == ('message', {'msg': '2'}, 'General')
@@ -0,0 +1,96 @@
+"""
+test_compression.py - Tests para la compresión de respuestas HTTP
+Pruebas para services/compression_service.py y utils/compression.py
+"""
+
+import gzip
+import pytest
+from unittest.mock import patch
+from app import create_app
+from app.services import CompressionService
+from app.utils.compression import available_encodings
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        from app.utils.database import mongo
+        from app.models import get_room_model, get_message_model
+        mongo.db.users.delete_many({})
+        mongo.db.rooms.delete_many({})
+        mongo.db.messages.delete_many({})
+        get_room_model().create_room('General')
+        for i in range(60):
+            get_message_model().create_message('General', 'alice', msg=f'mensaje número {i}')
+        CompressionService.reset()
+        yield app
+    CompressionService.reset()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def test_large_json_is_gzipped(client):
+    """Test una respuesta grande se comprime y se descomprime igual"""
+    plain = client.get('/rooms/General/messages')
+    response = client.get('/rooms/General/messages', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data) == plain.data
+    assert int(response.headers['Content-Length']) < len(plain.data)
+
+
+def test_no_compression_without_accept_encoding(client):
+    """Test sin Accept-Encoding (o con q=0) el cuerpo va tal cual"""
+    assert 'Content-Encoding' not in client.get('/rooms/General/messages').headers
+    response = client.get('/rooms/General/messages', headers={'Accept-Encoding': 'gzip;q=0'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_small_bodies_are_left_alone(client):
+    """Test bajo el umbral no se comprime ni se agrega Vary"""
+    response = client.get('/rooms/NoExiste', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert 'Vary' not in response.headers or 'Accept-Encoding' not in response.headers['Vary']
+
+
+def test_unchanged_resource_reuses_compressed_body(client):
+    """Test el mismo ETag reutiliza el cuerpo comprimido sin recomprimir"""
+    headers = {'Accept-Encoding': 'gzip'}
+    first = client.get('/rooms/General/messages', headers=headers)
+
+    with patch('app.services.compression_service.compress') as mock_compress:
+        second = client.get('/rooms/General/messages', headers=headers)
+    assert not mock_compress.called
+    assert second.data == first.data
+
+    stats = CompressionService.stats()['by_encoding']['gzip']
+    assert stats['responses'] == 2 and stats['cache_hits'] == 1
+    assert stats['bytes_saved'] > 0 and stats['ratio'] < 1
+
+
+def test_streamed_response_is_not_buffered(client):
+    """Test la exportación en streaming no se carga en memoria para comprimirla"""
+    from app.models import get_user_model
+    for i in range(40):
+        get_user_model().create_user(f'export_{i:02d}', 'password123')
+    token = client.post('/auth/login', json={
+        'username': 'export_00', 'password': 'password123'
+    }).get_json()['token']
+
+    response = client.get('/auth/users?export=true', headers={
+        'Authorization': f'Bearer {token}', 'Accept-Encoding': 'gzip'
+    })
+    assert response.is_streamed
+    assert 'Content-Encoding' not in response.headers
+    assert len(response.get_json()['users']) == 40
+
+
+def test_preference_order_follows_config():
+    """Test solo se ofrecen las codificaciones instaladas, en orden"""
+    assert available_encodings('deflate, gzip') == ['gzip']
+    assert available_encodings(['gzip', 'br'])[0] == 'gzip'
@@ -0,0 +1,216 @@
+"""
+test_history.py - Tests para el historial en memoria y la reanudación
+Pruebas para services/history_service.py y el evento "resync"
+"""
+
+import pytest
+from unittest.mock import patch
+from app.utils.database import mongo
+from app.models import get_message_model, get_room_model
+from app.services.history_service import HistoryService
+
+
+ROOM = 'ResyncRoom'
+
+
+@pytest.fixture
+def room(app):
+    mongo.db.rooms.delete_many({'name': ROOM})
+    mongo.db.messages.delete_many({'room': ROOM})
+    get_room_model().create_room(ROOM)
+    HistoryService.drop()
+    yield ROOM
+    HistoryService.drop()
+    mongo.db.messages.delete_many({'room': ROOM})
+    mongo.db.rooms.delete_many({'name': ROOM})
+
+
+def send(n, start=0):
+    """Crea n mensajes como lo hace send_message (BD + historial en memoria)"""
+    model = get_message_model()
+    sent = []
+    for i in range(start, start + n):
+        doc = model.create_message(room=ROOM, username='ana', msg=f'm{i}')
+        formatted = model.format_message_for_emit(doc)
+        HistoryService.append(ROOM, formatted)
+        sent.append(formatted)
+    return sent
+
+
+def test_missed_messages_from_cache(room):
+    """Test solo se reenvían los mensajes posteriores al último visto"""
+    sent = send(5)
+    HistoryService.recent(ROOM)             # carga la caché
+    sent += send(2, start=5)
+
+    with patch.object(get_message_model(), 'get_messages_after') as db_read:
+        missed = HistoryService.missed_since(ROOM, sent[4]['id'])
+        assert not db_read.called
+
+    assert [m['msg'] for m in missed] == ['m5', 'm6']
+    assert HistoryService.missed_since(ROOM, sent[-1]['id']) == []
+
+
+def test_missed_messages_from_database(room, app):
+    """Test sin caché fiable (cola sin afinidad) se consulta MongoDB"""
+    sent = send(4)
+    app.config['SOCKETIO_MESSAGE_QUEUE'] = 'redis://localhost:6379/0'
+    try:
+        missed = HistoryService.missed_since(ROOM, sent[1]['id'])
+    finally:
+        app.config['SOCKETIO_MESSAGE_QUEUE'] = None
+
+    assert [m['msg'] for m in missed] == ['m2', 'm3']
+
+
+def test_gap_too_large(room):
+    """Test si faltan demasiados mensajes se pide el historial completo"""
+    sent = send(6)
+    assert HistoryService.missed_since(ROOM, sent[0]['id'], max_messages=3) is None
+    assert HistoryService.missed_since(ROOM, 'no-es-un-id') is None
+
+
+def test_resync_event(room, app):
+    """Test el evento resync responde solo con lo que faltaba"""
+    from app import socketio
+    from app.services import PresenceService
+    from app.services.jwt_service import JWTService
+
+    sent = send(3)
+    client = socketio.test_client(app)
+    session = {'username': 'ana', 'nickname': None, 'room': ROOM, 'is_anonymous': False}
+
+    with patch.object(JWTService, 'verify_token', return_value='ana'), \
+         patch.object(PresenceService, 'get_session', return_value=session):
+        client.emit('resync', {'token': 't', 'room': ROOM, 'last_message_id': sent[0]['id']})
+
+    received = client.get_received()
+    assert received[-1]['name'] == 'resync_messages'
+    assert [m['msg'] for m in received[-1]['args'][0]['messages']] == ['m1', 'm2']
+    client.disconnect()
+
+
+def test_sequences_are_per_room_and_contiguous(room):
+    """Test cada sala numera sus mensajes 1, 2, 3..."""
+    sent = send(3)
+    assert [m['seq'] for m in sent] == [1, 2, 3]
+    assert get_room_model().get_last_seq(ROOM) == 3
+    assert get_room_model().find_by_name(ROOM)['message_count'] == 3
+
+
+def test_missed_by_seq(room, app):
+    """Test la reanudación por secuencia es un rango exacto"""
+    send(5)
+    assert [m['seq'] for m in HistoryService.missed_since(ROOM, last_seq=3)] == [4, 5]
+    assert HistoryService.missed_since(ROOM, last_seq=5) == []
+    assert HistoryService.missed_since(ROOM, last_seq=0, max_messages=2) is None
+    assert HistoryService.missed_since(ROOM, last_seq=99) is None
+
+    # Misma respuesta leyendo de MongoDB
+    app.config['HOT_HISTORY_SIZE'] = 0
+    try:
+        assert [m['seq'] for m in HistoryService.missed_since(ROOM, last_seq=3)] == [4, 5]
+    finally:
+        app.config['HOT_HISTORY_SIZE'] = 200
+
+
+def test_missed_by_seq_with_unnumbered_cache_entries(room):
+    """Test entradas sin seq en la caché (sala numerada después) van a MongoDB"""
+    sent = send(3)
+    HistoryService.recent(ROOM)
+    # El historial en memoria se cargó antes de numerar: la última quedó sin seq
+    HistoryService.remove(ROOM, sent[-1]['id'])
+    HistoryService.append(ROOM, dict(sent[-1], seq=None))
+
+    assert [m['seq'] for m in HistoryService.missed_since(ROOM, last_seq=1)] == [2, 3]
+
+
+def test_legacy_room_backfilled(room):
+    """Test una sala antigua sin secuencia se numera la primera vez"""
+    model = get_message_model()
+    send(2)
+    mongo.db.rooms.update_one({'name': ROOM}, {'$unset': {'last_seq': 1}})
+    mongo.db.messages.update_many({'room': ROOM}, {'$unset': {'seq': 1}})
+
+    doc = model.create_message(room=ROOM, username='ana', msg='nuevo')
+
+    assert doc['seq'] == 3
+    seqs = [m['seq'] for m in model.get_room_messages(ROOM)]
+    assert seqs == [1, 2, 3]
+
+
+def _make_legacy(n):
+    send(n)
+    mongo.db.rooms.update_one({'name': ROOM}, {'$unset': {'last_seq': 1}})
+    mongo.db.messages.update_many({'room': ROOM}, {'$unset': {'seq': 1}})
+
+
+def test_backfill_runs_in_batches(room):
+    """Test la numeración va por lotes con bulk_write y en orden cronológico"""
+    model = get_message_model()
+    _make_legacy(5)
+    progress = []
+
+    with patch.object(model.messages, 'bulk_write', wraps=model.messages.bulk_write) as bulk:
+        assert model.backfill_sequences(ROOM, batch_size=2, on_progress=progress.append) == 5
+
+    assert bulk.call_count == 3
+    assert progress == [2, 4, 5]
+    assert [m['seq'] for m in model.get_room_messages(ROOM)] == [1, 2, 3, 4, 5]
+    assert get_room_model().get_last_seq(ROOM) == 5
+
+
+def test_backfill_lost_race_still_allocates(room):
+    """Test si otro proceso ganó la numeración, el envío reintenta y obtiene seq"""
+    from app.services.room_service import RoomService
+    model = get_message_model()
+    _make_legacy(2)
+
+    # Otro proceso reserva la secuencia; este trabajo no hace nada
+    model.configure_backfill(lambda name: get_room_model().init_seq(name, 2))
+    try:
+        doc = model.create_message(room=ROOM, username='ana', msg='nuevo')
+    finally:
+        model.configure_backfill(RoomService.start_sequence_backfill)
+
+    assert doc['seq'] == 3
+    assert model.backfill_sequences(ROOM) is None
+
+
+def test_backfill_numbers_messages_sent_during_reservation(room):
+    """Test los mensajes que llegaron sin número mientras se reservaba van al final"""
+    model = get_message_model()
+    _make_legacy(2)
+    count = model.messages.count_documents
+
+    def late_insert(*args, **kwargs):
+        total = count(*args, **kwargs)
+        model.messages.insert_one({'room': ROOM, 'username': 'ana', 'msg': 'tarde',
+                                   'timestamp': model.messages.find_one({'room': ROOM})['timestamp']
+                                   .replace(year=2100)})
+        return total
+
+    with patch.object(model.messages, 'count_documents', side_effect=late_insert):
+        assert model.backfill_sequences(ROOM) == 3
+
+    messages = model.get_room_messages(ROOM)
+    assert [m['seq'] for m in messages] == [1, 2, 3]
+    assert messages[-1]['msg'] == 'tarde'
+    assert get_room_model().get_last_seq(ROOM) == 3
+
+
+def test_history_sort_has_a_full_index(room):
+    """Test el orden del historial (seq, _id) tiene un índice no parcial"""
+    indexes = mongo.db.messages.index_information().values()
+    assert any(
+        ix['key'] == [('room', 1), ('seq', 1), ('_id', 1)] and 'partialFilterExpression' not in ix
+        for ix in indexes
+    )
+
+
+def test_keyset_sorts_have_id_in_their_index(room):
+    """Test los índices por fecha incluyen _id (desempate de los cursores)"""
+    keys = [ix['key'] for ix in mongo.db.messages.index_information().values()]
+    assert [('room', 1), ('timestamp', -1), ('_id', -1)] in keys
+    assert [('username', 1), ('room', 1), ('timestamp', -1), ('_id', -1)] in keys
+    assert [('room', 1), ('timestamp', -1)] not in keys
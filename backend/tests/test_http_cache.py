@@ -0,0 +1,143 @@
+"""
+test_http_cache.py - Tests para ETags y GET condicional
+Pruebas para middleware/http_cache.py y RoomService.room_etag
+"""
+
+import pytest
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from unittest.mock import patch
+from app import create_app
+from app.services import RoomDirectoryService
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        from app.utils.database import mongo
+        mongo.db.users.delete_many({})
+        mongo.db.rooms.delete_many({})
+        mongo.db.messages.delete_many({})
+        from app.models import get_room_model
+        get_room_model().create_room('General')
+        RoomDirectoryService.reset()
+        yield app
+    RoomDirectoryService.reset()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _revalidate(client, url):
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert etag.startswith('W/"')
+    return first, client.get(url, headers={'If-None-Match': etag})
+
+
+@pytest.mark.parametrize('url', [
+    '/rooms',
+    '/rooms/General',
+    '/rooms/General/messages',
+    '/rooms/General/summary'
+])
+def test_unchanged_resource_gets_304(client, url):
+    """Test repetir la lectura con el ETag devuelve 304 sin cuerpo"""
+    first, second = _revalidate(client, url)
+    assert second.status_code == 304
+    assert second.data == b''
+    assert second.headers['ETag'] == first.headers['ETag']
+    assert 'public' in second.headers['Cache-Control']
+    assert 'max-age=2' in first.headers['Cache-Control']
+
+
+def test_304_skips_the_query(client):
+    """Test con el ETag vigente no se ejecuta la agregación del resumen"""
+    first = client.get('/rooms/General/summary')
+    with patch('app.services.room_service.RoomService.get_room_summary') as mock_summary:
+        response = client.get('/rooms/General/summary',
+                              headers={'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 304
+    assert not mock_summary.called
+
+
+def test_new_message_changes_etag(client):
+    """Test un mensaje nuevo invalida el ETag de mensajes y resumen"""
+    from app.models import get_message_model
+    before = client.get('/rooms/General/messages').headers['ETag']
+
+    get_message_model().create_message('General', 'alice', msg='hola')
+    response = client.get('/rooms/General/messages', headers={'If-None-Match': before})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != before
+    assert response.get_json()['messages'][0]['msg'] == 'hola'
+
+
+def test_description_update_changes_etag(client):
+    """Test editar la sala cambia el ETag de sus detalles"""
+    from app.models import get_room_model
+    before = client.get('/rooms/General').headers['ETag']
+
+    get_room_model().update_description('General', 'Nueva')
+    response = client.get('/rooms/General', headers={'If-None-Match': before})
+    assert response.status_code == 200
+    assert response.get_json()['description'] == 'Nueva'
+
+
+def test_messages_etag_depends_on_limit(client):
+    """Test con otro limit el ETag no coincide (el cuerpo es distinto)"""
+    from app.models import get_message_model
+    for i in range(3):
+        get_message_model().create_message('General', 'alice', msg=f'm{i}')
+
+    full = client.get('/rooms/General/messages')
+    response = client.get('/rooms/General/messages?limit=1',
+                          headers={'If-None-Match': full.headers['ETag']})
+    assert response.status_code == 200
+    assert len(response.get_json()['messages']) == 1
+    assert response.headers['ETag'] != full.headers['ETag']
+    # El default explícito es la misma lectura
+    assert client.get('/rooms/General/messages?limit=100').headers['ETag'] == full.headers['ETag']
+
+
+@pytest.fixture
+def microcache(app):
+    from app.models import get_message_model
+    from app.services import RoomService
+    RoomService.configure_reads(60)
+    get_message_model().configure_reads(60)
+    yield
+    RoomService.configure_reads(0)
+    get_message_model().configure_reads(0)
+
+
+@pytest.mark.parametrize('url', ['/rooms/General/messages', '/rooms/General/summary'])
+def test_etag_never_newer_than_cached_body(client, microcache, url):
+    """Test con microcaché, un cambio hecho por otro worker no sirve el cuerpo
+    viejo con el ETag nuevo"""
+    from app.utils.database import mongo
+    from app.models import get_room_model
+    before = client.get(url)
+
+    # Escritura de otro proceso: esta caché local no se entera
+    seq = get_room_model().allocate_seq('General')
+    mongo.db.messages.insert_one({
+        'room': 'General', 'username': 'bob', 'msg': 'de otro worker',
+        'timestamp': datetime.now(ZoneInfo('America/Guayaquil')), 'seq': seq
+    })
+
+    after = client.get(url, headers={'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    assert after.headers['ETag'] != before.headers['ETag']
+    assert b'de otro worker' in after.data
+
+
+def test_missing_room_has_no_etag(client):
+    """Test una sala inexistente responde como siempre, sin ETag"""
+    response = client.get('/rooms/NoExiste')
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
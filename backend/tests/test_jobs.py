@@ -0,0 +1,107 @@
+"""
+test_jobs.py - Tests para trabajos en segundo plano
+Pruebas para services/job_service.py, routes/jobs.py y el historial de usuario
+"""
+
+import pytest
+import json
+from app import create_app
+from app.utils.database import mongo
+
+
+@pytest.fixture
+def client():
+    app = create_app('testing')
+    with app.test_client() as client:
+        with app.app_context():
+            mongo.db.users.delete_many({})
+            mongo.db.messages.delete_many({})
+            mongo.db.jobs.delete_many({})
+            client.post('/auth/register', json={
+                'username': 'testuser',
+                'password': 'password123'
+            })
+        yield client
+
+
+@pytest.fixture
+def token(client):
+    res = client.post('/auth/login', json={
+        'username': 'testuser',
+        'password': 'password123'
+    })
+    return json.loads(res.data)['token']
+
+
+def test_delete_user_with_purge_job(client, token):
+    from app.models import get_message_model
+    message_model = get_message_model()
+    for i in range(4):
+        message_model.create_message("General", "testuser", msg=f"Msg{i}")
+
+    res = client.delete(
+        '/auth/users/testuser?purge_messages=true',
+        headers={'Authorization': f'Bearer {token}'}
+    )
+    assert res.status_code == 200
+    data = json.loads(res.data)
+    assert 'purge_job' in data
+
+    # En testing los trabajos se ejecutan de forma síncrona
+    job = mongo.db.jobs.find_one({'id': data['purge_job']})
+    assert job['status'] == 'done'
+    assert job['result']['messages_deleted'] == 4
+    assert job['progress']['messages_deleted'] == 4
+    assert mongo.db.messages.count_documents({'username': 'testuser'}) == 0
+
+
+def test_get_job_not_found(client, token):
+    res = client.get('/jobs/no-existe', headers={'Authorization': f'Bearer {token}'})
+    assert res.status_code == 404
+
+
+def test_get_job_forbidden_for_other_user(client, token):
+    mongo.db.jobs.insert_one({'id': 'job-ajeno', 'requested_by': 'otro', 'status': 'done'})
+
+    res = client.get('/jobs/job-ajeno', headers={'Authorization': f'Bearer {token}'})
+    assert res.status_code == 403
+
+
+def test_get_own_job(client, token):
+    mongo.db.jobs.insert_one({'id': 'job-propio', 'requested_by': 'testuser', 'status': 'running'})
+
+    res = client.get('/jobs/job-propio', headers={'Authorization': f'Bearer {token}'})
+    assert res.status_code == 200
+    assert json.loads(res.data)['status'] == 'running'
+
+
+def test_get_user_messages_paginated(client, token):
+    from app.models import get_message_model
+    message_model = get_message_model()
+    for i in range(3):
+        message_model.create_message("General", "testuser", msg=f"Msg{i}")
+
+    res = client.get(
+        '/auth/users/testuser/messages?room=General&limit=2',
+        headers={'Authorization': f'Bearer {token}'}
+    )
+    assert res.status_code == 200
+    data = json.loads(res.data)
+    assert len(data['messages']) == 2
+    assert data['next_cursor'] is not None
+
+    res = client.get(
+        f"/auth/users/testuser/messages?room=General&limit=2&cursor={data['next_cursor']}",
+        headers={'Authorization': f'Bearer {token}'}
+    )
+    data = json.loads(res.data)
+    assert len(data['messages']) == 1
+    assert data['next_cursor'] is None
+
+
+def test_get_user_messages_invalid_cursor(client, token):
+    res = client.get(
+        '/auth/users/testuser/messages?cursor=basura',
+        headers={'Authorization': f'Bearer {token}'}
+    )
+    assert res.status_code == 400
@@ -0,0 +1,120 @@
+"""
+test_members.py - Tests para la suscripción a la lista de miembros
+Pruebas para services/members_service.py y la lista versionada de
+services/presence_service.py
+"""
+
+import pytest
+from unittest.mock import patch
+from app import create_app
+from app.services import JWTService, MembersService, PresenceService
+
+
+@pytest.fixture
+def presence():
+    PresenceService.reset()
+    yield
+    PresenceService.reset()
+
+
+def test_versions_count_distinct_users(presence):
+    """Test la versión cambia con altas/bajas de usuarios, no de pestañas"""
+    PresenceService.join('sid-1', 'alice', 'General')
+    PresenceService.join('sid-2', 'alice', 'General')     # segunda pestaña
+    PresenceService.join('sid-3', 'bob', 'General')
+    assert PresenceService.members_version('General') == 2
+    assert PresenceService.count_members('General') == 2
+
+    PresenceService.leave('sid-1')
+    assert PresenceService.members_version('General') == 2
+    PresenceService.leave('sid-2')
+    assert PresenceService.members_version('General') == 3
+    assert [m['username'] for m in PresenceService.members('General')] == ['bob']
+
+
+def test_snapshot_pagination(presence):
+    """Test el snapshot se recorre por páginas con cursor"""
+    for i, name in enumerate(['dave', 'alice', 'carol', 'bob', 'erin']):
+        PresenceService.join(f'sid-{i}', name, 'General')
+
+    first = MembersService.snapshot('General', limit=2)
+    assert [m['username'] for m in first['members']] == ['alice', 'bob']
+    assert first['version'] == 5 and first['count'] == 5
+
+    second = MembersService.snapshot('General', limit=2, cursor=first['next_cursor'])
+    third = MembersService.snapshot('General', limit=2, cursor=second['next_cursor'])
+    assert [m['username'] for m in second['members']] == ['carol', 'dave']
+    assert [m['username'] for m in third['members']] == ['erin']
+    assert third['next_cursor'] is None
+
+
+def test_delta_since_nets_out_changes(presence):
+    """Test el delta contiene solo los cambios netos desde la versión del cliente"""
+    PresenceService.join('sid-1', 'alice', 'General')
+    PresenceService.join('sid-2', 'bob', 'General')
+    version = PresenceService.members_version('General')
+
+    PresenceService.join('sid-3', 'carol', 'General')
+    PresenceService.leave('sid-3')                         # entra y sale
+    PresenceService.leave('sid-1')                         # el cliente la conocía
+    PresenceService.join('sid-4', 'dave', 'General')
+
+    delta = MembersService.delta_since('General', version)
+    assert delta['from_version'] == version
+    assert delta['version'] == PresenceService.members_version('General')
+    assert [m['username'] for m in delta['added']] == ['dave']
+    assert delta['removed'] == ['alice']
+
+
+def test_delta_requires_covered_version(presence):
+    """Test una versión que el diario ya no cubre pide snapshot"""
+    with patch.object(PresenceService, 'JOURNAL_SIZE', 2):
+        for i in range(4):
+            PresenceService.join(f'sid-{i}', f'user{i}', 'General')
+
+    assert MembersService.delta_since('General', 0) is None
+    assert MembersService.delta_since('General', 2)['added'][0]['username'] == 'user2'
+    assert MembersService.delta_since('General', 99) is None
+
+
+def test_flush_publishes_one_delta_per_room(presence):
+    """Test cada sala con cambios recibe un delta que encadena versiones"""
+    PresenceService.join('sid-1', 'alice', 'General')
+    PresenceService.join('sid-2', 'bob', 'Random')
+    deltas = {d['room']: d for d in MembersService.flush()}
+    assert deltas['General']['from_version'] == 0 and deltas['General']['version'] == 1
+
+    PresenceService.join('sid-3', 'carol', 'General')
+    (delta,) = MembersService.flush()
+    assert delta['from_version'] == 1 and delta['version'] == 2
+    assert MembersService.flush() == []
+
+
+def test_join_sends_snapshot_and_members_sync(presence):
+    """Test al entrar llega el snapshot y members_sync devuelve el delta"""
+    from app import socketio
+    from app.utils.database import mongo
+
+    app = create_app('testing')
+    with app.app_context():
+        mongo.db.users.delete_many({})
+        mongo.db.rooms.delete_many({})
+        from app.models import get_user_model, get_room_model
+        get_user_model().create_user('alice', 'password123')
+        get_room_model().create_room('General')
+        pin = get_room_model().find_by_name('General').get('pin')
+
+        client = socketio.test_client(app)
+        with patch.object(JWTService, 'verify_token', return_value='alice'):
+            client.emit('join', {'token': 'valid_token', 'room': 'General', 'pin': pin})
+            received = client.get_received()
+            snapshot = next(p['args'][0] for p in received if p['name'] == 'members_snapshot')
+            assert [m['username'] for m in snapshot['members']] == ['alice']
+            assert any(p['name'] == 'members_delta' for p in received)
+
+            PresenceService.join('other-sid', 'bob', 'General')
+            client.emit('members_sync', {'token': 'valid_token', 'room': 'General',
+                                         'version': snapshot['version']})
+            delta = next(p['args'][0] for p in client.get_received() if p['name'] == 'members_delta')
+            assert [m['username'] for m in delta['added']] == ['bob']
+        client.disconnect()
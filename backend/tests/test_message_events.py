@@ -56,6 +56,39 @@ def test_send_message_success(client, app):
                 assert args[1]["msg"] == "Hola"
 
 
+def test_send_message_retry_is_idempotent(client, app):
+    with app.app_context():
+        mongo.db.users.delete_many({})
+        mongo.db.rooms.delete_many({})
+        mongo.db.messages.delete_many({})
+
+        from app.models import get_user_model, get_room_model
+        get_user_model().create_user("testuser", "password123")
+        get_room_model().create_room("General")
+        get_user_model().update_room("testuser", "General", socket_id="fake_sid")
+
+        payload = {"token": "valid_token", "room": "General", "msg": "Hola", "client_msg_id": "c-1"}
+        with patch.object(JWTService, "verify_token", return_value="testuser"):
+            with patch("app.sockets.message_events.emit") as mock_emit:
+                client.emit("send_message", payload)
+                events = [c[0][0] for c in mock_emit.call_args_list]
+                assert events == ["message_ack", "message"]
+                ack = mock_emit.call_args_list[0][0][1]
+                assert ack["duplicate"] is False and ack["seq"] == 1
+
+                # Reintento: mismo id, sin nueva escritura ni broadcast
+                mock_emit.reset_mock()
+                client.emit("send_message", payload)
+                events = [c[0][0] for c in mock_emit.call_args_list]
+                assert events == ["message_ack"]
+                retry_ack = mock_emit.call_args[0][1]
+                assert retry_ack["duplicate"] is True
+                assert retry_ack["id"] == ack["id"]
+
+        assert mongo.db.messages.count_documents({"room": "General"}) == 1
+        assert get_room_model().find_by_name("General")["message_count"] == 1
+
+
 def test_send_message_no_room(client, app):
     with app.app_context():
         with patch.object(JWTService, "verify_token", return_value="testuser"):
@@ -95,23 +128,41 @@ def test_get_messages(client, app):
 
 def test_typing(client, app):
     with app.app_context():
-        mongo.db.users.delete_many({})
-        from app.models import get_user_model
-        user_model = get_user_model()
-        user_model.create_user("testuser", "password123")
-        user_model.update_room("testuser", "General", socket_id="fake_sid")
-
-        with patch.object(JWTService, "verify_token", return_value="testuser"):
+        from app.services import PresenceService, TypingService
+        TypingService.reset()
+        session = {"username": "testuser", "nickname": None, "room": "General", "is_anonymous": False}
+
+        # Sin JWT ni MongoDB: el usuario sale del registro de presencia
+        with patch.object(JWTService, "verify_token") as mock_verify, \
+             patch.object(PresenceService, "get_session", return_value=session), \
+             patch("app.utils.database.mongo") as mock_mongo:
             with patch("app.sockets.message_events.emit") as mock_emit:
                 client.emit("typing", {
-                    "token": "valid_token",
                     "room": "General",
                     "is_typing": True
                 })
                 assert mock_emit.called
+                assert not mock_verify.called
+                assert not mock_mongo.db.users.find_one.called
                 args = mock_emit.call_args[0]
-                assert args[0] == "user_typing"
-                assert args[1]["username"] == "testuser"
+                assert args[0] == "typing_state"
+                assert args[1]["users"][0]["username"] == "testuser"
+
+                # Repetir el mismo estado no vuelve a emitir
+                mock_emit.reset_mock()
+                client.emit("typing", {"token": "valid_token", "room": "General", "is_typing": True})
+                assert not mock_emit.called
+
+
+def test_typing_requires_presence(client, app):
+    with app.app_context():
+        from app.services import TypingService
+        TypingService.reset()
+
+        with patch.object(JWTService, "verify_token", return_value="testuser"):
+            with patch("app.sockets.message_events.emit") as mock_emit:
+                client.emit("typing", {"token": "valid_token", "room": "General", "is_typing": True})
+                assert not mock_emit.called
 
 
 def test_delete_message(client, app):
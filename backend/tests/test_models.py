@@ -5,6 +5,7 @@ Pruebas exhaustivas para cobertura 70%+
 
 import pytest
 import json
+from unittest.mock import patch
 from datetime import datetime
 from app.models import get_room_model, get_message_model, get_user_model
 
@@ -371,6 +372,57 @@ class TestMessageModel:
             assert msg['file_url'] == "https://example.com/file.pdf"
             assert msg['original_filename'] == "documento.pdf"
     
+    def test_default_security_flags_not_stored(self, app):
+        """Test los security_flags por defecto no se guardan pero sí se formatean"""
+        with app.app_context():
+            from app.utils.database import mongo
+            from app.models.message import DEFAULT_SECURITY_FLAGS
+            mongo.db.messages.delete_many({})
+            
+            message_model = get_message_model()
+            msg = message_model.create_message("General", "user1", msg="Hola")
+            
+            stored = mongo.db.messages.find_one({"_id": msg["_id"]})
+            assert "security_flags" not in stored
+            
+            formatted = message_model.format_message_for_emit(stored)
+            assert formatted["security_flags"] is DEFAULT_SECURITY_FLAGS
+            assert formatted["security_flags"]["risk_level"] == "low"
+            assert json.loads(json.dumps(formatted["security_flags"]))["issues"] == []
+            with pytest.raises(TypeError):
+                formatted["security_flags"]["risk_level"] = "high"
+    
+    def test_compact_security_flags_migration(self, app):
+        """Test la migración quita los flags por defecto de mensajes antiguos"""
+        with app.app_context():
+            from app.utils.database import mongo
+            mongo.db.messages.delete_many({})
+            
+            default = {
+                'has_encryption': False,
+                'has_steganography_risk': False,
+                'has_malicious_patterns': False,
+                'has_suspicious_content': False,
+                'risk_level': 'low',
+                'issues': []
+            }
+            flagged = {**default, 'has_encryption': True, 'risk_level': 'medium',
+                       'issues': ['encrypted_content']}
+            mongo.db.messages.insert_many(
+                [{"room": "General", "msg": f"m{i}", "security_flags": dict(default)} for i in range(5)]
+                + [{"room": "General", "msg": "cifrado", "security_flags": flagged}]
+            )
+            
+            model = get_message_model()
+            with patch.object(model.messages, 'find', wraps=model.messages.find) as find:
+                assert model.compact_security_flags(batch_size=2) == 5
+            # Cada lote continúa después del último _id del anterior
+            queries = [c[0][0] for c in find.call_args_list]
+            assert "_id" not in queries[0]
+            assert all("$gt" in q["_id"] for q in queries[1:])
+            assert mongo.db.messages.count_documents({"security_flags": {"$exists": True}}) == 1
+            assert mongo.db.messages.find_one({"msg": "cifrado"})["security_flags"] == flagged
+    
     def test_create_message_with_security_flags(self, app):
         """Test crear mensaje con flags de seguridad"""
         with app.app_context():
@@ -517,10 +569,31 @@ class TestMessageModel:
                 file_url="https://example.com/file.pdf"
             )
             
-            messages = message_model.get_messages_with_files("Room1")
+            messages, next_cursor = message_model.get_messages_with_files("Room1")
             
             assert len(messages) == 1
             assert messages[0]['file_url'] is not None
+            assert next_cursor is None
+    
+    def test_get_messages_with_files_pages(self, app):
+        """Test la página de mensajes con archivos devuelve el cursor siguiente"""
+        with app.app_context():
+            from app.utils.database import mongo
+            mongo.db.messages.delete_many({})
+            mongo.db.attachments.delete_many({})
+            
+            message_model = get_message_model()
+            for i in range(3):
+                message_model.create_message(
+                    "Room1", "user", msg=f"archivo {i}",
+                    file_url=f"https://example.com/{i}.pdf"
+                )
+            
+            page1, cursor = message_model.get_messages_with_files("Room1", limit=2)
+            page2, end = message_model.get_messages_with_files("Room1", limit=2, cursor=cursor)
+            
+            assert [m['msg'] for m in page1 + page2] == ["archivo 2", "archivo 1", "archivo 0"]
+            assert cursor is not None and end is None
     
     def test_search_messages(self, app):
         """Test buscar mensajes por término"""
@@ -590,3 +663,96 @@ class TestMessageModel:
             assert len(formatted) == 2
             assert formatted[0]['username'] in ["user1", "user2"]
             assert 'security_flags' in formatted[0]
+    
+    def test_get_user_history_paginated(self, app):
+        """Test historial de usuario paginado por cursor"""
+        with app.app_context():
+            from app.utils.database import mongo
+            mongo.db.messages.delete_many({})
+            
+            message_model = get_message_model()
+            for i in range(5):
+                message_model.create_message("Room1", "user1", msg=f"Msg{i}")
+            message_model.create_message("Room1", "user2", msg="Otro")
+            message_model.create_message("Room2", "user1", msg="Otra sala")
+            
+            page1, cursor = message_model.get_user_history("user1", room="Room1", limit=3)
+            page2, cursor2 = message_model.get_user_history("user1", room="Room1", limit=3, cursor=cursor)
+            
+            assert len(page1) == 3
+            assert len(page2) == 2
+            assert cursor2 is None
+            ids = {m['_id'] for m in page1 + page2}
+            assert len(ids) == 5
+            assert all(m['room'] == "Room1" and m['username'] == "user1" for m in page1 + page2)
+    
+    def test_delete_user_messages_batched(self, app):
+        """Test borrado por lotes con reporte de progreso"""
+        with app.app_context():
+            from app.utils.database import mongo
+            mongo.db.messages.delete_many({})
+            
+            message_model = get_message_model()
+            for i in range(7):
+                message_model.create_message("Room1", "user1", msg=f"Msg{i}")
+            message_model.create_message("Room1", "user2", msg="Se queda")
+            
+            progress = []
+            deleted = message_model.delete_user_messages_batched(
+                "user1", batch_size=3, pause=0, on_progress=progress.append
+            )
+            
+            assert deleted == 7
+            assert progress == [3, 6, 7]
+            assert message_model.count_room_messages("Room1") == 1
+    
+    def test_create_message_once_dedup(self, app):
+        """Test un client_msg_id repetido devuelve el mensaje original"""
+        with app.app_context():
+            from app.utils.database import mongo
+            from app.models import get_room_model
+            mongo.db.messages.delete_many({})
+            mongo.db.rooms.delete_many({"name": "DedupRoom"})
+            get_room_model().create_room("DedupRoom")
+            message_model = get_message_model()
+            
+            first, created = message_model.create_message_once("DedupRoom", "user1", "c-9", msg="hola")
+            assert created is True
+            
+            # Sin la ventana en memoria, el índice único sigue evitando duplicados
+            message_model._recent_client_ids.invalidate()
+            again, created = message_model.create_message_once("DedupRoom", "user1", "c-9", msg="hola")
+            assert created is False
+            assert again["_id"] == first["_id"]
+            
+            # El mismo id de otro usuario es un mensaje distinto
+            _, created = message_model.create_message_once("DedupRoom", "user2", "c-9", msg="hola")
+            assert created is True
+            assert mongo.db.messages.count_documents({"room": "DedupRoom"}) == 2
+    
+    def test_duplicate_client_msg_id_does_not_consume_seq(self, app):
+        """Test un reintento ya guardado no reserva secuencia; uno simultáneo
+        deja a lo sumo un hueco y el contador cuadra"""
+        with app.app_context():
+            from pymongo.errors import DuplicateKeyError
+            from app.utils.database import mongo
+            from app.models import get_room_model
+            mongo.db.messages.delete_many({})
+            mongo.db.rooms.delete_many({"name": "DedupRoom"})
+            get_room_model().create_room("DedupRoom")
+            message_model = get_message_model()
+            
+            first = message_model.create_message("DedupRoom", "user1", msg="a", client_msg_id="c-1")
+            with patch.object(get_room_model(), 'allocate_seq') as allocate:
+                with pytest.raises(DuplicateKeyError):
+                    message_model.create_message("DedupRoom", "user1", msg="a", client_msg_id="c-1")
+                assert not allocate.called
+            
+            # Como si otro worker hubiera pasado la búsqueda al mismo tiempo
+            with patch.object(message_model, 'find_by_client_msg_id', return_value=None):
+                with pytest.raises(DuplicateKeyError):
+                    message_model.create_message("DedupRoom", "user1", msg="a", client_msg_id="c-1")
+            second = message_model.create_message("DedupRoom", "user1", msg="b", client_msg_id="c-2")
+            
+            assert first["seq"] == 1 and second["seq"] == 3
+            assert mongo.db.rooms.find_one({"name": "DedupRoom"})["message_count"] == 2
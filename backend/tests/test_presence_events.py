@@ -0,0 +1,115 @@
+"""
+test_presence_events.py - Tests para los avisos de presencia por sala
+Pruebas para services/presence_event_service.py
+"""
+
+import pytest
+from unittest.mock import patch
+from app import create_app
+from app.services import PresenceService, PresenceEventService
+
+
+class Recorder:
+    """emit mínimo que registra las llamadas"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, event, data, room=None):
+        self.calls.append((event, data, room))
+
+
+@pytest.fixture
+def presence():
+    PresenceService.reset()
+    PresenceEventService.reset()
+    PresenceEventService.configure({
+        'PRESENCE_BATCH_MIN_MEMBERS': 3,
+        'PRESENCE_SUPPRESS_MIN_MEMBERS': 5,
+        'PRESENCE_FLUSH_INTERVAL_MS': 0
+    })
+    yield
+    PresenceService.reset()
+    PresenceEventService.reset()
+    PresenceEventService.configure({})
+
+
+def _fill(room, n):
+    for i in range(n):
+        PresenceService.join(f"sid-{room}-{i}", f"user{i}", room)
+
+
+def test_small_room_gets_individual_notice(presence):
+    """Test en salas pequeñas el aviso es inmediato y solo a la sala"""
+    emit = Recorder()
+    _fill('General', 2)
+
+    assert PresenceEventService.announce(None, emit, 'General', 'joined', {'username': 'alice'})
+    assert emit.calls == [('user_joined', {'username': 'alice'}, 'General')]
+
+
+def test_large_room_gets_delta(presence):
+    """Test en salas grandes sale un presence_delta con la lista"""
+    emit = Recorder()
+    _fill('General', 3)
+
+    assert not PresenceEventService.announce(None, emit, 'General', 'left', {'username': 'bob'})
+    event, delta, room = emit.calls[0]
+    assert event == 'presence_delta' and room == 'General'
+    assert delta == {
+        'room': 'General',
+        'members_count': 3,
+        'joined_count': 0,
+        'left_count': 1,
+        'joined': [],
+        'left': [{'username': 'bob', 'nickname': None}]
+    }
+
+
+def test_join_then_leave_cancels_out(presence):
+    """Test entrar y salir en la misma ventana no genera delta"""
+    _fill('General', 3)
+    PresenceEventService._interval = 60   # acumular sin enviar
+
+    with patch.object(PresenceEventService, 'ensure_flusher'):
+        PresenceEventService.announce(None, Recorder(), 'General', 'joined', {'username': 'carol'})
+        PresenceEventService.announce(None, Recorder(), 'General', 'disconnected', {'username': 'carol'})
+        PresenceEventService.announce(None, Recorder(), 'General', 'joined', {'username': 'dave'})
+
+    deltas = PresenceEventService.flush()
+    assert [d['joined'] for d in deltas] == [[{'username': 'dave', 'nickname': None}]]
+    assert PresenceEventService.flush() == []
+
+
+def test_huge_room_suppresses_user_lists(presence):
+    """Test sobre el umbral de supresión el delta lleva solo conteos"""
+    emit = Recorder()
+    _fill('General', 5)
+
+    PresenceEventService.announce(None, emit, 'General', 'joined', {'username': 'erin'})
+    delta = emit.calls[0][1]
+    assert delta['joined_count'] == 1
+    assert 'joined' not in delta and 'left' not in delta
+
+
+def test_disconnect_notifies_only_user_room():
+    """Test la desconexión se avisa a la sala del usuario, no a todo el servidor"""
+    from app import socketio
+    from app.utils.database import mongo
+
+    app = create_app('testing')
+    with app.app_context():
+        mongo.db.users.delete_many({})
+        client = socketio.test_client(app)
+        sid = client.eio_sid
+        mongo.db.users.insert_one({
+            'username': 'alice', 'socket_id': socketio.server.manager.sid_from_eio_sid(sid, '/'),
+            'current_room': 'General', 'is_anonymous': False
+        })
+
+        with patch('app.sockets.auth_events.emit') as mock_emit:
+            client.disconnect()
+
+        calls = [c for c in mock_emit.call_args_list if c[0][0] == 'user_disconnected']
+        assert len(calls) == 1
+        assert calls[0][1] == {'room': 'General'}
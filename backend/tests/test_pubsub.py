@@ -0,0 +1,114 @@
+"""
+test_pubsub.py - Tests para el fan-out de Socket.IO entre procesos
+Pruebas para sockets/pubsub.py
+"""
+
+import json
+import logging
+import socketio
+from app.sockets.pubsub import (
+    MongoPubSubManager,
+    create_client_manager,
+    socketio_queue_options
+)
+
+
+class TestClientManagerFactory:
+    """Tests para la selección del backend de la cola"""
+
+    def test_no_queue_single_process(self):
+        """Test sin URL no se crea gestor (un solo proceso)"""
+        assert create_client_manager(None) is None
+        assert socketio_queue_options({'SOCKETIO_MESSAGE_QUEUE': None}) == {}
+
+    def test_kombu_for_amqp(self):
+        """Test amqp:// usa KombuManager"""
+        try:
+            manager = create_client_manager('amqp://guest@localhost//', write_only=True)
+        except RuntimeError:
+            return  # kombu no instalado en este entorno
+        assert isinstance(manager, socketio.KombuManager)
+
+    def test_mongo_manager_publishes(self):
+        """Test mongodb:// usa la colección capped como canal"""
+        options = socketio_queue_options({
+            'SOCKETIO_MESSAGE_QUEUE': 'mongodb://localhost:27017/salas_distribuidas_test',
+            'SOCKETIO_CHANNEL': 'test-channel'
+        })
+        manager = options['client_manager']
+        assert isinstance(manager, MongoPubSubManager)
+        assert manager.collection.name == 'socketio_test-channel'
+
+        manager.collection.delete_many({})
+        manager._publish({'method': 'emit', 'event': 'message', 'room': 'General'})
+
+        doc = manager.collection.find_one()
+        assert json.loads(doc['payload'])['event'] == 'message'
+
+
+class _FakeCursor:
+    """Cursor tailable mínimo: entrega los documentos que había al abrirse y muere"""
+
+    def __init__(self, docs):
+        self.docs = list(docs)
+        self.alive = True
+
+    def sort(self, *args):
+        return self
+
+    def try_next(self):
+        if not self.docs:
+            self.alive = False
+            return None
+        return self.docs.pop(0)
+
+
+class _FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find_one(self, query=None, sort=None):
+        if sort:
+            return self.docs[-1] if self.docs else None
+        return next((d for d in self.docs if d['_id'] == query['_id']), None)
+
+    def find(self, query, cursor_type=None):
+        return _FakeCursor(self.docs)
+
+
+class _FakeServer:
+    async_mode = 'threading'
+    logger = logging.getLogger('test_pubsub')
+
+    def sleep(self, seconds):
+        pass
+
+
+class TestMongoListen:
+    """Tests para la lectura de la cola en orden de inserción"""
+
+    def _manager(self, docs):
+        manager = MongoPubSubManager.__new__(MongoPubSubManager)
+        manager.collection = _FakeCollection(docs)
+        manager.server = _FakeServer()
+        manager.logger = None
+        return manager
+
+    def test_resume_by_insertion_order_not_id(self):
+        """Test al recrear el cursor no se pierden mensajes con _id menor"""
+        # _id de distintos publicadores: el orden de inserción no es el de _id
+        docs = [{'_id': 5, 'payload': 'viejo'}, {'_id': 9, 'payload': 'a'}]
+        manager = self._manager(docs)
+        manager._newest_id = lambda: 5            # 'viejo' ya existía al arrancar
+        listener = manager._listen()
+        assert next(listener) == 'a'
+
+        # Llega con _id menor y el cursor se recrea antes de leerlo
+        docs.append({'_id': 3, 'payload': 'b'})
+        assert next(listener) == 'b'
+
+    def test_evicted_resume_point_continues_from_newest(self):
+        """Test si el último entregado ya salió de la capped, sigue desde lo más nuevo"""
+        manager = self._manager([{'_id': 1, 'payload': 'x'}, {'_id': 2, 'payload': 'y'}])
+        cursor, skip_to = manager._open_cursor(99)
+        assert skip_to == 2
@@ -0,0 +1,104 @@
+"""
+test_rate_limit.py - Tests para los límites de frecuencia de eventos
+Pruebas para utils/rate_limit.py, services/rate_limit_service.py y
+middleware/rate_limit.py
+"""
+
+import time
+import pytest
+from unittest.mock import patch
+from app import create_app
+from app.services import JWTService, RateLimitService
+from app.utils.rate_limit import MemoryBucketStore, MongoBucketStore, parse_policies
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestBuckets:
+    """Tests de los almacenes de baldes"""
+
+    def test_memory_burst_then_refill(self):
+        """Test la ráfaga se permite y luego hay que esperar el relleno"""
+        clock = FakeClock()
+        store = MemoryBucketStore(clock=clock)
+
+        assert [store.consume('k', rate=2, burst=3) for _ in range(3)] == [0, 0, 0]
+        assert store.consume('k', rate=2, burst=3) == pytest.approx(0.5)
+
+        clock.now += 0.5
+        assert store.consume('k', rate=2, burst=3) == 0
+
+    def test_memory_keys_are_independent(self):
+        """Test cada clave tiene su propio balde"""
+        store = MemoryBucketStore(clock=FakeClock())
+        store.consume('a', rate=1, burst=1)
+        assert store.consume('a', rate=1, burst=1) > 0
+        assert store.consume('b', rate=1, burst=1) == 0
+
+    def test_memory_evicts_oldest(self):
+        """Test el número de baldes está acotado"""
+        store = MemoryBucketStore(max_keys=2, clock=FakeClock())
+        for key in ('a', 'b', 'c'):
+            store.consume(key, rate=1, burst=1)
+        assert list(store._buckets) == ['b', 'c']
+
+    def test_mongo_store_shares_buckets(self, app):
+        """Test dos nodos con la misma colección comparten el balde"""
+        from app.utils.database import mongo
+        mongo.db.rate_limits.delete_many({})
+        clock = FakeClock(time.time())
+        node_a = MongoBucketStore(mongo.db.rate_limits, clock=clock)
+        node_b = MongoBucketStore(mongo.db.rate_limits, clock=clock)
+
+        assert node_a.consume('k', rate=1, burst=2) == 0
+        assert node_b.consume('k', rate=1, burst=2) == 0
+        assert node_a.consume('k', rate=1, burst=2) == pytest.approx(1.0)
+
+        clock.now += 1
+        assert node_b.consume('k', rate=1, burst=2) == 0
+
+    def test_parse_policies(self):
+        """Test formato evento=rate/burst"""
+        assert parse_policies('send_message=5/10, typing=4') == {
+            'send_message': (5.0, 10),
+            'typing': (4.0, 4)
+        }
+        with pytest.raises(ValueError):
+            parse_policies('send_message=0/1')
+
+
+@pytest.fixture
+def limited_app():
+    app = create_app('testing')
+    app.config['RATE_LIMIT_ENABLED'] = True
+    app.config['SOCKET_RATE_LIMITS'] = 'search_messages=0.01/2'
+    RateLimitService.configure(app.config)
+    RateLimitService.reset()
+    yield app
+    RateLimitService.configure({'RATE_LIMIT_ENABLED': False})
+
+
+def test_socket_event_rate_limited(limited_app):
+    """Test superar la ráfaga emite rate_limited sin ejecutar el handler"""
+    from app import socketio
+    client = socketio.test_client(limited_app)
+    client.get_received()
+
+    payload = {'token': 'valid_token', 'room': 'General', 'search_term': 'hola'}
+    with patch.object(JWTService, 'verify_token', return_value='testuser') as verify:
+        for _ in range(3):
+            client.emit('search_messages', payload)
+
+    assert verify.call_count == 2
+    received = [p for p in client.get_received() if p['name'] == 'rate_limited']
+    assert len(received) == 1
+    assert received[0]['args'][0]['event'] == 'search_messages'
+    assert received[0]['args'][0]['retry_after'] > 0
+    assert RateLimitService.stats() == {'search_messages': 1}
+    client.disconnect()
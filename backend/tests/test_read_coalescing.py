@@ -0,0 +1,118 @@
+"""
+test_read_coalescing.py - Tests para las lecturas compartidas (single-flight)
+Pruebas para models/message.py (get_room_messages) y services/room_service.py
+"""
+
+import time
+import threading
+import pytest
+from unittest.mock import patch
+from app import create_app
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        from app.utils.database import mongo
+        mongo.db.rooms.delete_many({})
+        mongo.db.messages.delete_many({})
+        yield app
+    from app.models import get_message_model
+    from app.services import RoomService
+    RoomService.configure_reads(0)
+    get_message_model().configure_reads(0)
+
+
+def _concurrently(n, func):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(func())) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def _slow(func, calls):
+    def wrapper(*args, **kwargs):
+        calls.append(args)
+        time.sleep(0.05)
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def test_concurrent_message_reads_share_one_query(app):
+    """Test N lecturas simultáneas de la misma sala hacen una sola consulta"""
+    from app.models import get_room_model, get_message_model
+    get_room_model().create_room('General')
+    model = get_message_model()
+    model.create_message('General', 'alice', msg='hola')
+
+    calls = []
+    with patch.object(model, '_fetch_room_messages', _slow(model._fetch_room_messages, calls)):
+        results = _concurrently(10, lambda: model.get_room_messages('General', limit=50))
+
+    assert len(calls) == 1
+    assert all([m['msg'] for m in r] == ['hola'] for r in results)
+    assert model.read_stats()['coalesced'] >= 9
+
+
+def test_microcache_invalidated_by_new_message(app):
+    """Test con microcaché la lectura se reutiliza hasta que llega un mensaje"""
+    from app.models import get_room_model, get_message_model
+    get_room_model().create_room('General')
+    model = get_message_model()
+    model.configure_reads(60)
+    model.create_message('General', 'alice', msg='uno')
+
+    assert len(model.get_room_messages('General')) == 1
+    with patch.object(model, '_fetch_room_messages') as mock_fetch:
+        assert len(model.get_room_messages('General')) == 1
+        assert not mock_fetch.called
+
+    model.create_message('General', 'bob', msg='dos')
+    assert [m['msg'] for m in model.get_room_messages('General')] == ['uno', 'dos']
+
+
+def test_concurrent_summaries_share_one_aggregation(app):
+    """Test N resúmenes simultáneos de la misma sala hacen una sola agregación"""
+    from app.models import get_room_model
+    from app.services import RoomService
+    room_model = get_room_model()
+    room_model.create_room('General')
+
+    calls = []
+    with patch.object(room_model, 'aggregate_summary', _slow(room_model.aggregate_summary, calls)):
+        results = _concurrently(8, lambda: RoomService.get_room_summary('General'))
+
+    assert len(calls) == 1
+    assert all(r['room']['name'] == 'General' for r in results)
+
+
+def test_writes_from_any_worker_change_the_cache_key(app):
+    """Test con microcaché, los cambios hechos por otro worker (sin
+    invalidar esta caché) se ven en la siguiente lectura"""
+    from app.utils.database import mongo
+    from app.models import get_room_model, get_user_model, get_message_model
+    from app.services import RoomService
+    RoomService.configure_reads(60)
+    model = get_message_model()
+    model.configure_reads(60)
+    get_room_model().create_room('General', description='antes')
+    get_user_model().create_user('alice', 'password123')
+
+    assert RoomService.get_room_details_with_members('General')['members_count'] == 0
+    assert model.get_room_messages('General') == []
+
+    # Escrituras directas, como las haría otro proceso
+    get_room_model().update_description('General', 'después')
+    mongo.db.users.update_one({'username': 'alice'}, {'$set': {'current_room': 'General'}})
+    seq = get_room_model().allocate_seq('General')
+    mongo.db.messages.insert_one({'room': 'General', 'username': 'alice', 'msg': 'hola', 'seq': seq})
+
+    details = RoomService.get_room_details_with_members('General')
+    assert details['description'] == 'después'
+    assert details['members_count'] == 1
+    assert RoomService.get_room_summary('General')['stats']['total_messages'] == 1
+    assert [m['msg'] for m in model.get_room_messages('General')] == ['hola']
@@ -154,4 +154,19 @@ def test_get_members(client, app):
                 assert mock_emit.called
                 args = mock_emit.call_args[0]
                 assert args[0] == "members_list"
-                assert args[1]["count"] >= 1
\ No newline at end of file
+                assert args[1]["count"] >= 1
+
+def test_join_redirects_to_owner_worker(client, app):
+    with app.app_context():
+        mongo.db.rooms.delete_many({})
+        from app.models import get_room_model
+        get_room_model().create_room("ShardedRoom")
+
+        redirect = {"room": "ShardedRoom", "worker_id": "worker-1", "url": "http://localhost:5001"}
+        with patch("app.sockets.room_events.ShardService.route", return_value=redirect), \
+             patch("app.sockets.room_events.emit") as mock_emit, \
+             patch("app.sockets.room_events.join_room") as mock_join:
+            client.emit("join", {"token": "valid_token", "room": "ShardedRoom"})
+
+            mock_emit.assert_called_once_with("join_redirect", redirect)
+            assert not mock_join.called
@@ -0,0 +1,160 @@
+"""
+test_rooms_directory.py - Tests para el directorio de salas en vivo
+Pruebas para services/room_directory_service.py
+"""
+
+import pytest
+from unittest.mock import patch
+from app import create_app
+from app.services import JWTService, RoomDirectoryService
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        from app.utils.database import mongo
+        mongo.db.users.delete_many({})
+        mongo.db.rooms.delete_many({})
+        mongo.db.messages.delete_many({})
+        mongo.db.counters.delete_many({})
+        RoomDirectoryService.reset()
+        yield app
+    RoomDirectoryService.reset()
+    RoomDirectoryService.configure(app.config)
+
+
+def _rooms():
+    from app.models import get_room_model
+    return get_room_model()
+
+
+def test_list_served_from_cache(app):
+    """Test el listado sale de la caché hasta que vence"""
+    RoomDirectoryService.configure({'ROOM_DIRECTORY_REFRESH_SECONDS': 60})
+    _rooms().create_room('General')
+    assert [r['name'] for r in RoomDirectoryService.list_rooms()] == ['General']
+
+    with patch('app.services.room_service.RoomService.list_rooms_with_stats') as mock_list:
+        room = _rooms().create_room('Random')
+        assert [r['name'] for r in RoomDirectoryService.list_rooms()] == ['General']
+
+        with patch.object(RoomDirectoryService, '_emit') as mock_emit:
+            RoomDirectoryService.room_created(room)
+        assert [r['name'] for r in RoomDirectoryService.list_rooms()] == ['General', 'Random']
+        assert not mock_list.called
+
+    event, payload = mock_emit.call_args[0]
+    assert event == 'room_created'
+    assert payload['room']['name'] == 'Random' and payload['version'] == 1
+
+
+def test_counts_only_for_changed_rooms(app):
+    """Test room_counts lleva solo las salas cuyo conteo cambió"""
+    from app.models import get_message_model
+
+    RoomDirectoryService.configure({'ROOM_DIRECTORY_COUNTS_INTERVAL_MS': 0})
+    _rooms().create_room('General')
+    _rooms().create_room('Random')
+    RoomDirectoryService.list_rooms()
+
+    get_message_model().create_message('General', 'alice', msg='hola')
+    with patch.object(RoomDirectoryService, '_emit') as mock_emit:
+        RoomDirectoryService.touch('General')
+        RoomDirectoryService.touch('Random')      # sin cambios
+
+    mock_emit.assert_called_once_with('room_counts', {
+        'version': 1,
+        'rooms': {'General': {'members': 0, 'messages': 1}}
+    })
+    general = next(r for r in RoomDirectoryService.list_rooms() if r['name'] == 'General')
+    assert general['messages'] == 1
+
+
+def test_reload_publishes_differences(app):
+    """Test al reconstruir el listado se publican los cambios de otros workers"""
+    RoomDirectoryService.configure({'ROOM_DIRECTORY_REFRESH_SECONDS': 0})
+    _rooms().create_room('General')
+    _rooms().create_room('Vieja')
+    RoomDirectoryService.list_rooms()
+
+    _rooms().update_description('General', 'Nueva descripción')
+    _rooms().delete_room('Vieja')
+    _rooms().create_room('Random')
+    with patch.object(RoomDirectoryService, '_emit') as mock_emit:
+        RoomDirectoryService.list_rooms()
+
+    events = {c[0][0]: c[0][1] for c in mock_emit.call_args_list}
+    assert events['room_updated']['room']['description'] == 'Nueva descripción'
+    assert events['room_created']['room']['name'] == 'Random'
+    assert events['room_deleted']['room'] == 'Vieja'
+
+
+def test_reload_with_message_queue_is_silent(app):
+    """Test con cola de mensajes los cambios de otro worker no se vuelven a publicar"""
+    from app.utils.database import mongo
+
+    RoomDirectoryService.configure({
+        'ROOM_DIRECTORY_REFRESH_SECONDS': 60,
+        'ROOM_DIRECTORY_COUNTS_INTERVAL_MS': 0,
+        'SOCKETIO_MESSAGE_QUEUE': 'redis://localhost:6379/0'
+    })
+    _rooms().create_room('General')
+    RoomDirectoryService.list_rooms()
+
+    # Otro worker crea una sala: publica él y avanza el contador global
+    _rooms().create_room('Random')
+    mongo.db.counters.update_one(
+        {'_id': RoomDirectoryService.COUNTER}, {'$set': {'version': 5}}, upsert=True
+    )
+    with patch.object(RoomDirectoryService, '_emit') as mock_emit:
+        RoomDirectoryService.touch('General')       # sin cambios: no publica
+        RoomDirectoryService.room_updated(_rooms().find_by_name('General'))
+
+    # Este worker solo publica su propio cambio, con la versión global
+    assert [c[0][0] for c in mock_emit.call_args_list] == ['room_updated']
+    assert mock_emit.call_args[0][1]['version'] == 6
+
+    # El contador saltó: la caché se reconstruye sin publicar nada
+    with patch.object(RoomDirectoryService, '_emit') as mock_emit:
+        names = [r['name'] for r in RoomDirectoryService.list_rooms()]
+    assert names == ['General', 'Random']
+    assert not mock_emit.called
+    assert RoomDirectoryService.etag() == 'rooms-6'
+
+
+def test_subscriber_receives_snapshot_and_counts(app):
+    """Test el suscriptor recibe el listado y luego los conteos al entrar alguien"""
+    from app import socketio
+    from app.models import get_user_model
+
+    get_user_model().create_user('alice', 'password123')
+    _rooms().create_room('General')
+    pin = _rooms().find_by_name('General').get('pin')
+
+    watcher = socketio.test_client(app)
+    other = socketio.test_client(app)
+    watcher.emit('subscribe_rooms_directory', {})
+    (snapshot,) = [p['args'][0] for p in watcher.get_received() if p['name'] == 'rooms_directory']
+    assert [r['name'] for r in snapshot['rooms']] == ['General']
+
+    with patch.object(JWTService, 'verify_token', return_value='alice'):
+        other.emit('join', {'token': 'valid_token', 'room': 'General', 'pin': pin})
+
+    counts = [p['args'][0] for p in watcher.get_received() if p['name'] == 'room_counts']
+    assert counts[-1]['rooms'] == {'General': {'members': 1, 'messages': 0}}
+    assert not any(p['name'] == 'room_counts' for p in other.get_received())
+
+    watcher.emit('unsubscribe_rooms_directory', {})
+    with patch.object(JWTService, 'verify_token', return_value='alice'):
+        other.emit('leave', {'token': 'valid_token', 'room': 'General'})
+    assert not any(p['name'] == 'room_counts' for p in watcher.get_received())
+    watcher.disconnect()
+    other.disconnect()
+
+
+def test_directory_room_is_not_a_valid_room_name():
+    """Test la sala de Socket.IO del directorio no puede coincidir con una sala real"""
+    from app.utils.validators import Validators, ValidationError
+    with pytest.raises(ValidationError):
+        Validators.validate_room_name(RoomDirectoryService.ROOM)
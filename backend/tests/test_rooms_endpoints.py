@@ -278,10 +278,43 @@ class TestRoomsEndpoints:
             headers={'Authorization': f'Bearer {token}'}
         )
         
-        assert response.status_code == 200
+        assert response.status_code == 202
         data = json.loads(response.data)
+        assert 'job_id' in data
+        # En testing el trabajo se ejecuta de forma síncrona
+        assert data['status'] == 'done'
         assert data['stats']['room_deleted'] is True
     
+    def test_delete_room_hidden_immediately(self, client, admin_user, app):
+        """Test la sala marcada para eliminación deja de ser visible"""
+        with app.app_context():
+            from app.models import get_room_model
+            from app.utils.database import mongo
+            
+            mongo.db.rooms.delete_many({})
+            room_model = get_room_model()
+            room_model.create_room('Tombstoned')
+            room_model.create_room('Visible')
+            
+            assert room_model.mark_deleting('Tombstoned') is not None
+            
+            assert room_model.find_by_name('Tombstoned') is None
+            assert room_model.exists('Tombstoned') is False
+            assert room_model.count_all() == 1
+            with pytest.raises(ValueError, match="eliminación"):
+                room_model.create_room('Tombstoned')
+        
+        response = client.get('/rooms')
+        names = [r['name'] for r in json.loads(response.data)['rooms']]
+        assert 'Tombstoned' not in names
+        assert 'Visible' in names
+        
+        response = client.delete(
+            '/rooms/Tombstoned',
+            headers={'Authorization': f'Bearer {admin_user["token"]}'}
+        )
+        assert response.status_code == 404
+    
     def test_delete_room_not_found(self, client, admin_user):
         """Test eliminar sala inexistente"""
         token = admin_user['token']
@@ -0,0 +1,47 @@
+"""
+test_serialization.py - Tests para la capa de serialización JSON
+Pruebas para utils/serialization.py
+"""
+
+import json
+import pytest
+from datetime import datetime, timezone, timedelta
+from bson import ObjectId
+from app.utils.serialization import StdSocketJSON, OrjsonSocketJSON, orjson
+from app.models.message import DEFAULT_SECURITY_FLAGS
+
+
+SAMPLE = {
+    "id": ObjectId("65a1b2c3d4e5f60718293a4b"),
+    "naive": datetime(2025, 1, 15, 10, 30, 0, 123000),
+    "aware": datetime(2025, 1, 15, 5, 30, tzinfo=timezone(timedelta(hours=-5))),
+    "flags": DEFAULT_SECURITY_FLAGS
+}
+
+EXPECTED = {
+    "id": "65a1b2c3d4e5f60718293a4b",
+    "naive": "2025-01-15T10:30:00.123000Z",
+    "aware": "2025-01-15T05:30:00-05:00",
+    "flags": {**DEFAULT_SECURITY_FLAGS, "issues": []}
+}
+
+
+def test_std_serializer_format():
+    """Test json estándar: datetime naive como UTC con Z, ObjectId como str"""
+    assert json.loads(StdSocketJSON.dumps(SAMPLE)) == EXPECTED
+
+
+@pytest.mark.skipif(orjson is None, reason="orjson no instalado")
+def test_orjson_matches_std():
+    """Test orjson produce el mismo contenido que json estándar"""
+    assert json.loads(OrjsonSocketJSON.dumps(SAMPLE)) == EXPECTED
+
+
+def test_flask_response_serializes_datetimes(app):
+    """Test jsonify usa la capa configurada en create_app"""
+    with app.test_request_context():
+        response = app.json.response({"ts": SAMPLE["naive"], "id": SAMPLE["id"]})
+        assert json.loads(response.get_data()) == {
+            "ts": EXPECTED["naive"],
+            "id": EXPECTED["id"]
+        }
@@ -309,3 +309,144 @@ class TestRoomService:
             summary = RoomService.get_room_summary("NonExistent")
             
             assert summary is None
+    
+    def test_delete_room_cascade_batched_progress(self, app):
+        """Test el borrado asíncrono reporta progreso en el trabajo"""
+        with app.app_context():
+            from app.models import get_room_model, get_message_model
+            from app.services.room_service import RoomService
+            from app.utils.database import mongo
+            
+            mongo.db.rooms.delete_many({})
+            mongo.db.messages.delete_many({})
+            mongo.db.jobs.delete_many({})
+            
+            get_room_model().create_room("BigRoom")
+            msg_model = get_message_model()
+            for i in range(5):
+                msg_model.create_message("BigRoom", "user1", msg=f"Msg{i}")
+            
+            app.config['JOB_BATCH_SIZE'] = 2
+            try:
+                job = RoomService.start_room_deletion("BigRoom", requested_by="admin")
+            finally:
+                app.config['JOB_BATCH_SIZE'] = 500
+            
+            assert job['status'] == 'done'
+            assert job['progress']['messages_deleted'] == 5
+            assert job['result']['messages_deleted'] == 5
+            assert mongo.db.rooms.find_one({"name": "BigRoom"}) is None
+            assert RoomService.start_room_deletion("BigRoom") is None
+    
+    def test_resume_interrupted_room_deletion(self, app):
+        """Test una sala que quedó marcada tras un reinicio se termina de borrar"""
+        with app.app_context():
+            from datetime import datetime, timedelta
+            from zoneinfo import ZoneInfo
+            from app.models import get_room_model, get_message_model
+            from app.services.room_service import RoomService
+            from app.utils.database import mongo
+            
+            mongo.db.rooms.delete_many({})
+            mongo.db.messages.delete_many({})
+            mongo.db.jobs.delete_many({})
+            
+            room_model = get_room_model()
+            room_model.create_room("Stuck")
+            get_message_model().create_message("Stuck", "user1", msg="Msg")
+            room_model.mark_deleting("Stuck")
+            long_ago = datetime.now(ZoneInfo('America/Guayaquil')) - timedelta(hours=1)
+            mongo.db.rooms.update_one({"name": "Stuck"}, {"$set": {"deleted_at": long_ago}})
+            mongo.db.jobs.insert_one({
+                "id": "old", "kind": "delete_room", "target": "Stuck",
+                "status": "running", "updated_at": long_ago
+            })
+            
+            # Marcada hace poco: su trabajo puede seguir en otro proceso
+            room_model.create_room("Fresh")
+            room_model.mark_deleting("Fresh")
+            
+            jobs = RoomService.resume_room_deletions(stale_seconds=300)
+            
+            assert [job['target'] for job in jobs] == ["Stuck"]
+            assert jobs[0]['status'] == 'done'
+            assert mongo.db.jobs.find_one({"id": "old"})['status'] == 'failed'
+            assert mongo.db.rooms.find_one({"name": "Stuck"}) is None
+            assert mongo.db.messages.count_documents({"room": "Stuck"}) == 0
+            assert mongo.db.rooms.find_one({"name": "Fresh"})['deleting'] is True
+            # El nombre vuelve a estar disponible
+            assert room_model.create_room("Stuck") is not None
+    
+    def test_evict_room_members_clears_memory_state(self, app):
+        """Test los sockets expulsados dejan de contar en presencia, miembros y escritura"""
+        with app.app_context():
+            from app.services.room_service import RoomService
+            from app.services.presence_service import PresenceService
+            from app.services.typing_service import TypingService
+            
+            PresenceService.reset()
+            TypingService.reset()
+            PresenceService.join("sid1", "alice", "Doomed")
+            PresenceService.join("sid2", "bob", "Doomed")
+            PresenceService.join("sid3", "carol", "Other")
+            TypingService.update("Doomed", "alice")
+            
+            RoomService.evict_room_members("Doomed")
+            
+            assert PresenceService.count_in_room("Doomed") == 0
+            assert PresenceService.get_session("sid1") is None
+            assert PresenceService.members_version("Doomed") == 0
+            assert "Doomed" not in PresenceService.take_dirty_rooms()
+            assert "Doomed" not in TypingService.flush()
+            assert PresenceService.count_in_room("Other") == 1
+            PresenceService.reset()
+            TypingService.reset()
+    
+    def test_room_message_counter(self, app):
+        """Test el contador de mensajes de la sala se mantiene al crear y borrar"""
+        with app.app_context():
+            from app.models import get_room_model, get_message_model
+            from app.services.room_service import RoomService
+            from app.utils.database import mongo
+            
+            mongo.db.rooms.delete_many({})
+            mongo.db.messages.delete_many({})
+            
+            room_model = get_room_model()
+            room_model.create_room("CounterRoom")
+            
+            msg_model = get_message_model()
+            first = msg_model.create_message("CounterRoom", "user1", msg="Msg1")
+            msg_model.create_message("CounterRoom", "user1", msg="Msg2")
+            msg_model.create_message("CounterRoom", "user2", msg="Msg3")
+            msg_model.delete_message(first['_id'])
+            
+            assert room_model.find_by_name("CounterRoom")['message_count'] == 2
+            
+            msg_model.delete_user_messages("user1")
+            summary = RoomService.get_room_summary("CounterRoom")
+            assert summary['stats']['total_messages'] == 1
+    
+    def test_room_message_counter_backfill(self, app):
+        """Test salas sin contador lo calculan una vez y lo guardan"""
+        with app.app_context():
+            from app.models import get_message_model
+            from app.services.room_service import RoomService
+            from app.utils.database import mongo
+            
+            mongo.db.rooms.delete_many({})
+            mongo.db.messages.delete_many({})
+            mongo.db.users.delete_many({})
+            
+            mongo.db.rooms.insert_one({"id": "legacy", "name": "Legacy", "type": "text"})
+            msg_model = get_message_model()
+            msg_model.create_message("Legacy", "user1", msg="Msg1")
+            msg_model.create_message("Legacy", "user1", msg="Msg2")
+            mongo.db.users.insert_one({"username": "u1", "current_room": "Legacy"})
+            
+            summary = RoomService.get_room_summary("Legacy")
+            
+            assert summary['stats']['total_messages'] == 2
+            assert summary['stats']['total_members'] == 1
+            assert len(summary['recent_messages']) == 2
+            assert mongo.db.rooms.find_one({"name": "Legacy"})['message_count'] == 2
@@ -0,0 +1,92 @@
+"""
+test_sharding.py - Tests para la afinidad de salas por worker
+Pruebas para utils/hash_ring.py y services/shard_service.py
+"""
+
+import pytest
+from datetime import datetime
+from app.utils.hash_ring import HashRing
+from app.utils.database import mongo
+from app.services.shard_service import ShardService
+
+
+ROOMS = [f'sala-{i}' for i in range(1000)]
+
+
+class TestHashRing:
+    """Tests para el anillo de hashing consistente"""
+
+    def test_assignment_is_stable(self):
+        """Test el mismo anillo asigna siempre el mismo nodo"""
+        a = HashRing(['w0', 'w1', 'w2'])
+        b = HashRing(['w2', 'w0', 'w1'])
+        assert [a.get_node(r) for r in ROOMS] == [b.get_node(r) for r in ROOMS]
+
+    def test_spreads_rooms_across_nodes(self):
+        """Test todas las salas no caen en un solo worker"""
+        ring = HashRing(['w0', 'w1', 'w2', 'w3'])
+        counts = {}
+        for r in ROOMS:
+            node = ring.get_node(r)
+            counts[node] = counts.get(node, 0) + 1
+        assert len(counts) == 4
+        assert min(counts.values()) > 100
+
+    def test_adding_node_moves_few_rooms(self):
+        """Test al agregar un worker solo se mueven sus salas"""
+        ring = HashRing(['w0', 'w1', 'w2'])
+        before = {r: ring.get_node(r) for r in ROOMS}
+        ring.add_node('w3')
+        moved = [r for r in ROOMS if ring.get_node(r) != before[r]]
+
+        assert all(ring.get_node(r) == 'w3' for r in moved)
+        assert len(moved) < len(ROOMS) / 2
+
+    def test_remove_node(self):
+        """Test al quitar un worker sus salas pasan a los demás"""
+        ring = HashRing(['w0', 'w1'])
+        ring.remove_node('w1')
+        assert {ring.get_node(r) for r in ROOMS} == {'w0'}
+        assert HashRing().get_node('General') is None
+
+
+class TestShardService:
+    """Tests para el enrutamiento de salas a workers"""
+
+    @pytest.fixture
+    def sharded(self, app):
+        app.config.update(SHARDING_ENABLED=True, WORKER_ID='w0', WORKER_URL='http://w0')
+        mongo.db.workers.delete_many({})
+        ShardService.reset()
+        yield app
+        app.config.update(SHARDING_ENABLED=False, WORKER_ID=None)
+        mongo.db.workers.delete_many({})
+        ShardService.reset()
+
+    def test_disabled_routes_everything_locally(self, app):
+        """Test sin SHARDING_ENABLED todas las salas son locales"""
+        assert ShardService.route('General') is None
+
+    def test_route_to_owner(self, sharded):
+        """Test las salas de otro worker devuelven su URL"""
+        mongo.db.workers.insert_one(
+            {'worker_id': 'w1', 'url': 'http://w1', 'last_seen': datetime.utcnow()}
+        )
+        ShardService.register_worker()
+        assert ShardService.refresh_ring() is True
+
+        routes = {r: ShardService.route(r) for r in ROOMS[:50]}
+        remote = [v for v in routes.values() if v]
+        assert remote and len(remote) < 50
+        assert all(v['worker_id'] == 'w1' and v['url'] == 'http://w1' for v in remote)
+
+        # Sin cambios de workers el anillo no se reconstruye
+        assert ShardService.refresh_ring() is False
+
+    def test_stale_worker_leaves_ring(self, sharded):
+        """Test un worker sin heartbeat deja de recibir salas"""
+        mongo.db.workers.insert_one(
+            {'worker_id': 'w1', 'url': 'http://w1', 'last_seen': datetime(2000, 1, 1)}
+        )
+        ShardService.refresh_ring()
+        assert all(ShardService.route(r) is None for r in ROOMS[:50])
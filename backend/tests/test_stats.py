@@ -0,0 +1,185 @@
+"""
+test_stats.py - Tests para estadísticas globales cacheadas
+Pruebas para utils/cache.py, services/presence_service.py y services/stats_service.py
+"""
+
+import time
+import threading
+import pytest
+from app.utils.cache import TTLCache
+from app.services.presence_service import PresenceService
+
+
+class TestTTLCache:
+    """Tests para la caché con TTL y single-flight"""
+
+    def test_value_cached_until_ttl(self):
+        """Test el valor se reutiliza hasta que expira"""
+        now = [0.0]
+        cache = TTLCache(ttl=5, clock=lambda: now[0])
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        assert cache.get_or_compute('k', compute) == 1
+        now[0] = 4.9
+        assert cache.get_or_compute('k', compute) == 1
+        now[0] = 5.1
+        assert cache.get_or_compute('k', compute) == 2
+
+    def test_max_size_evicts_oldest(self):
+        """Test al superar max_size se descarta la clave más antigua"""
+        cache = TTLCache(ttl=60, max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.set('c', 3)
+        assert cache.get('a') is None
+        assert cache.get('b') == 2 and cache.get('c') == 3
+
+    def test_single_flight_concurrent_callers(self):
+        """Test N llamadas simultáneas ejecutan un solo cálculo"""
+        cache = TTLCache(ttl=0)
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return {'total': 42}
+
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute('k', compute)))
+            for _ in range(10)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert len(results) == 10
+        assert all(r == {'total': 42} for r in results)
+
+    def test_error_propagates_and_is_not_cached(self):
+        """Test un error no queda en caché"""
+        cache = TTLCache(ttl=5)
+
+        def failing():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_compute('k', failing)
+
+        assert cache.get_or_compute('k', lambda: 'ok') == 'ok'
+
+    def test_invalidate(self):
+        """Test invalidar fuerza recálculo"""
+        cache = TTLCache(ttl=60)
+        cache.get_or_compute('k', lambda: 1)
+        cache.invalidate('k')
+        assert cache.get_or_compute('k', lambda: 2) == 2
+
+
+class TestPresenceService:
+    """Tests para el registro de presencia en memoria"""
+
+    def setup_method(self):
+        PresenceService.reset()
+
+    def teardown_method(self):
+        PresenceService.reset()
+
+    def test_join_and_leave(self):
+        """Test entrar y salir de salas"""
+        PresenceService.join('sid1', 'user1', 'General')
+        PresenceService.join('sid2', 'user2', 'General')
+        PresenceService.join('sid3', 'user3', 'Random')
+
+        assert PresenceService.count_in_room('General') == 2
+        assert PresenceService.count_online() == 3
+
+        session = PresenceService.leave('sid1')
+        assert session['username'] == 'user1'
+        assert PresenceService.count_in_room('General') == 1
+        assert PresenceService.leave('sid1') is None
+
+    def test_join_moves_between_rooms(self):
+        """Test unirse a otra sala saca de la anterior"""
+        PresenceService.join('sid1', 'user1', 'General')
+        PresenceService.join('sid1', 'user1', 'Random')
+
+        assert PresenceService.count_in_room('General') == 0
+        assert PresenceService.count_in_room('Random') == 1
+
+    def test_members(self):
+        """Test lista de miembros sin duplicar usuarios con varios sockets"""
+        PresenceService.join('sid1', 'bob', 'General')
+        PresenceService.join('sid2', 'alice', 'General', nickname='Ali', is_anonymous=True)
+        PresenceService.join('sid3', 'bob', 'General')
+
+        members = PresenceService.members('General')
+
+        assert [m['username'] for m in members] == ['alice', 'bob']
+        assert members[0]['nickname'] == 'Ali'
+        assert PresenceService.count_online() == 2
+
+
+class TestStatsService:
+    """Tests para StatsService"""
+
+    def test_global_stats(self, app):
+        """Test estadísticas globales con presencia en memoria"""
+        with app.app_context():
+            from app.models import get_room_model, get_message_model
+            from app.services.stats_service import StatsService
+            from app.utils.database import mongo
+
+            mongo.db.rooms.delete_many({})
+            mongo.db.messages.delete_many({})
+            PresenceService.reset()
+
+            get_room_model().create_room("Room1")
+            get_message_model().create_message("Room1", "user1", msg="Hola")
+            PresenceService.join('sid1', 'user1', 'Room1')
+
+            try:
+                stats = StatsService.get_global_stats()
+            finally:
+                PresenceService.reset()
+
+            assert stats == {
+                'total_rooms': 1,
+                'total_messages': 1,
+                'total_users_online': 1
+            }
+
+    def test_global_stats_online_across_workers(self, app):
+        """Test con cola de mensajes los usuarios online se cuentan en MongoDB"""
+        with app.app_context():
+            from app.models import get_user_model
+            from app.services.stats_service import StatsService
+            from app.utils.database import mongo
+
+            mongo.db.users.delete_many({})
+            PresenceService.reset()
+            StatsService.invalidate()
+
+            user_model = get_user_model()
+            user_model.create_user('local', 'password123')
+            user_model.create_user('remote', 'password123')
+            user_model.create_user('offline', 'password123')
+            user_model.update_room('local', 'General')
+            user_model.update_room('remote', 'General')
+            # Este worker solo tiene el socket de 'local'
+            PresenceService.join('sid1', 'local', 'General')
+
+            app.config['SOCKETIO_MESSAGE_QUEUE'] = 'redis://localhost:6379/0'
+            try:
+                stats = StatsService.compute_global_stats()
+            finally:
+                app.config['SOCKETIO_MESSAGE_QUEUE'] = None
+                PresenceService.reset()
+
+            assert stats['total_users_online'] == 2
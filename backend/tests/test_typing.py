@@ -0,0 +1,85 @@
+"""
+test_typing.py - Tests para el indicador "escribiendo..."
+Pruebas para services/typing_service.py y su limpieza al salir de la sala
+"""
+
+import pytest
+from unittest.mock import patch
+from app import create_app
+from app.services import JWTService
+from app.services.typing_service import TypingService
+
+
+class TestTypingService:
+    """Tests para el agregador de "escribiendo..." """
+
+    def setup_method(self):
+        TypingService.reset()
+
+    def test_merges_keystrokes_into_one_state(self):
+        """Test muchas pulsaciones producen un solo cambio por sala"""
+        for _ in range(50):
+            TypingService.update('General', 'ana', now=0)
+        TypingService.update('General', 'beto', nickname='B', now=0)
+
+        assert TypingService.flush(now=1) == {
+            'General': [
+                {'username': 'ana', 'nickname': None},
+                {'username': 'beto', 'nickname': 'B'}
+            ]
+        }
+        # Sin cambios no hay nada que emitir
+        TypingService.update('General', 'ana', now=1)
+        assert TypingService.flush(now=1) == {}
+
+    def test_stale_entries_expire(self):
+        """Test quien deja de renovar sale de la lista"""
+        TypingService.update('General', 'ana', ttl=5, now=0)
+        TypingService.flush(now=0)
+
+        assert TypingService.flush(now=6) == {'General': []}
+        assert TypingService.flush(now=7) == {}
+
+    def test_stop_typing(self):
+        """Test is_typing=False quita al usuario"""
+        TypingService.update('General', 'ana', now=0)
+        TypingService.flush(now=0)
+        TypingService.update('General', 'ana', is_typing=False, now=1)
+        assert TypingService.flush(now=1) == {'General': []}
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        from app.utils.database import mongo
+        mongo.db.users.delete_many({})
+        mongo.db.rooms.delete_many({})
+        TypingService.reset()
+        yield app
+    TypingService.reset()
+
+
+@pytest.mark.parametrize('anonymous', [False, True])
+def test_leave_clears_typing(app, anonymous):
+    """Test quien sale de la sala deja de aparecer escribiendo"""
+    from app import socketio
+    from app.models import get_user_model, get_room_model
+
+    get_room_model().create_room('General')
+    pin = get_room_model().find_by_name('General').get('pin')
+    if anonymous:
+        username = get_user_model().create_anonymous_user('Anon', 'General', None)['username']
+    else:
+        username = 'ana'
+        get_user_model().create_user(username, 'password123')
+
+    client = socketio.test_client(app)
+    with patch.object(JWTService, 'verify_token', return_value=username):
+        client.emit('join', {'token': 'valid_token', 'room': 'General', 'pin': pin})
+        client.emit('typing', {'token': 'valid_token', 'room': 'General', 'is_typing': True})
+        assert TypingService.flush() == {}      # ya se emitió el estado
+
+        client.emit('leave', {'token': 'valid_token', 'room': 'General'})
+    assert TypingService.flush() == {'General': []}
+    client.disconnect()
@@ -0,0 +1,153 @@
+"""
+test_wire.py - Tests para el formato compacto de eventos
+Pruebas para services/wire_service.py
+"""
+
+import msgpack
+import pytest
+from datetime import datetime
+from app import create_app
+from app.models.message import DEFAULT_SECURITY_FLAGS
+from app.services import PresenceService, WireService
+
+
+@pytest.fixture
+def registry():
+    WireService.reset()
+    PresenceService.reset()
+    yield
+    WireService.reset()
+    PresenceService.reset()
+
+
+def _message(**overrides):
+    message = {
+        'id': '65f0c0ffee0000000000beef',
+        'seq': 7,
+        'room': 'General',
+        'username': 'alice',
+        'nickname': None,
+        'msg': 'hola',
+        'file_url': None,
+        'original_filename': None,
+        'timestamp': datetime(2024, 1, 1, 12, 0, 0),
+        'security_flags': DEFAULT_SECURITY_FLAGS
+    }
+    message.update(overrides)
+    return message
+
+
+def test_pack_message_short_keys():
+    """Test claves cortas, None omitidos y timestamp en ms UTC"""
+    packed = WireService.pack_message(_message())
+    assert packed == {
+        'i': '65f0c0ffee0000000000beef',
+        's': 7,
+        'r': 'General',
+        'u': 'alice',
+        'm': 'hola',
+        't': 1704110400000
+    }
+
+    decoded = msgpack.unpackb(WireService.encode(packed), raw=False)
+    assert decoded == packed
+
+
+def test_pack_message_keeps_detected_flags():
+    """Test los flags de seguridad solo viajan si hay hallazgos"""
+    flags = {'steganography_detected': True, 'risk_level': 'high', 'issues': ['lsb']}
+    packed = WireService.pack_message(_message(security_flags=flags))
+    assert packed['x'] == flags
+
+
+def test_negotiate(registry):
+    """Test solo msgpack activa el formato compacto"""
+    assert WireService.negotiate('sid-1', 'msgpack') == 'msgpack'
+    assert WireService.negotiate('sid-2', 'xml') == 'json'
+    assert WireService.negotiate('sid-3', None) == 'json'
+    assert WireService.is_compact('sid-1')
+    assert not WireService.is_compact('sid-2')
+
+    WireService.forget('sid-1')
+    assert not WireService.is_compact('sid-1')
+
+
+def test_broadcast_without_compact_clients(registry):
+    """Test sin clientes compactos el emit es el de siempre"""
+    calls = []
+    PresenceService.join('sid-1', 'alice', 'General')
+
+    WireService.broadcast(lambda *a, **kw: calls.append((a, kw)), 'message', 'General', _message())
+
+    assert calls == [(('message', _message()), {'room': 'General'})]
+
+
+def test_broadcast_splits_by_format(registry):
+    """Test JSON para los clientes normales y binario para los compactos"""
+    calls = []
+    PresenceService.join('sid-json', 'alice', 'General')
+    PresenceService.join('sid-bin', 'bob', 'General')
+    WireService.negotiate('sid-bin', 'msgpack')
+
+    WireService.broadcast(lambda *a, **kw: calls.append((a, kw)), 'message', 'General', _message())
+
+    (json_args, json_kwargs), (bin_args, bin_kwargs) = calls
+    assert json_args == ('message', _message())
+    assert json_kwargs == {'room': 'General', 'skip_sid': ['sid-bin']}
+    assert bin_kwargs == {'room': 'General#compact'}
+    assert msgpack.unpackb(bin_args[1], raw=False)['m'] == 'hola'
+
+
+def test_broadcast_batch(registry):
+    """Test los lotes viajan como lista de mensajes compactos"""
+    calls = []
+    PresenceService.join('sid-bin', 'bob', 'General')
+    WireService.negotiate('sid-bin', 'msgpack')
+
+    payload = {'room': 'General', 'messages': [_message(seq=1), _message(seq=2)]}
+    WireService.broadcast(lambda *a, **kw: calls.append((a, kw)), 'messages_batch', 'General', payload)
+
+    decoded = msgpack.unpackb(calls[1][0][1], raw=False)
+    assert decoded['r'] == 'General'
+    assert [m['s'] for m in decoded['b']] == [1, 2]
+
+
+def test_broadcast_with_message_queue_uses_format_rooms(registry):
+    """Test con varios workers cada formato va a su sala (sin saltar por sid)"""
+    calls = []
+    WireService.configure({'SOCKETIO_MESSAGE_QUEUE': 'redis://localhost:6379/0'})
+    # Ningún compacto en este proceso: puede haberlos en otro worker
+    PresenceService.join('sid-json', 'alice', 'General')
+
+    WireService.broadcast(lambda *a, **kw: calls.append((a, kw)), 'message', 'General', _message())
+
+    (json_args, json_kwargs), (bin_args, bin_kwargs) = calls
+    assert json_args == ('message', _message())
+    assert json_kwargs == {'room': 'General#json'}
+    assert bin_kwargs == {'room': 'General#compact'}
+    assert msgpack.unpackb(bin_args[1], raw=False)['m'] == 'hola'
+
+
+def test_format_room(registry):
+    """Test cada socket entra a la sala de su formato"""
+    WireService.negotiate('sid-bin', 'msgpack')
+    assert WireService.format_room('sid-bin', 'General') == 'General#compact'
+    assert WireService.format_room('sid-json', 'General') == 'General#json'
+
+
+def test_connect_negotiates_wire_format(registry):
+    """Test el cliente pide msgpack en auth y el status lo confirma"""
+    from app import socketio
+
+    app = create_app('testing')
+    client = socketio.test_client(app, auth={'wire': 'msgpack'})
+    status = [p for p in client.get_received() if p['name'] == 'status'][0]
+    assert status['args'][0]['wire'] == 'msgpack'
+
+    plain = socketio.test_client(app)
+    status = [p for p in plain.get_received() if p['name'] == 'status'][0]
+    assert status['args'][0]['wire'] == 'json'
+
+    client.disconnect()
+    plain.disconnect()
+    assert WireService._formats == {}
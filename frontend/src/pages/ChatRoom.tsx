@@ -23,6 +23,8 @@ const ChatRoom = () => {
   const { toast } = useToast();
   const [messages, setMessages] = useState<Message[]>([]);
   const [usersOnline, setUsersOnline] = useState<string[]>([]);
+  // Solo en salas muy grandes: el presence_delta trae el conteo sin nombres
+  const [membersCount, setMembersCount] = useState<number | null>(null);
   const [inputMessage, setInputMessage] = useState("");
   const [selectedImage, setSelectedImage] = useState<string | null>(null);
   const [selectedFile, setSelectedFile] = useState<{ name: string; data: string; type: string } | null>(null);
@@ -170,9 +172,29 @@ const ChatRoom = () => {
         } catch (e) {}
       };
 
+      // salas grandes: entradas y salidas agrupadas en un solo aviso
+      const onPresenceDelta = (d: any) => {
+        if (!mounted) return;
+        try {
+          if (!d || String(d.room) !== String(room)) return;
+          if (!Array.isArray(d.joined) && !Array.isArray(d.left)) {
+            setMembersCount(typeof d.members_count === "number" ? d.members_count : null);
+            return;
+          }
+          const joined = (d.joined || []).map((u: any) => u.username).filter(Boolean);
+          const left = new Set((d.left || []).map((u: any) => u.username));
+          setMembersCount(null);
+          setUsersOnline((prev) => [
+            ...prev.filter((x) => !left.has(x) && !joined.includes(x)),
+            ...joined
+          ]);
+        } catch (e) {}
+      };
+
       sock.on("user_joined", onUserJoined);
       sock.on("user_left", onUserLeft);
       sock.on("user_disconnected", onUserDisconnected);
+      sock.on("presence_delta", onPresenceDelta);
 
       // Manejar error de PIN inválido
       const onJoinError = (d: any) => {
@@ -202,6 +224,7 @@ const ChatRoom = () => {
         sock.off("user_joined", onUserJoined);
         sock.off("user_left", onUserLeft);
         sock.off("user_disconnected", onUserDisconnected);
+        sock.off("presence_delta", onPresenceDelta);
         sock.off("join_error", onJoinError);
       };
     });
@@ -530,6 +553,9 @@ const ChatRoom = () => {
             <p className="text-xs text-muted-foreground">
               {(() => {
                 const users = Array.from(new Set(usersOnline.filter(Boolean)));
+                if (membersCount !== null && membersCount > users.length) {
+                  return `${membersCount} usuarios en línea`;
+                }
                 if (users.length === 0) return "No hay usuarios conectados";
                 return `${users.length} usuario${users.length > 1 ? "s" : ""} en línea: ${users.join(", ")}`;
               })()}